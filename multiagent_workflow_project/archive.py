@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容寻址的压缩归档模块
+审计需要保留每次生成的模型和Agent原始输出。归档按未压缩内容的sha256寻址，相同内容只存一份；
+blob压缩后存放在 objects/<前2位>/<哈希>（首行记录编码和所用字典，文件可以独立解压），
+SQLite索引记录每个blob的种类和大小，以及引用名（如 runs/<run_id>/model）到哈希的映射。
+同一种类（模型JSON、原始输出）的内容结构高度相似，按种类用已有内容训练压缩字典后，小文档的压缩率明显提高。
+安装了 zstandard 时使用zstd及其字典训练，否则使用标准库zlib的预置字典（gzip格式不支持预置字典）。
+没有被任何引用名指向、且超过保留期的blob可以被垃圾回收
+
+用法:
+    python archive.py stats [--root DIR]
+    python archive.py refs [PREFIX] [--root DIR]
+    python archive.py get HASH_OR_REF [--root DIR]
+    python archive.py train KIND [--root DIR]
+    python archive.py gc [--dry-run] [--root DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from config import config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    dict_id TEXT,
+    created_at REAL NOT NULL,
+    touched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dictionaries (
+    dict_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_kind ON blobs(kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_refs_hash ON refs(hash);
+CREATE INDEX IF NOT EXISTS idx_dictionaries_kind ON dictionaries(kind, created_at);
+"""
+
+# JSON中反复出现的片段：带缩进的键名、短字符串值和结构符号
+_TOKEN = re.compile(rb'\s*"(?:[^"\\\n]|\\.){1,48}"(?:\s*:\s*[\[{]?)?|\s*[\]}],?')
+# zlib预置字典最多使用32KB窗口
+_ZLIB_DICT_LIMIT = 32 * 1024
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def train_zlib_dictionary(samples: Iterable[bytes], size: int = _ZLIB_DICT_LIMIT) -> Optional[bytes]:
+    """
+    从样本中训练zlib预置字典：统计在多个样本中出现的JSON片段，按 出现样本数×长度 取价值最高的片段拼接，
+    价值越高越靠近字典末尾（距离越近，引用越省）
+
+    Returns:
+        字典内容，样本中没有共有片段时返回None
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update(set(_TOKEN.findall(sample)))
+    ranked = sorted((token for token, count in counts.items() if count > 1),
+                    key=lambda token: (counts[token] * len(token), token), reverse=True)
+    picked, total = [], 0
+    for token in ranked:
+        if total + len(token) > min(size, _ZLIB_DICT_LIMIT):
+            continue
+        picked.append(token)
+        total += len(token)
+    return b"".join(reversed(picked)) or None
+
+
+def _compress(data: bytes, codec: str, level: int, dictionary: Optional[bytes]) -> bytes:
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=level, dict_data=dict_data).compress(data)
+    if codec == "zlib":
+        if dictionary:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY, dictionary)
+        else:
+            compressor = zlib.compressobj(level)
+        return compressor.compress(data) + compressor.flush()
+    return data
+
+
+def _decompress(data: bytes, codec: str, dictionary: Optional[bytes]) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("该blob使用zstd压缩，需要安装 zstandard")
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    if codec == "zlib":
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+    return data
+
+
+class ModelArchive:
+    """内容寻址的压缩归档（线程安全；blob文件原子写入，多个进程可以共用同一个归档目录）"""
+
+    def __init__(self, root: Optional[str] = None, codec: Optional[str] = None, level: Optional[int] = None):
+        self.root = root or config.archive_dir
+        self.codec = codec or config.archive_codec or default_codec()
+        if self.codec == "zstd" and zstandard is None:
+            raise RuntimeError("archive_codec为zstd，但未安装 zstandard")
+        self.level = level if level is not None else config.archive_level
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[str, bytes] = {}
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ModelArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _dictionary(self, dict_id: Optional[str]) -> Optional[bytes]:
+        if dict_id is None:
+            return None
+        if dict_id not in self._dictionaries:
+            rows = self._query("SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,))
+            if not rows:
+                raise KeyError(f"压缩字典不存在: {dict_id}")
+            self._dictionaries[dict_id] = rows[0]["data"]
+        return self._dictionaries[dict_id]
+
+    def _current_dictionary(self, kind: str) -> Optional[str]:
+        rows = self._query("SELECT dict_id FROM dictionaries WHERE kind = ? AND codec = ? ORDER BY created_at DESC LIMIT 1",
+                           (kind, self.codec))
+        return rows[0]["dict_id"] if rows else None
+
+    def put(self, data: Union[bytes, str], kind: str = "blob", ref: Optional[str] = None) -> str:
+        """
+        存入内容，已存在的内容不会重复存储
+
+        Args:
+            data: 内容（字符串按UTF-8编码）
+            kind: 内容种类（如 model、raw_output），同种类的内容共用压缩字典
+            ref: 引用名，指向该内容；没有引用的内容在保留期后会被垃圾回收
+
+        Returns:
+            内容哈希
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        if not self.has(digest):
+            dict_id = self._current_dictionary(kind)
+            stored = _compress(data, self.codec, self.level, self._dictionary(dict_id))
+            codec = self.codec
+            if len(stored) >= len(data):
+                stored, codec, dict_id = data, "none", None
+            path = self._object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                # 编码写在文件里：并发存入同一内容时，无论哪个进程的文件最后落盘都能正确解压
+                f.write(f"{codec} {dict_id or '-'}\n".encode("ascii"))
+                f.write(stored)
+            os.replace(tmp_path, path)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, kind, size, stored_size, codec, dict_id, created_at, touched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (digest, kind, len(data), len(stored), codec, dict_id, now, now),
+                )
+        with self._lock, self._conn:
+            # 刷新使用时间：刚存入（或再次存入）的内容不会被并发的垃圾回收删除
+            self._conn.execute("UPDATE blobs SET touched_at = ? WHERE hash = ?", (now, digest))
+            if ref is not None:
+                self._conn.execute("INSERT OR REPLACE INTO refs (name, hash, created_at) VALUES (?, ?, ?)", (ref, digest, now))
+        self._maybe_train(kind)
+        return digest
+
+    def put_json(self, data: Any, kind: str = "json", ref: Optional[str] = None) -> str:
+        """以键排序的紧凑JSON存入，相同数据总是得到相同哈希"""
+        return self.put(json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str), kind, ref)
+
+    def has(self, digest: str) -> bool:
+        return bool(self._query("SELECT 1 FROM blobs WHERE hash = ?", (digest,)))
+
+    def get(self, digest: str) -> bytes:
+        """按哈希读取内容"""
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                codec, dict_id = f.readline().decode("ascii").split()
+                stored = f.read()
+        except FileNotFoundError:
+            raise KeyError(f"内容不存在: {digest}") from None
+        data = _decompress(stored, codec, self._dictionary(None if dict_id == "-" else dict_id))
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"内容校验失败: {digest}")
+        return data
+
+    def get_text(self, digest: str) -> str:
+        return self.get(digest).decode("utf-8")
+
+    def get_json(self, digest: str) -> Any:
+        return json.loads(self.get(digest))
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """引用名指向的哈希，不存在时返回None"""
+        rows = self._query("SELECT hash FROM refs WHERE name = ?", (ref,))
+        return rows[0]["hash"] if rows else None
+
+    def set_ref(self, ref: str, digest: str) -> None:
+        if not self.has(digest):
+            raise KeyError(f"内容不存在: {digest}")
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO refs (name, hash, created_at) VALUES (?, ?, ?)", (ref, digest, time.time()))
+
+    def remove_refs(self, prefix: str) -> int:
+        """删除以prefix开头的引用名（如某次运行的全部引用），返回删除数"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM refs WHERE substr(name, 1, ?) = ?", (len(prefix), prefix)).rowcount
+
+    def refs(self, prefix: str = "") -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._query(
+            "SELECT name, hash, created_at FROM refs WHERE substr(name, 1, ?) = ? ORDER BY name", (len(prefix), prefix))]
+
+    def _maybe_train(self, kind: str) -> None:
+        """某种类积累了足够样本且还没有字典时自动训练"""
+        if self._current_dictionary(kind) is not None:
+            return
+        rows = self._query("SELECT COUNT(*) AS n FROM blobs WHERE kind = ?", (kind,))
+        if rows[0]["n"] >= config.archive_dict_min_samples:
+            self.train_dictionary(kind)
+
+    def train_dictionary(self, kind: str, samples: Optional[List[bytes]] = None) -> Optional[str]:
+        """
+        为某种类训练新的压缩字典，之后存入的该种类内容使用新字典（已有blob仍用各自原来的字典解压）
+
+        Args:
+            kind: 内容种类
+            samples: 训练样本，默认使用该种类最近存入的内容
+
+        Returns:
+            字典ID，样本不足以训练时返回None
+        """
+        if samples is None:
+            rows = self._query("SELECT hash FROM blobs WHERE kind = ? ORDER BY created_at DESC LIMIT ?",
+                               (kind, config.archive_dict_max_samples))
+            samples = [self.get(row["hash"]) for row in rows]
+        if len(samples) < 2:
+            return None
+        if self.codec == "zstd":
+            try:
+                dictionary = zstandard.train_dictionary(config.archive_dict_size, samples).as_bytes()
+            except zstandard.ZstdError:
+                return None
+        else:
+            dictionary = train_zlib_dictionary(samples, config.archive_dict_size)
+        if not dictionary:
+            return None
+        dict_id = hashlib.sha256(dictionary).hexdigest()[:16]
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO dictionaries (dict_id, kind, codec, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                               (dict_id, kind, self.codec, dictionary, time.time()))
+        return dict_id
+
+    def gc(self, grace_seconds: Optional[float] = None, dry_run: bool = False) -> Dict[str, int]:
+        """
+        删除没有引用、且最近grace_seconds内没有存入的blob，以及不再被任何blob使用的旧字典（每个种类的当前字典保留）
+
+        Returns:
+            {"blobs": 删除的blob数, "bytes": 释放的字节数, "dictionaries": 删除的字典数}
+        """
+        grace_seconds = config.archive_gc_grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = time.time() - grace_seconds
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT hash, stored_size FROM blobs WHERE touched_at < ? AND hash NOT IN (SELECT hash FROM refs)", (cutoff,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM blobs WHERE hash = ?", [(row["hash"],) for row in rows])
+                stale_dictionaries = self._conn.execute(
+                    "SELECT dict_id FROM dictionaries d WHERE created_at < (SELECT MAX(created_at) FROM dictionaries c "
+                    "WHERE c.kind = d.kind AND c.codec = d.codec) "
+                    "AND dict_id NOT IN (SELECT dict_id FROM blobs WHERE dict_id IS NOT NULL)"
+                ).fetchall()
+                self._conn.executemany("DELETE FROM dictionaries WHERE dict_id = ?",
+                                       [(row["dict_id"],) for row in stale_dictionaries])
+            except BaseException:
+                self._conn.rollback()
+                raise
+            # 试运行时回滚，只返回统计
+            if dry_run:
+                self._conn.rollback()
+            else:
+                self._conn.commit()
+        if not dry_run:
+            for row in rows:
+                try:
+                    os.remove(self._object_path(row["hash"]))
+                except FileNotFoundError:
+                    pass
+            for row in stale_dictionaries:
+                self._dictionaries.pop(row["dict_id"], None)
+        return {"blobs": len(rows), "bytes": sum(row["stored_size"] for row in rows), "dictionaries": len(stale_dictionaries)}
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """按种类统计blob数、原始大小、存储大小和压缩率"""
+        rows = [dict(row) for row in self._query(
+            "SELECT kind, COUNT(*) AS blobs, SUM(size) AS size, SUM(stored_size) AS stored_size, "
+            "(SELECT COUNT(*) FROM dictionaries d WHERE d.kind = b.kind) AS dictionaries "
+            "FROM blobs b GROUP BY kind ORDER BY kind")]
+        for row in rows:
+            row["ratio"] = row["size"] / row["stored_size"] if row["stored_size"] else 0.0
+        return rows
+
+
+def archive_run(archive: ModelArchive, run_id: str, model: Any, raw_entries: Iterable[Dict[str, Any]] = ()) -> Dict[str, Any]:
+    """
+    归档一次运行的领域模型和Agent原始输出
+
+    Args:
+        archive: 归档
+        run_id: 运行ID，引用名为 runs/<run_id>/model 和 runs/<run_id>/raw/<序号>
+        model: 领域模型
+        raw_entries: 原始输出记录（见 event_log.RawOutputBuffer）
+
+    Returns:
+        {"model": 模型哈希, "raw_outputs": 原始输出数}
+    """
+    model_hash = archive.put_json(model.model_dump(mode="json"), kind="model", ref=f"runs/{run_id}/model")
+    count = 0
+    for count, entry in enumerate(raw_entries, 1):
+        archive.put_json(entry, kind="raw_output", ref=f"runs/{run_id}/raw/{count:04d}")
+    return {"model": model_hash, "raw_outputs": count}
+
+
+def _print_rows(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    if not rows:
+        print("  (无数据)")
+        return
+    cells = [[f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="内容寻址的模型归档")
+    parser.add_argument("--root", default=config.archive_dir, help="归档目录")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="按种类统计存储大小和压缩率")
+    refs_parser = subparsers.add_parser("refs", help="列出引用名")
+    refs_parser.add_argument("prefix", nargs="?", default="", help="引用名前缀，如 runs/<run_id>/")
+    get_parser = subparsers.add_parser("get", help="输出内容")
+    get_parser.add_argument("target", help="内容哈希或引用名")
+    train_parser = subparsers.add_parser("train", help="用已有内容为某种类重新训练压缩字典")
+    train_parser.add_argument("kind", help="内容种类，如 model、raw_output")
+    gc_parser = subparsers.add_parser("gc", help="删除没有引用的内容")
+    gc_parser.add_argument("--dry-run", action="store_true", help="只统计，不删除")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.root, "index.sqlite3")):
+        print(f"❌ 归档不存在: {args.root}")
+        return
+    with ModelArchive(args.root) as archive:
+        if args.command == "stats":
+            _print_rows(archive.stats(), ["kind", "blobs", "size", "stored_size", "ratio", "dictionaries"])
+        elif args.command == "refs":
+            _print_rows(archive.refs(args.prefix), ["name", "hash"])
+        elif args.command == "get":
+            sys.stdout.buffer.write(archive.get(archive.resolve(args.target) or args.target))
+        elif args.command == "train":
+            dict_id = archive.train_dictionary(args.kind)
+            print(f"✅ 新字典: {dict_id}" if dict_id else "⚠️ 样本不足，未训练字典")
+        else:
+            result = archive.gc(dry_run=args.dry_run)
+            action = "可删除" if args.dry_run else "已删除"
+            print(f"🧹 {action} {result['blobs']} 个blob（{result['bytes']} 字节）和 {result['dictionaries']} 个旧字典")
+
+
+if __name__ == "__main__":
+    main()
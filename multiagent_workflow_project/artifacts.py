@@ -0,0 +1,147 @@
+"""
+输出产物增量写入模块
+每次运行都重写全部输出文件会触发下游文档流水线的重新渲染。产物写入时边写临时文件边计算内容哈希，
+内容与已有文件相同时丢弃临时文件（目标文件和修改时间保持不变），不同时原子替换；
+清单 <root>/<name>_manifest.json 记录每个产物的哈希，以及本次变化、未变化和已删除的产物
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from checkpoint import write_json_atomic
+
+
+class _HashingWriter:
+    """写入文本句柄的同时计算内容哈希"""
+
+    def __init__(self, f: TextIO):
+        self._f = f
+        self._digest = hashlib.sha256()
+
+    def write(self, text: str) -> int:
+        self._digest.update(text.encode("utf-8"))
+        return self._f.write(text)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def file_hash(path: str) -> Optional[str]:
+    """已有文件的内容哈希，文件不存在时返回None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _entry(path: str, digest: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"hash": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _unchanged(path: str, digest: str, previous: Optional[Dict[str, Any]]) -> bool:
+    """清单记录的哈希相同且文件大小、修改时间未变时不再读取文件；否则与磁盘上的内容比较"""
+    if previous and previous.get("hash") == digest:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if stat.st_size == previous.get("size") and stat.st_mtime_ns == previous.get("mtime_ns"):
+            return True
+    return file_hash(path) == digest
+
+
+def write_if_changed(path: str, write: Callable[[TextIO], None],
+                     previous: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    流式写入一个产物，内容未变化时不替换目标文件
+
+    Args:
+        path: 目标文件路径
+        write: 向文本句柄写入内容的函数
+        previous: 清单中该产物上次的记录
+
+    Returns:
+        (清单记录, 是否变化)
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 带进程号的临时文件名：进程池中的多个写入者互不干扰
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            writer = _HashingWriter(f)
+            write(writer)
+        digest = writer.hexdigest()
+        if _unchanged(path, digest, previous):
+            os.remove(tmp_path)
+            return (previous if previous and previous.get("hash") == digest else _entry(path, digest)), False
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return _entry(path, digest), True
+
+
+class ArtifactWriter:
+    """一组输出产物（如一次运行保存的模型和全部PlantUML图）的增量写入会话"""
+
+    def __init__(self, root: str, name: str):
+        self.root = root
+        self.manifest_path = os.path.join(root, f"{name}_manifest.json")
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self._previous = json.load(f).get("artifacts", {})
+        self._current: Dict[str, Dict[str, Any]] = {}
+        self.changed: List[str] = []
+        self.unchanged: List[str] = []
+
+    def key(self, path: str) -> str:
+        """清单中的产物名称：相对root的路径，统一使用 / 分隔"""
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def previous(self, path: str) -> Optional[Dict[str, Any]]:
+        return self._previous.get(self.key(path))
+
+    def record(self, path: str, entry: Dict[str, Any], changed: bool) -> None:
+        """记录在其他进程中写入的产物"""
+        key = self.key(path)
+        self._current[key] = entry
+        (self.changed if changed else self.unchanged).append(key)
+
+    def write(self, path: str, write: Callable[[TextIO], None]) -> bool:
+        """流式写入产物，返回内容是否变化"""
+        entry, changed = write_if_changed(path, write, self.previous(path))
+        self.record(path, entry, changed)
+        return changed
+
+    def write_json(self, path: str, data: Any) -> bool:
+        return self.write(path, lambda f: json.dump(data, f, ensure_ascii=False, indent=2))
+
+    def finish(self, prune: bool = True) -> Dict[str, List[str]]:
+        """
+        写入清单
+
+        Args:
+            prune: 删除上次清单中有、本次没有写入的产物（如图不再分页后的旧页面）
+
+        Returns:
+            {"changed": [...], "unchanged": [...], "removed": [...]}
+        """
+        removed = [key for key in self._previous if key not in self._current]
+        if prune:
+            for key in removed:
+                path = os.path.join(self.root, key)
+                if os.path.exists(path):
+                    os.remove(path)
+        summary = {"changed": self.changed, "unchanged": self.unchanged, "removed": removed}
+        os.makedirs(self.root, exist_ok=True)
+        write_json_atomic(self.manifest_path, {"updated_at": datetime.now().isoformat(), "artifacts": self._current, **summary})
+        return summary
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准脚本
+提供可复用的合成领域模型生成器，以及各项优化的离线/在线基准
+
+用法:
+    python benchmarks.py output-format [--model PATH] [--usecases N] [--runs N] [--tps N] [--live]
+    python benchmarks.py model-index [--sizes N,N,...] [--runs N]
+    python benchmarks.py model-diff [--sizes N,N,...] [--runs N]
+    python benchmarks.py jsonl [--sizes N,N,...]
+    python benchmarks.py archive [--count N] [--usecases N]
+    python benchmarks.py serialization [--sizes N,N,...] [--runs N]
+    python benchmarks.py validation [--count N] [--runs N]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dsl_models import (
+    Actor, Attribute, Class, ConceptualClassDiagram, DomainModel, Message, Method,
+    OCLConstraint, Relationship, SystemSequenceDiagram, UseCase, UseCaseDiagram
+)
+from ledger import estimate_tokens
+import terse_dsl
+
+_ACTORS = ["顾客", "管理员", "仓库管理员", "客服", "支付系统", "物流系统"]
+_TYPES = ["String", "int", "double", "boolean", "Date"]
+_RELATIONSHIP_TYPES = ["association", "association", "aggregation", "composition", "generalization"]
+
+
+def synthetic_domain_model(usecases: int = 10, classes: Optional[int] = None, seed: int = 0) -> DomainModel:
+    """
+    生成确定性的合成领域模型，用于基准测试和大规模场景验证
+
+    Args:
+        usecases: 用例数量（每个用例对应一个顺序图）
+        classes: 类数量，默认与用例数量相同
+        seed: 随机种子
+
+    Returns:
+        DomainModel对象
+    """
+    rng = random.Random(seed)
+    classes = classes if classes is not None else usecases
+    actors = [Actor(name=name, type="primary" if i < 4 else "secondary", description=f"{name}参与者")
+              for i, name in enumerate(_ACTORS)]
+
+    usecase_list = []
+    for i in range(usecases):
+        includes = [f"用例{j}" for j in rng.sample(range(i), min(i, rng.randint(0, 2)))]
+        usecase_list.append(UseCase(
+            name=f"用例{i}",
+            description=f"合成用例{i}的业务描述",
+            actor=actors[i % 4].name,
+            includes=includes,
+            preconditions=[f"{actors[i % 4].name}已登录"],
+            postconditions=[f"实体{i % max(classes, 1)}已更新"],
+        ))
+
+    class_list = []
+    for i in range(classes):
+        class_list.append(Class(
+            name=f"实体{i}",
+            description=f"合成领域类{i}",
+            attributes=[Attribute(name=f"属性{j}", type=rng.choice(_TYPES), description=f"属性{j}说明")
+                        for j in range(rng.randint(2, 6))],
+            methods=[Method(name=f"操作{j}", parameters=[f"参数{k}" for k in range(rng.randint(0, 3))],
+                            return_type=rng.choice(["void", "boolean", "String"]), description=f"操作{j}说明")
+                     for j in range(rng.randint(1, 4))],
+        ))
+    relationships = []
+    for i in range(1, classes):
+        relationships.append(Relationship(
+            name=f"关系{i}",
+            source=f"实体{rng.randrange(i)}",
+            target=f"实体{i}",
+            type=rng.choice(_RELATIONSHIP_TYPES),
+            target_multiplicity=rng.choice(["1", "0..*", "1..*"]),
+            description=f"合成关系{i}",
+        ))
+
+    sequence_diagrams = []
+    for usecase in usecase_list:
+        messages = [Message(name=f"请求{j}", sender=usecase.actor, receiver="系统",
+                            parameters=[f"参数{k}" for k in range(rng.randint(0, 2))], return_value=f"结果{j}")
+                    for j in range(rng.randint(2, 6))]
+        sequence_diagrams.append(SystemSequenceDiagram(
+            name=f"{usecase.name}顺序图", description=f"{usecase.name}的交互过程",
+            actors=[usecase.actor], systems=["系统"], messages=messages,
+        ))
+
+    ocl_constraints = [
+        OCLConstraint(name=f"约束{i}", context=f"实体{i}", type="inv",
+                      expression=f"self.属性0->notEmpty() and self.属性1 <> null", description=f"实体{i}的不变式")
+        for i in range(classes)
+    ]
+    return DomainModel(
+        name="合成系统",
+        description=f"包含{usecases}个用例和{classes}个类的合成领域模型",
+        usecase_diagram=UseCaseDiagram(name="合成系统", description="合成系统用例图", actors=actors, usecases=usecase_list),
+        sequence_diagrams=sequence_diagrams,
+        class_diagram=ConceptualClassDiagram(name="合成系统类图", classes=class_list, relationships=relationships),
+        ocl_constraints=ocl_constraints,
+    )
+
+
+def load_domain_model(path: Optional[str], usecases: int = 10) -> DomainModel:
+    """从JSON文件加载领域模型，未指定路径时生成合成模型"""
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return DomainModel.model_validate(json.load(f))
+    return synthetic_domain_model(usecases)
+
+
+def _time_ms(func: Callable[[], Any], runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def _print_rows(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    cells = [[f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def _json_parser(model_class) -> Callable[[str], Any]:
+    def parse(text: str):
+        data = json.loads(text)
+        if isinstance(data, list):
+            return [model_class.model_validate(item) for item in data]
+        return model_class.model_validate(data)
+    return parse
+
+
+def output_format_artifacts(model: DomainModel) -> List[Dict[str, Any]]:
+    """
+    生成每个产物的JSON输出（与Agent模板一致的缩进JSON）和紧凑语法输出
+
+    Returns:
+        [{"artifact", "json", "terse", "json_parse", "terse_parse"}]
+    """
+    ocl_json = json.dumps([c.model_dump() for c in model.ocl_constraints], ensure_ascii=False, indent=2)
+    artifacts = [
+        ("usecase_diagram", model.usecase_diagram.model_dump_json(indent=2),
+         terse_dsl.format_usecase_diagram(model.usecase_diagram), UseCaseDiagram, terse_dsl.parse_usecase_diagram),
+        ("class_diagram", model.class_diagram.model_dump_json(indent=2),
+         terse_dsl.format_class_diagram(model.class_diagram), ConceptualClassDiagram, terse_dsl.parse_class_diagram),
+    ]
+    artifacts += [
+        (f"sequence[{i}]", seq.model_dump_json(indent=2), terse_dsl.format_sequence_diagram(seq),
+         SystemSequenceDiagram, terse_dsl.parse_sequence_diagram)
+        for i, seq in enumerate(model.sequence_diagrams)
+    ]
+    if model.ocl_constraints:
+        artifacts.append(("ocl_constraints", ocl_json, terse_dsl.format_ocl_constraints(model.ocl_constraints),
+                          OCLConstraint, terse_dsl.parse_ocl_constraints))
+    return [{"artifact": name, "json": json_text, "terse": terse_text,
+             "json_parse": _json_parser(model_class), "terse_parse": terse_parse}
+            for name, json_text, terse_text, model_class, terse_parse in artifacts]
+
+
+def bench_output_format(model: DomainModel, runs: int = 200, tokens_per_second: float = 60.0) -> Dict[str, Any]:
+    """
+    离线比较JSON与紧凑语法的输出token数、本地解析耗时和按吞吐估算的生成耗时
+
+    Args:
+        model: 作为"模型输出"的领域模型
+        runs: 解析耗时的重复次数
+        tokens_per_second: 估算生成耗时所用的输出吞吐
+
+    Returns:
+        {"rows": 每个产物的对比, "total": 汇总}
+    """
+    rows = []
+    for item in output_format_artifacts(model):
+        json_tokens, terse_tokens = estimate_tokens(item["json"]), estimate_tokens(item["terse"])
+        rows.append({
+            "artifact": item["artifact"],
+            "json_tokens": json_tokens,
+            "terse_tokens": terse_tokens,
+            "reduction": 1 - terse_tokens / json_tokens if json_tokens else 0.0,
+            "json_parse_ms": _time_ms(lambda: item["json_parse"](item["json"]), runs),
+            "terse_parse_ms": _time_ms(lambda: item["terse_parse"](item["terse"]), runs),
+        })
+    json_tokens = sum(r["json_tokens"] for r in rows)
+    terse_tokens = sum(r["terse_tokens"] for r in rows)
+    total = {
+        "artifact": "TOTAL",
+        "json_tokens": json_tokens,
+        "terse_tokens": terse_tokens,
+        "reduction": 1 - terse_tokens / json_tokens if json_tokens else 0.0,
+        "json_parse_ms": sum(r["json_parse_ms"] for r in rows),
+        "terse_parse_ms": sum(r["terse_parse_ms"] for r in rows),
+        "json_generate_s": json_tokens / tokens_per_second,
+        "terse_generate_s": terse_tokens / tokens_per_second,
+    }
+    return {"rows": rows, "total": total}
+
+
+def bench_output_format_live(model: DomainModel, runs: int = 1) -> List[Dict[str, Any]]:
+    """
+    在线比较：用同一份用例图分别以JSON和紧凑语法调用类图设计Agent，记录completion token数和实际耗时
+
+    Returns:
+        每种格式的平均completion_tokens、耗时和解析是否成功
+    """
+    from my_agents import class_diagram_designer
+    from prompt_serialization import to_prompt_json
+    from workflow import complete_agent, MultiAgentWorkflow
+
+    workflow = MultiAgentWorkflow(ledger=None)
+    prompt = f"基于以下用例图，创建概念类图：\n\n{to_prompt_json(model.usecase_diagram, 'class_design')}"
+    results = []
+    for output_format in ("json", "terse"):
+        agent = terse_dsl.with_output_format(class_diagram_designer, output_format)
+        tokens, seconds, parsed = 0, 0.0, 0
+        for _ in range(runs):
+            start = time.perf_counter()
+            completion = complete_agent(agent, prompt, max_tokens=4096)
+            seconds += time.perf_counter() - start
+            tokens += getattr(completion.usage, "completion_tokens", None) or 0
+            try:
+                workflow.parse_agent_output(agent, completion.choices[0].message.content, ConceptualClassDiagram)
+                parsed += 1
+            except Exception:
+                pass
+        results.append({"format": output_format, "completion_tokens": tokens / runs,
+                        "latency_s": seconds / runs, "parsed": f"{parsed}/{runs}"})
+    return results
+
+
+def _validate_with_lists(usecase_diagram: UseCaseDiagram) -> List[str]:
+    """索引化之前validate_use_case_diagram的查找方式（在列表上按名称查找），作为对照"""
+    errors = []
+    usecase_names = [uc.name for uc in usecase_diagram.usecases]
+    actor_names = [actor.name for actor in usecase_diagram.actors]
+    for usecase in usecase_diagram.usecases:
+        if usecase.actor not in actor_names:
+            errors.append(usecase.name)
+        for name in usecase.includes + usecase.extends:
+            if name not in usecase_names:
+                errors.append(name)
+    return errors
+
+
+def bench_model_index(sizes: List[int], runs: int = 5, baseline_limit: int = 10000) -> List[Dict[str, Any]]:
+    """
+    对比列表查找与索引查找的用例图校验耗时，并给出索引版本的校验、PlantUML导出在不同规模下的单元素耗时
+
+    每次校验都建立一次索引；列表查找是平方复杂度，超过baseline_limit个用例时不再测量
+
+    Returns:
+        每个规模一行：各项耗时(ms)与索引校验的单用例耗时(us)
+    """
+    from tools import export_to_plantuml, validate_use_case_diagram
+
+    rows = []
+    for size in sizes:
+        model = synthetic_domain_model(size, classes=min(size, 100))
+        diagram = model.usecase_diagram
+        validate_use_case_diagram(diagram)
+        row = {
+            "usecases": size,
+            "list_ms": _time_ms(lambda: _validate_with_lists(diagram), 1) if size <= baseline_limit else "-",
+            "index_ms": _time_ms(lambda: validate_use_case_diagram(diagram), runs),
+            "plantuml_ms": _time_ms(lambda: export_to_plantuml(model), runs),
+        }
+        row["index_us_per_usecase"] = row["index_ms"] * 1000 / size
+        rows.append(row)
+    return rows
+
+
+def bench_model_diff(sizes: List[int], runs: int = 3) -> List[Dict[str, Any]]:
+    """
+    结构化对比的耗时随规模的变化：新版本删除、修改、重命名少量元素
+
+    Returns:
+        每个规模一行：元素总数、对比耗时(ms)、单元素耗时(us)和报告的变化数
+    """
+    from model_diff import diff_models
+
+    rows = []
+    for size in sizes:
+        old = synthetic_domain_model(size, classes=size)
+        new = old.model_copy(deep=True)
+        new.usecase_diagram.usecases.pop(size // 2)
+        new.usecase_diagram.usecases[0].description = "修改后的描述"
+        new.class_diagram.classes[1].name = f"{new.class_diagram.classes[1].name}类"
+        new.class_diagram.classes[2].attributes[0].type = "Decimal"
+        elements = (len(old.usecase_diagram.usecases) + len(old.sequence_diagrams) + len(old.class_diagram.relationships)
+                    + len(old.ocl_constraints) + sum(1 + len(cls.attributes) + len(cls.methods) for cls in old.class_diagram.classes))
+        diff = diff_models(old, new)
+        row = {"usecases": size, "elements": elements, "diff_ms": _time_ms(lambda: diff_models(old, new), runs),
+               "changes": len(diff.changes)}
+        row["us_per_element"] = row["diff_ms"] * 1000 / elements
+        rows.append(row)
+    return rows
+
+
+def _peak_mb(func: Callable[[], Any]) -> Tuple[float, float]:
+    """执行一次func，返回(耗时ms, 峰值内存MB)；耗时在未开启tracemalloc时单独测量"""
+    elapsed = _time_ms(func, 1)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / (1 << 20)
+
+
+def bench_jsonl(sizes: List[int]) -> List[Dict[str, Any]]:
+    """
+    整体JSON与流式JSONL的读取对比：完整加载JSON模型，与从JSONL中只读取类图或单个顺序图
+
+    Returns:
+        每个规模一行：文件大小(MB)，以及各读取方式的耗时(ms)和峰值内存(MB)
+    """
+    from model_jsonl import ModelJsonlReader, write_model_jsonl
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            model = synthetic_domain_model(size)
+            json_path, jsonl_path = os.path.join(tmp, f"{size}.json"), os.path.join(tmp, f"{size}.jsonl")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(model.model_dump(mode="json"), f, ensure_ascii=False, indent=2)
+            write_model_jsonl(model, jsonl_path)
+            del model
+
+            def load_json():
+                with open(json_path, "r", encoding="utf-8") as f:
+                    return DomainModel.model_validate(json.load(f))
+
+            def class_diagram():
+                with ModelJsonlReader(jsonl_path) as reader:
+                    return reader.class_diagram()
+
+            def sequence_diagram():
+                with ModelJsonlReader(jsonl_path) as reader:
+                    return reader.sequence_diagram(f"用例{size // 2}顺序图")
+
+            row = {"usecases": size, "json_mb": os.path.getsize(json_path) / (1 << 20),
+                   "jsonl_mb": os.path.getsize(jsonl_path) / (1 << 20)}
+            for name, func in (("json_full", load_json), ("jsonl_class", class_diagram), ("jsonl_sequence", sequence_diagram)):
+                row[f"{name}_ms"], row[f"{name}_peak_mb"] = _peak_mb(func)
+            rows.append(row)
+    return rows
+
+
+def bench_archive(count: int = 200, usecases: int = 8) -> Dict[str, Any]:
+    """
+    归档压缩率：count个不同的小型模型（每个存两次，模拟重复运行）分别不压缩、zlib压缩和zlib+训练字典压缩
+
+    Returns:
+        {"rows": 每种方式一行（存储字节数、压缩率）, "get_us": 按哈希随机读取的单次耗时(us)}
+    """
+    from archive import ModelArchive, _compress, train_zlib_dictionary
+
+    documents = [json.dumps(synthetic_domain_model(usecases, seed=seed).model_dump(mode="json"), ensure_ascii=False,
+                            sort_keys=True, separators=(",", ":")).encode("utf-8") for seed in range(count)]
+    raw = sum(len(doc) for doc in documents) * 2
+    dictionary = train_zlib_dictionary(documents[:20])
+    rows = [{"method": "none", "stored_bytes": raw}]
+    rows.append({"method": "zlib", "stored_bytes": 2 * sum(len(_compress(doc, "zlib", 6, None)) for doc in documents)})
+    rows.append({"method": "zlib+dict", "stored_bytes": 2 * sum(len(_compress(doc, "zlib", 6, dictionary)) for doc in documents)})
+    for row in rows:
+        row["ratio"] = raw / row["stored_bytes"]
+
+    with tempfile.TemporaryDirectory() as tmp, ModelArchive(tmp, codec="zlib") as archive:
+        hashes = [archive.put(doc, kind="model", ref=f"runs/{i}/model") for i, doc in enumerate(documents + documents)]
+        stats = archive.stats()[0]
+        rows.append({"method": "archive", "stored_bytes": stats["stored_size"], "ratio": raw / stats["stored_size"]})
+        rng = random.Random(0)
+        sample = [rng.choice(hashes) for _ in range(500)]
+        get_us = _time_ms(lambda: [archive.get(digest) for digest in sample], 1) * 1000 / len(sample)
+    return {"rows": rows, "get_us": get_us}
+
+
+def bench_serialization(sizes: List[int], runs: int = 3) -> List[Dict[str, Any]]:
+    """
+    领域模型JSON序列化：原来的 json.dump(model_dump()) 与pydantic-core、orjson和流式写入对比（均为缩进输出）
+
+    Returns:
+        每个规模、每种方式一行：输出大小(MB)、耗时(ms)、吞吐(MB/s)和峰值内存(MB)
+    """
+    from serialization import dumps_text, orjson, save_json
+
+    methods: Dict[str, Callable[[DomainModel, str], Any]] = {
+        "json.dump(model_dump)": lambda model, path: _write_text(path, json.dumps(model.model_dump(), ensure_ascii=False, indent=2)),
+        "model_dump_json": lambda model, path: _write_text(path, dumps_text(model, pretty=True)),
+        "stream": lambda model, path: save_json(model, path, pretty=True),
+    }
+    if orjson is not None:
+        methods["orjson(model_dump)"] = lambda model, path: _write_text(path, dumps_text(model, pretty=True, backend="orjson"))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.json")
+        for size in sizes:
+            model = synthetic_domain_model(size)
+            for name, method in methods.items():
+                row = {"usecases": size, "method": name}
+                row["ms"] = _time_ms(lambda: method(model, path), runs)
+                row["mb"] = os.path.getsize(path) / (1 << 20)
+                row["mb_per_s"] = row["mb"] * 1000 / row["ms"]
+                _, row["peak_mb"] = _peak_mb(lambda: method(model, path))
+                rows.append(row)
+    return rows
+
+
+def bench_validation(count: int = 20000, runs: int = 3) -> List[Dict[str, Any]]:
+    """
+    OCL约束和顺序图列表的校验吞吐：逐个model_validate、缓存TypeAdapter的批量校验（含1%无效元素）、
+    以及直接从JSON文本校验
+
+    Returns:
+        每种元素、每种方式一行：元素数、耗时(ms)和每秒校验的对象数
+    """
+    from validation import validate_batch, validate_json_list, validate_list
+
+    model = synthetic_domain_model(max(count // 10, 1))
+    samples = {
+        "OCLConstraint": (OCLConstraint, [c.model_dump(mode="json") for c in model.ocl_constraints]),
+        "SystemSequenceDiagram": (SystemSequenceDiagram, [s.model_dump(mode="json") for s in model.sequence_diagrams]),
+    }
+    rows = []
+    for name, (model_class, items) in samples.items():
+        items = (items * (count // len(items) + 1))[:count]
+        dirty = list(items)
+        for i in range(0, len(dirty), 100):
+            dirty[i] = {"name": dirty[i]["name"]}
+        text = json.dumps(items, ensure_ascii=False)
+
+        def per_item():
+            return [model_class.model_validate(item) for item in items]
+
+        methods = {
+            "model_validate loop": per_item,
+            "validate_list": lambda: validate_list(model_class, items),
+            "validate_batch(1%无效)": lambda: validate_batch(model_class, dirty),
+            "validate_json_list": lambda: validate_json_list(model_class, text),
+        }
+        for method, func in methods.items():
+            ms = _time_ms(func, runs)
+            rows.append({"model": name, "method": method, "count": len(items), "ms": ms,
+                         "objects_per_s": round(len(items) * 1000 / ms)})
+    return rows
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="性能基准")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fmt_parser = subparsers.add_parser("output-format", help="JSON与紧凑行式输出格式对比")
+    fmt_parser.add_argument("--model", help="领域模型JSON文件，默认使用合成模型")
+    fmt_parser.add_argument("--usecases", type=int, default=10, help="合成模型的用例数量")
+    fmt_parser.add_argument("--runs", type=int, default=200, help="解析耗时重复次数（--live时为调用次数）")
+    fmt_parser.add_argument("--tps", type=float, default=60.0, help="估算生成耗时所用的输出吞吐(token/s)")
+    fmt_parser.add_argument("--live", action="store_true", help="实际调用模型比较completion token数和耗时")
+    index_parser = subparsers.add_parser("model-index", help="列表查找与索引查找的校验/导出耗时随规模的变化")
+    index_parser.add_argument("--sizes", default="1000,2000,5000,10000", help="合成模型的用例数量，逗号分隔")
+    index_parser.add_argument("--runs", type=int, default=5, help="每项耗时的重复次数")
+    diff_parser = subparsers.add_parser("model-diff", help="两个模型版本结构化对比的耗时随规模的变化")
+    diff_parser.add_argument("--sizes", default="1000,2000,5000,10000", help="合成模型的用例和类数量，逗号分隔")
+    diff_parser.add_argument("--runs", type=int, default=3, help="每项耗时的重复次数")
+    jsonl_parser = subparsers.add_parser("jsonl", help="整体JSON加载与JSONL按需读取的耗时和峰值内存")
+    jsonl_parser.add_argument("--sizes", default="1000,5000,20000", help="合成模型的用例和类数量，逗号分隔")
+    archive_parser = subparsers.add_parser("archive", help="归档的去重和字典压缩效果")
+    archive_parser.add_argument("--count", type=int, default=200, help="不同模型的数量")
+    archive_parser.add_argument("--usecases", type=int, default=8, help="每个合成模型的用例数量")
+    serialization_parser = subparsers.add_parser("serialization", help="领域模型JSON序列化方式的耗时和峰值内存")
+    serialization_parser.add_argument("--sizes", default="1000,5000,20000", help="合成模型的用例和类数量，逗号分隔")
+    serialization_parser.add_argument("--runs", type=int, default=3, help="每项耗时的重复次数")
+    validation_parser = subparsers.add_parser("validation", help="逐个校验、批量校验和JSON直接校验的吞吐")
+    validation_parser.add_argument("--count", type=int, default=20000, help="每种元素的数量")
+    validation_parser.add_argument("--runs", type=int, default=3, help="每项耗时的重复次数")
+    args = parser.parse_args()
+
+    if args.command == "validation":
+        print("\n✅ 校验吞吐（对象/秒）")
+        _print_rows(bench_validation(args.count, args.runs), ["model", "method", "count", "ms", "objects_per_s"])
+        return
+    if args.command == "serialization":
+        rows = bench_serialization([int(size) for size in args.sizes.split(",")], args.runs)
+        print("\n🧾 领域模型JSON序列化对比（缩进输出）")
+        _print_rows(rows, ["usecases", "method", "mb", "ms", "mb_per_s", "peak_mb"])
+        return
+    if args.command == "archive":
+        result = bench_archive(args.count, args.usecases)
+        print("\n🗜️ 归档存储大小（每个模型存入两次）")
+        _print_rows(result["rows"], ["method", "stored_bytes", "ratio"])
+        print(f"\n⏱️ 按哈希随机读取: {result['get_us']:.1f}us/次")
+        return
+    if args.command == "jsonl":
+        rows = bench_jsonl([int(size) for size in args.sizes.split(",")])
+        print("\n📄 整体JSON与流式JSONL读取对比")
+        _print_rows(rows, ["usecases", "json_mb", "jsonl_mb", "json_full_ms", "json_full_peak_mb", "jsonl_class_ms",
+                           "jsonl_class_peak_mb", "jsonl_sequence_ms", "jsonl_sequence_peak_mb"])
+        return
+    if args.command == "model-index":
+        rows = bench_model_index([int(size) for size in args.sizes.split(",")], args.runs)
+        print("\n🗂️ 用例图校验与PlantUML导出耗时（ms）")
+        _print_rows(rows, ["usecases", "list_ms", "index_ms", "plantuml_ms", "index_us_per_usecase"])
+        return
+    if args.command == "model-diff":
+        rows = bench_model_diff([int(size) for size in args.sizes.split(",")], args.runs)
+        print("\n🔀 模型结构化对比耗时")
+        _print_rows(rows, ["usecases", "elements", "diff_ms", "us_per_element", "changes"])
+        return
+    model = load_domain_model(args.model, args.usecases)
+    if args.command == "output-format":
+        if args.live:
+            print("\n🌐 在线对比（类图设计Agent）")
+            _print_rows(bench_output_format_live(model, args.runs), ["format", "completion_tokens", "latency_s", "parsed"])
+            return
+        result = bench_output_format(model, args.runs, args.tps)
+        print("\n📏 输出格式对比（token为本地估算）")
+        _print_rows(result["rows"] + [result["total"]],
+                    ["artifact", "json_tokens", "terse_tokens", "reduction", "json_parse_ms", "terse_parse_ms"])
+        total = result["total"]
+        print(f"\n⏱️ 按 {args.tps:.0f} token/s 估算生成耗时: JSON {total['json_generate_s']:.1f}s -> "
+              f"紧凑语法 {total['terse_generate_s']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
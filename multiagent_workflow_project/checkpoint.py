@@ -0,0 +1,196 @@
+"""
+运行检查点模块
+把每个阶段解析后的输出写入运行目录 <checkpoint_dir>/<run_id>/，按运行ID和输入哈希索引：
+运行在中途失败（网络、限流、Ctrl-C）后可以从最后完成的阶段继续，
+顺序图等按用例生成的单个产物也逐个保存，阶段未完成时同样可以续跑
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from config import config
+from validation import validate_list
+
+_MANIFEST = "manifest.json"
+_REQUIREMENTS = "requirements.txt"
+
+
+class CheckpointMismatch(ValueError):
+    """检查点与本次运行的输入不一致"""
+
+
+def input_hash(user_requirements: str, model: str) -> str:
+    """运行输入（需求文本和模型名）的哈希"""
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(user_requirements.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """先写临时文件再替换，中断时不会留下半个文件"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_value(value: Any) -> Any:
+    """把pydantic模型（或模型列表）转换为可JSON序列化的数据，其余值原样返回"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        return [dump_value(item) for item in value]
+    return value
+
+
+def load_value(data: Any, model_class=None) -> Any:
+    """dump_value的逆操作，model_class为None时原样返回；检查点文件可能被改动或由旧版本写入，读回时重新校验"""
+    if model_class is None:
+        return data
+    if isinstance(data, list):
+        return validate_list(model_class, data)
+    return model_class.model_validate(data)
+
+
+class RunCheckpoint:
+    """单次运行的检查点目录"""
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        self.directory = directory
+        self.manifest = manifest
+
+    @property
+    def run_id(self) -> str:
+        return self.manifest["run_id"]
+
+    @property
+    def input_hash(self) -> str:
+        return self.manifest["input_hash"]
+
+    @property
+    def completed_stages(self) -> List[str]:
+        return list(self.manifest["stages"])
+
+    @property
+    def requirements(self) -> str:
+        with open(os.path.join(self.directory, _REQUIREMENTS), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def verify(self, user_requirements: str, model: str) -> None:
+        """确认检查点是用同样的输入生成的，否则抛出CheckpointMismatch"""
+        actual = input_hash(user_requirements, model)
+        if actual != self.input_hash:
+            raise CheckpointMismatch(f"运行 {self.run_id} 的输入哈希为 {self.input_hash}，本次输入为 {actual}")
+
+    def has(self, stage: str) -> bool:
+        return stage in self.manifest["stages"]
+
+    def save(self, stage: str, value: Any) -> None:
+        """
+        保存阶段输出并标记该阶段已完成
+
+        Args:
+            stage: 阶段名称
+            value: 字符串、pydantic模型或模型列表
+        """
+        write_json_atomic(os.path.join(self.directory, f"{stage}.json"), dump_value(value))
+        if stage not in self.manifest["stages"]:
+            self.manifest["stages"].append(stage)
+        self._write_manifest()
+
+    def load(self, stage: str, model_class=None) -> Any:
+        """
+        读取已完成阶段的输出
+
+        Args:
+            stage: 阶段名称
+            model_class: 输出的模型类，None表示按原样返回（如字符串）
+        """
+        return load_value(_read_json(os.path.join(self.directory, f"{stage}.json")), model_class)
+
+    def _artifact_dir(self, stage: str) -> str:
+        return os.path.join(self.directory, stage)
+
+    def save_artifact(self, stage: str, key: str, value: Any) -> None:
+        """保存阶段内的单个产物（如某个用例的顺序图），文件名取key的哈希"""
+        directory = self._artifact_dir(stage)
+        os.makedirs(directory, exist_ok=True)
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        write_json_atomic(os.path.join(directory, f"{name}.json"), {"key": key, "value": dump_value(value)})
+
+    def load_artifacts(self, stage: str, model_class=None) -> Dict[str, Any]:
+        """读取阶段内已保存的单个产物 {key: 产物}"""
+        directory = self._artifact_dir(stage)
+        if not os.path.isdir(directory):
+            return {}
+        artifacts = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".json"):
+                data = _read_json(os.path.join(directory, filename))
+                artifacts[data["key"]] = load_value(data["value"], model_class)
+        return artifacts
+
+    def mark(self, status: str) -> None:
+        """记录运行状态（running/completed/failed/aborted）"""
+        self.manifest["status"] = status
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        self.manifest["updated_at"] = time.time()
+        write_json_atomic(os.path.join(self.directory, _MANIFEST), self.manifest)
+
+
+class CheckpointStore:
+    """检查点根目录，每次运行一个子目录"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or config.checkpoint_dir
+
+    def create(self, run_id: str, user_requirements: str, model: str) -> RunCheckpoint:
+        """为新运行创建检查点目录，并保存需求文本以便续跑"""
+        directory = os.path.join(self.root, run_id)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, _REQUIREMENTS), "w", encoding="utf-8") as f:
+            f.write(user_requirements)
+        now = time.time()
+        checkpoint = RunCheckpoint(directory, {
+            "run_id": run_id,
+            "input_hash": input_hash(user_requirements, model),
+            "model": model,
+            "status": "running",
+            "stages": [],
+            "created_at": now,
+            "updated_at": now,
+        })
+        checkpoint._write_manifest()
+        return checkpoint
+
+    def open(self, run_id: str) -> RunCheckpoint:
+        """打开已有运行的检查点，不存在时抛出FileNotFoundError"""
+        directory = os.path.join(self.root, run_id)
+        manifest_path = os.path.join(directory, _MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"未找到运行 {run_id} 的检查点: {directory}")
+        return RunCheckpoint(directory, _read_json(manifest_path))
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        """列出所有检查点的manifest，最近更新的在前"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = []
+        for run_id in os.listdir(self.root):
+            manifest_path = os.path.join(self.root, run_id, _MANIFEST)
+            if os.path.exists(manifest_path):
+                manifests.append(_read_json(manifest_path))
+        return sorted(manifests, key=lambda m: m.get("updated_at", 0), reverse=True)
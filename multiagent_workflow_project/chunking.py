@@ -0,0 +1,143 @@
+"""
+长文档切分模块
+超出单次Prompt合理长度的需求文档按标题/段落切分为带重叠的片段，
+片段大小按模型上下文窗口自动确定；工作流对片段并行分析（map），再合并为一份需求分析（reduce）
+"""
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, TypeVar
+
+from config import config
+from incremental import split_sections
+from ledger import estimate_tokens
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 按句末标点切分超长段落
+_SENTENCE_END = re.compile(r"(?<=[。！？；.!?;])")
+
+
+@dataclass
+class Chunk:
+    """文档片段"""
+    index: int
+    text: str
+    overlap: str = ""
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.overlap) + estimate_tokens(self.text)
+
+    def to_prompt(self, total: int) -> str:
+        header = f"（第{self.index + 1}/{total}段）"
+        if self.overlap:
+            return f"{header}\n[上文末尾，仅供衔接]\n{self.overlap}\n[本段内容]\n{self.text}"
+        return f"{header}\n{self.text}"
+
+
+def chunk_token_budget(model: str, reserved_tokens: int, max_chunk_tokens: int = None) -> int:
+    """
+    按模型上下文窗口确定每个片段的token上限
+
+    本地token估计有误差，只使用扣除指令和输出预留后剩余窗口的一半，且不超过max_chunk_tokens
+
+    Args:
+        model: 模型名称
+        reserved_tokens: 指令、任务说明和输出预留的token数
+        max_chunk_tokens: 片段大小上限，默认使用配置
+
+    Returns:
+        片段的token上限
+    """
+    max_chunk_tokens = max_chunk_tokens or config.requirements_chunk_tokens
+    context_tokens = config.model_context_tokens.get(model, config.model_context_tokens["default"])
+    return max(256, min(max_chunk_tokens, (context_tokens - reserved_tokens) // 2))
+
+
+def _split_oversized(text: str, max_tokens: int) -> List[str]:
+    """把超过上限的文本依次按段落、句子、字符切小"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for pattern in (re.compile(r"\n\s*\n"), re.compile(r"\n"), _SENTENCE_END):
+        pieces = [piece for piece in pattern.split(text) if piece.strip()]
+        if len(pieces) > 1:
+            return [part for piece in pieces for part in _split_oversized(piece, max_tokens)]
+    # 没有可用的分隔符时按字符硬切（中文按每字1个token估计）
+    return [text[i:i + max_tokens] for i in range(0, len(text), max_tokens)]
+
+
+def _tail(text: str, max_tokens: int) -> str:
+    """取文本末尾不超过max_tokens的部分，尽量从句子开头截取"""
+    if max_tokens <= 0:
+        return ""
+    tail = ""
+    for sentence in reversed([s for s in _SENTENCE_END.split(text) if s]):
+        if estimate_tokens(sentence + tail) > max_tokens:
+            break
+        tail = sentence + tail
+    return tail.strip() or text[-max_tokens:]
+
+
+def split_document(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[Chunk]:
+    """
+    按章节切分文档并贪心装箱为不超过max_tokens的片段，相邻片段带overlap_tokens的重叠
+
+    Args:
+        text: 文档文本
+        max_tokens: 片段正文的token上限
+        overlap_tokens: 重叠部分（上一片段末尾）的token上限
+
+    Returns:
+        Chunk列表；文档不超过上限时只有一个片段
+    """
+    pieces = [part for section in split_sections(text) for part in _split_oversized(section.text, max_tokens)]
+    chunks: List[Chunk] = []
+    buffer: List[str] = []
+    buffer_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if buffer and buffer_tokens + piece_tokens > max_tokens:
+            chunks.append(Chunk(len(chunks), "\n\n".join(buffer)))
+            buffer, buffer_tokens = [], 0
+        buffer.append(piece)
+        buffer_tokens += piece_tokens
+    if buffer:
+        chunks.append(Chunk(len(chunks), "\n\n".join(buffer)))
+    for previous, chunk in zip(chunks, chunks[1:]):
+        chunk.overlap = _tail(previous.text, overlap_tokens)
+    return chunks
+
+
+def group_by_tokens(texts: Sequence[str], max_tokens: int) -> List[List[str]]:
+    """把文本按顺序分组，每组总token数不超过max_tokens（单个超长文本独占一组）"""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def parallel_map(func: Callable[[T], R], items: Sequence[T], max_workers: int = None) -> List[R]:
+    """
+    在线程池中并行执行func并按输入顺序返回结果
+
+    每个任务在提交时复制当前contextvars上下文，追踪span能正确挂在调用方的span之下；
+    任一任务抛出异常时，在所有任务结束后重新抛出第一个异常
+    """
+    max_workers = max_workers or config.chunk_max_workers
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        return [future.result() for future in futures]
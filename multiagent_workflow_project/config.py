@@ -1,20 +1,90 @@
-import os
-from typing import Literal
-from pydantic import BaseModel
-
-class Config(BaseModel):
-    """项目配置类"""
-    base_url: str = "https://api.chatfire.cn/v1"
-    api_key: str = "sk-zO8exlBicZh7nJeZn5GuC5X9SPuVrZzXoGyOW0i9BFvN62ON"
-    proxy_host: str = "127.0.0.1"
-    proxy_port: int = 7890
-    model: str = "gpt-4o"
-    
-    class Config:
-        env_file = ".env"
-
-# 全局配置实例
-config = Config()
-
-# 代理设置 - 修正为httpx支持的格式
+import os
+from typing import Dict, Literal, Optional
+from pydantic import BaseModel
+
+class Config(BaseModel):
+    """项目配置类"""
+    base_url: str = "https://api.chatfire.cn/v1"
+    api_key: str = "sk-zO8exlBicZh7nJeZn5GuC5X9SPuVrZzXoGyOW0i9BFvN62ON"
+    proxy_host: str = "127.0.0.1"
+    proxy_port: int = 7890
+    model: str = "gpt-4o"
+    trace_enabled: bool = True
+    trace_dir: str = "output/traces"
+    log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_sample_rates: Dict[str, float] = {}
+    raw_output_buffer_size: int = 50
+    ledger_enabled: bool = True
+    ledger_path: str = "output/token_ledger.sqlite3"
+    token_budget: Optional[int] = None
+    prompt_compaction_report: bool = True
+    # Agent输出格式：{Agent变量名: "json"/"terse"}，如 {"class_diagram_designer": "terse"}
+    output_formats: Dict[str, str] = {}
+    # 顺序图批处理：每次请求合并的用例数按输出token预算自适应选择
+    sequence_batching: bool = False
+    sequence_batch_output_tokens: int = 3000
+    sequence_batch_max_size: int = 8
+    # 单个产物解析失败后的定向重试次数（重试时附带解析错误作为反馈）
+    artifact_max_retries: int = 2
+    # 运行检查点：每个阶段的输出写入 <checkpoint_dir>/<run_id>/，用于 run.py --resume 续跑
+    checkpoint_enabled: bool = True
+    checkpoint_dir: str = "output/checkpoints"
+    # 阶段缓存：按Prompt版本、上游输入哈希和模型参数跨运行复用阶段输出
+    memo_enabled: bool = True
+    memo_dir: str = "output/memo"
+    # 增量建模：需求变更章节占比超过该值时退回完整运行
+    incremental_max_change_ratio: float = 0.5
+    # 长需求文档：片段大小按模型上下文窗口（token）自动确定，不超过requirements_chunk_tokens；片段并行分析后合并
+    model_context_tokens: Dict[str, int] = {"gpt-4o": 128000, "default": 16000}
+    requirements_chunk_tokens: int = 8000
+    requirements_chunk_overlap_tokens: int = 200
+    chunk_max_workers: int = 4
+    # 大型系统：用例数达到sharding_min_usecases时按子系统分片，各子系统并行生成类图和OCL约束后合并
+    sharding_min_usecases: int = 40
+    shard_max_usecases: int = 15
+    shard_max_workers: int = 4
+    # 实体消解：按同义词表和字符n-gram相似度合并同一概念的不同命名（参与者、系统、类）
+    entity_resolution_enabled: bool = True
+    entity_similarity_threshold: float = 0.88
+    entity_synonyms: Dict[str, str] = {
+        "客户": "顾客", "customer": "顾客", "client": "顾客", "user": "用户", "admin": "管理员",
+        "administrator": "管理员", "book": "图书", "书籍": "图书", "order": "订单", "payment": "支付",
+        "system": "系统", "account": "账户", "帐户": "账户", "cart": "购物车", "item": "项", "inventory": "库存",
+    }
+    # PlantUML导出：顺序图数量达到阈值时用进程池并行写入；节点数超过预算的用例图/类图分页导出
+    plantuml_workers: int = 4
+    plantuml_parallel_min_diagrams: int = 50
+    plantuml_max_nodes: int = 120
+    # 模型对比：未按名称精确匹配的元素，名称相似度达到阈值时视为重命名
+    diff_similarity_threshold: float = 0.8
+    diff_report_limit: int = 50
+    # 模型仓库：按元素拆表保存每次运行的领域模型，支持按类名等跨模型查询
+    model_store_enabled: bool = True
+    model_store_path: str = "output/models.sqlite3"
+    # 内容寻址归档：codec为None时安装了zstandard用zstd，否则用zlib；同种类内容达到min_samples个后自动训练压缩字典
+    archive_enabled: bool = True
+    archive_dir: str = "output/archive"
+    archive_codec: Optional[str] = None
+    archive_level: int = 6
+    archive_dict_size: int = 32 * 1024
+    archive_dict_min_samples: int = 20
+    archive_dict_max_samples: int = 200
+    # 垃圾回收只删除超过保留期仍没有引用的内容，避免删除并发运行刚存入、尚未建立引用的内容
+    archive_gc_grace_seconds: float = 3600
+    # JSON序列化：pydantic（Rust序列化器）/orjson（需安装）/json
+    serialization_backend: Literal["pydantic", "orjson", "json"] = "pydantic"
+    serialization_pretty: bool = True
+    # 单价：美元/百万token
+    token_prices: Dict[str, Dict[str, float]] = {
+        "gpt-4o": {"prompt": 2.5, "cached": 1.25, "completion": 10.0},
+    }
+    
+    class Config:
+        env_file = ".env"
+
+# 全局配置实例
+config = Config()
+
+# 代理设置 - 修正为httpx支持的格式
 PROXIES = f"http://{config.proxy_host}:{config.proxy_port}" 
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+实体消解模块
+不同Agent（以及分片合并的不同子系统）对同一概念的命名常不一致：“顾客”/“客户”、“Book”/“图书”、“PaymentSystem”/“支付系统”，
+导致用例图校验找不到参与者、合并后的模型出现重复的类。
+名称先经同义词表归一（英文按驼峰拆词后逐词翻译），再用NumPy对全部名称的字符n-gram向量批量计算余弦相似度，
+相似的名称用并查集聚为一组，最后一次性把模型中的引用改写为每组的规范名称
+"""
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import config
+from dsl_models import DomainModel
+from sharding import DisjointSet, merge_class_diagrams
+
+# 驼峰拆词：PaymentSystem -> Payment System，HTTPServer -> HTTP Server
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+_TOKEN = re.compile(r"[a-z]+|\d+|[^\x00-\x7f]+")
+
+
+def canonical_form(name: str, synonyms: Optional[Dict[str, str]] = None) -> str:
+    """
+    名称的比较形式：全半角统一、英文按词经同义词表翻译、中文按同义词表替换，忽略大小写和分隔符
+
+    Args:
+        name: 原名称
+        synonyms: 同义词表 {词: 规范词}，英文词用小写，默认使用配置
+    """
+    synonyms = config.entity_synonyms if synonyms is None else synonyms
+    text = _CAMEL.sub(" ", unicodedata.normalize("NFKC", name or "")).lower()
+    cjk_terms = sorted((term for term in synonyms if not term.isascii()), key=len, reverse=True)
+    tokens = []
+    for token in _TOKEN.findall(text):
+        if token.isascii():
+            # 英文复数按单数查同义词表
+            if token not in synonyms and token.endswith("s") and token[:-1] in synonyms:
+                token = token[:-1]
+            tokens.append(synonyms.get(token, token))
+            continue
+        for term in cjk_terms:
+            token = token.replace(term, synonyms[term])
+        tokens.append(token)
+    return "".join(tokens)
+
+
+def _ngram_vectors(forms: Sequence[str], dims: int) -> np.ndarray:
+    """字符1-gram和2-gram按哈希映射到dims维的0/1向量（n-gram集合）"""
+    rows, cols = [], []
+    for row, form in enumerate(forms):
+        grams = list(form) + [form[i:i + 2] for i in range(len(form) - 1)]
+        rows.extend([row] * len(grams))
+        cols.extend(zlib.crc32(gram.encode("utf-8")) % dims for gram in grams)
+    vectors = np.zeros((len(forms), dims), dtype=np.float32)
+    vectors[np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)] = 1.0
+    return vectors
+
+
+def similar_pairs(forms: Sequence[str], threshold: float, dims: int = 512, block_size: int = 1024) -> Iterable[Tuple[int, int]]:
+    """
+    余弦相似度不低于threshold的名称对 (i, j)，每对只出现一次
+
+    集合向量的余弦相似度不超过 sqrt(较小集合大小 / 较大集合大小)：按n-gram数排序后，
+    每块名称只需与n-gram数在 [最小值 × threshold², 最大值 / threshold²] 内的连续一段做矩阵乘法，
+    内存占用为 block_size × 候选数，数万个名称也不会生成完整的相似度矩阵
+    """
+    vectors = _ngram_vectors(forms, dims)
+    sizes = vectors.sum(axis=1)
+    order = np.argsort(sizes, kind="stable")
+    vectors, sizes = vectors[order], sizes[order]
+    normalized = vectors / np.sqrt(np.maximum(sizes, 1.0))[:, None]
+    bound = threshold * threshold
+    for start in range(0, len(forms), block_size):
+        end = min(start + block_size, len(forms))
+        stop = int(np.searchsorted(sizes, sizes[end - 1] / bound, side="right"))
+        similarity = normalized[start:end] @ normalized[start:stop].T
+        rows, cols = np.nonzero(similarity >= threshold - 1e-6)
+        keep = cols > rows
+        yield from zip(order[rows[keep] + start].tolist(), order[cols[keep] + start].tolist())
+
+
+@dataclass
+class NameResolution:
+    """一个命名空间内的消解结果"""
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+    def __call__(self, name: str) -> str:
+        return self.aliases.get(name, name)
+
+    def clusters(self) -> Dict[str, List[str]]:
+        """{规范名称: [别名]}"""
+        groups: Dict[str, List[str]] = {}
+        for alias, canonical in self.aliases.items():
+            groups.setdefault(canonical, []).append(alias)
+        return groups
+
+
+def resolve_names(names: Sequence[str], preferred: Iterable[str] = (), threshold: Optional[float] = None,
+                  synonyms: Optional[Dict[str, str]] = None) -> NameResolution:
+    """
+    把同一概念的不同名称聚为一组并选出规范名称
+
+    Args:
+        names: 名称的全部出现（可重复，出现次数用于选择规范名称）
+        preferred: 优先作为规范名称的名称（如类图中声明的类名）
+        threshold: n-gram余弦相似度阈值，默认使用配置
+        synonyms: 同义词表，默认使用配置
+
+    Returns:
+        NameResolution，只包含需要改写的名称
+    """
+    threshold = config.entity_similarity_threshold if threshold is None else threshold
+    counts: Dict[str, int] = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+    distinct = list(counts)
+    first_seen = {name: i for i, name in enumerate(distinct)}
+    # 比较形式相同的名称直接归为一组，只对不同的比较形式计算相似度
+    forms: Dict[str, int] = {}
+    form_of = [forms.setdefault(canonical_form(name, synonyms), len(forms)) for name in distinct]
+    groups = DisjointSet(range(len(forms)))
+    for i, j in similar_pairs(list(forms), threshold):
+        groups.union(i, j)
+
+    preferred = set(preferred)
+    members: Dict[int, List[str]] = {}
+    for name, form in zip(distinct, form_of):
+        members.setdefault(groups.find(form), []).append(name)
+    resolution = NameResolution()
+    for group in members.values():
+        if len(group) == 1:
+            continue
+        # 声明过的名称优先，其次出现次数多的，再次先出现的
+        canonical = max(group, key=lambda name: (name in preferred, counts[name], -first_seen[name]))
+        resolution.aliases.update({name: canonical for name in group if name != canonical})
+    return resolution
+
+
+def _dedupe(names: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(names))
+
+
+def resolve_domain_model(model: DomainModel, threshold: Optional[float] = None) -> Tuple[DomainModel, Dict[str, Dict[str, str]]]:
+    """
+    消解领域模型中参与者/系统名称和类名，并把所有引用改写为规范名称
+
+    参与者、顺序图中的参与者和系统属于一个命名空间，类名、关系两端、OCL上下文和属性类型属于另一个命名空间，
+    两者分别消解（同名的参与者和类可以同时存在）；合并后同名的参与者、类和关系会去重
+
+    Returns:
+        (改写后的模型, {"participants": {别名: 规范名称}, "classes": {别名: 规范名称}})
+    """
+    usecase_diagram, class_diagram = model.usecase_diagram, model.class_diagram
+    participant_names = [actor.name for actor in usecase_diagram.actors] + [usecase.actor for usecase in usecase_diagram.usecases]
+    for diagram in model.sequence_diagrams:
+        participant_names += diagram.actors + diagram.systems
+        participant_names += [name for message in diagram.messages for name in (message.sender, message.receiver)]
+    class_names = [cls.name for cls in class_diagram.classes] + [constraint.context for constraint in model.ocl_constraints]
+    class_names += [name for r in class_diagram.relationships for name in (r.source, r.target)]
+
+    participant = resolve_names(participant_names, [actor.name for actor in usecase_diagram.actors], threshold)
+    class_name = resolve_names(class_names, [cls.name for cls in class_diagram.classes], threshold)
+    report = {"participants": participant.aliases, "classes": class_name.aliases}
+    if not participant.aliases and not class_name.aliases:
+        return model, report
+
+    actors: Dict[str, object] = {}
+    for actor in usecase_diagram.actors:
+        name = participant(actor.name)
+        if name not in actors:
+            actors[name] = actor.model_copy(update={"name": name})
+        elif not actors[name].description and actor.description:
+            actors[name] = actors[name].model_copy(update={"description": actor.description})
+    usecase_diagram = usecase_diagram.model_copy(update={
+        "actors": list(actors.values()),
+        "usecases": [usecase.model_copy(update={"actor": participant(usecase.actor)}) for usecase in usecase_diagram.usecases],
+    })
+    sequence_diagrams = [
+        diagram.model_copy(update={
+            "actors": _dedupe(participant(name) for name in diagram.actors),
+            "systems": _dedupe(participant(name) for name in diagram.systems),
+            "messages": [message.model_copy(update={"sender": participant(message.sender), "receiver": participant(message.receiver)})
+                         for message in diagram.messages],
+        })
+        for diagram in model.sequence_diagrams
+    ]
+    renamed = class_diagram.model_copy(update={
+        "classes": [
+            cls.model_copy(update={
+                "name": class_name(cls.name),
+                "attributes": [attribute.model_copy(update={"type": class_name(attribute.type)}) for attribute in cls.attributes],
+            })
+            for cls in class_diagram.classes
+        ],
+        "relationships": [r.model_copy(update={"source": class_name(r.source), "target": class_name(r.target)})
+                          for r in class_diagram.relationships],
+    })
+    class_diagram, _ = merge_class_diagrams([renamed])
+    ocl_constraints = [constraint.model_copy(update={"context": class_name(constraint.context)}) for constraint in model.ocl_constraints]
+    return model.model_copy(update={
+        "usecase_diagram": usecase_diagram,
+        "sequence_diagrams": sequence_diagrams,
+        "class_diagram": class_diagram,
+        "ocl_constraints": ocl_constraints,
+    }), report
@@ -0,0 +1,197 @@
+"""
+结构化事件日志模块
+基于标准库logging的分级事件日志，支持按事件名采样，
+并用有界环形缓冲区保存最近的Agent原始输出，便于事后排查
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from config import config
+
+_LOGGER_ROOT = "multiagent"
+
+
+class RawOutputBuffer:
+    """最近Agent原始输出的环形缓冲区（线程安全，容量有界）"""
+
+    def __init__(self, maxlen: int = 50, max_chars: int = 20000):
+        self.max_chars = max_chars
+        self._entries: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, source: str, text: Optional[str], **context: Any) -> None:
+        """
+        记录一条原始输出
+
+        Args:
+            source: 输出来源（通常为Agent名称）
+            text: 原始文本，超过max_chars的部分会被截断
+            **context: 附加上下文，如模型名、阶段
+        """
+        text = text or ""
+        entry = {
+            "ts": time.time(),
+            "source": source,
+            "length": len(text),
+            "text": text[:self.max_chars],
+            "truncated": len(text) > self.max_chars,
+        }
+        entry.update(context)
+        with self._lock:
+            self._entries.append(entry)
+
+    def recent(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """返回最近的n条记录（默认全部），按时间先后排列"""
+        with self._lock:
+            entries = list(self._entries)
+        return entries if n is None else entries[-n:]
+
+    def dump(self, path: str) -> str:
+        """
+        将缓冲区内容写入JSON Lines文件
+
+        Args:
+            path: 输出文件路径
+
+        Returns:
+            输出文件路径
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in self.recent():
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write("\n")
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SamplingFilter(logging.Filter):
+    """按事件名采样的过滤器；WARNING及以上级别的事件总是保留"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, seed: Optional[int] = None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._random = random.Random(seed)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", ""), 1.0)
+        return rate >= 1.0 or self._random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """每条事件输出一行JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", ""),
+        }
+        message = record.getMessage()
+        if message and message != data["event"]:
+            data["message"] = message
+        data.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """面向终端的单行文本格式：时间 级别 事件 消息 key=value"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        parts = [
+            time.strftime("%H:%M:%S", time.localtime(record.created)),
+            record.levelname,
+            getattr(record, "event", "") or record.name,
+        ]
+        message = record.getMessage()
+        if message and message != getattr(record, "event", ""):
+            parts.append(message)
+        parts.extend(f"{k}={v}" for k, v in getattr(record, "fields", {}).items())
+        text = " ".join(str(p) for p in parts)
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class EventLogger:
+    """结构化事件日志器：logger.info("stage.start", "步骤1", stage="...")"""
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(f"{_LOGGER_ROOT}.{name}")
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level: int, event: str, message: str, fields: Dict[str, Any], exc_info: bool = False) -> None:
+        # 级别未开启时直接返回，避免热路径上的格式化开销
+        if not self._logger.isEnabledFor(level):
+            return
+        self._logger.log(level, message or event, extra={"event": event, "fields": fields}, exc_info=exc_info)
+
+    def debug(self, event: str, message: str = "", **fields: Any) -> None:
+        self._log(logging.DEBUG, event, message, fields)
+
+    def info(self, event: str, message: str = "", **fields: Any) -> None:
+        self._log(logging.INFO, event, message, fields)
+
+    def warning(self, event: str, message: str = "", **fields: Any) -> None:
+        self._log(logging.WARNING, event, message, fields)
+
+    def error(self, event: str, message: str = "", exc_info: bool = False, **fields: Any) -> None:
+        self._log(logging.ERROR, event, message, fields, exc_info=exc_info)
+
+
+def get_logger(name: str) -> EventLogger:
+    """获取指定模块的事件日志器"""
+    return EventLogger(name)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      sample_rates: Optional[Dict[str, float]] = None, stream=None) -> logging.Logger:
+    """
+    配置事件日志输出，只应在入口脚本中调用
+
+    Args:
+        level: 日志级别，默认使用配置中的log_level
+        fmt: "text" 或 "json"，默认使用配置中的log_format
+        sample_rates: {事件名: 采样率}，默认使用配置中的log_sample_rates
+        stream: 输出流，默认stderr
+
+    Returns:
+        根日志器
+    """
+    root = logging.getLogger(_LOGGER_ROOT)
+    root.setLevel((level or config.log_level).upper())
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if (fmt or config.log_format) == "json" else TextFormatter())
+    handler.addFilter(SamplingFilter(config.log_sample_rates if sample_rates is None else sample_rates))
+    root.addHandler(handler)
+    return root
+
+
+# 全局原始输出缓冲区
+raw_outputs = RawOutputBuffer(maxlen=config.raw_output_buffer_size)
@@ -0,0 +1,96 @@
+"""
+产物失败队列模块
+记录解析或校验失败的单个产物（某个用例的顺序图、一批无效的OCL约束等），
+工作流对队列中的失败做有限次数的定向重试（把解析错误作为反馈），最终汇总为完整性报告
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ArtifactFailure:
+    """单个产物的失败记录"""
+    kind: str
+    key: str
+    error: str
+    raw_output: str = ""
+    attempts: int = 0
+    resolved: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "error": self.error,
+            "attempts": self.attempts,
+            "resolved": self.resolved,
+        }
+
+
+class FailureQueue:
+    """产物失败队列"""
+
+    def __init__(self, max_retries: int = 2, max_feedback_chars: int = 2000):
+        """
+        Args:
+            max_retries: 每个产物最多的重试次数
+            max_feedback_chars: 作为反馈附带的上次输出的最大长度
+        """
+        self.max_retries = max_retries
+        self.max_feedback_chars = max_feedback_chars
+        self._failures: List[ArtifactFailure] = []
+
+    def add(self, kind: str, key: str, error: str, raw_output: Optional[str] = "") -> ArtifactFailure:
+        """记录一个失败的产物"""
+        failure = ArtifactFailure(kind=kind, key=key, error=error, raw_output=raw_output or "", errors=[error])
+        self._failures.append(failure)
+        return failure
+
+    def pending(self, kind: Optional[str] = None) -> List[ArtifactFailure]:
+        """未解决且仍可重试的失败"""
+        return [f for f in self._failures if self.can_retry(f) and (kind is None or f.kind == kind)]
+
+    def can_retry(self, failure: ArtifactFailure) -> bool:
+        """该失败是否还能继续重试"""
+        return not failure.resolved and failure.attempts < self.max_retries
+
+    def unresolved(self, kind: Optional[str] = None) -> List[ArtifactFailure]:
+        """最终未能恢复的失败"""
+        return [f for f in self._failures if not f.resolved and (kind is None or f.kind == kind)]
+
+    def feedback(self, failure: ArtifactFailure) -> List[tuple]:
+        """重试时追加在Prompt末尾的反馈段落：上次输出和解析错误"""
+        sections = []
+        if failure.raw_output:
+            sections.append(("上次输出", failure.raw_output[:self.max_feedback_chars]))
+        sections.append(("解析错误", failure.error))
+        return sections
+
+    def record_attempt(self, failure: ArtifactFailure, error: Optional[str] = None, raw_output: Optional[str] = None) -> None:
+        """记录一次重试：error为None表示恢复成功"""
+        failure.attempts += 1
+        if error is None:
+            failure.resolved = True
+            return
+        failure.error = error
+        failure.errors.append(error)
+        if raw_output is not None:
+            failure.raw_output = raw_output
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        汇总失败和重试情况
+
+        Returns:
+            {"failed", "recovered", "retry_calls", "unresolved": [失败记录]}
+        """
+        return {
+            "failed": len(self._failures),
+            "recovered": sum(1 for f in self._failures if f.resolved),
+            "retry_calls": sum(f.attempts for f in self._failures),
+            "unresolved": [f.to_dict() for f in self.unresolved()],
+        }
+
+    def __len__(self) -> int:
+        return len(self._failures)
@@ -0,0 +1,240 @@
+"""
+增量建模模块
+需求文档通常一次只改动一两个段落：把新旧需求文本按章节切分并做章节级diff，
+只让Agent更新受影响的用例和类，再把增量结果合并回上一次运行的领域模型
+"""
+import hashlib
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Iterable, List, Tuple, TypeVar
+
+from dsl_models import (
+    ClassDiagramDelta, ConceptualClassDiagram, OCLConstraint, SystemSequenceDiagram,
+    UseCaseDelta, UseCaseDiagram
+)
+
+T = TypeVar("T")
+
+# 章节标题：Markdown标题、"1."/"1.2"/"1、"编号、"一、"中文编号、"第X章/节/部分"
+_HEADING = re.compile(
+    r"^\s*(#{1,6}\s+\S.*|\d+(\.\d+)*[.、)）]\s*\S.*|\d+(\.\d+)+\s+\S.*|[一二三四五六七八九十]+[、.．]\s*\S.*"
+    r"|第[一二三四五六七八九十百\d]+[章节部分条].*)$"
+)
+
+
+@dataclass
+class Section:
+    """需求文档的一个章节（无标题时为一个段落）"""
+    title: str
+    text: str
+
+    @property
+    def digest(self) -> str:
+        # 忽略空白差异，只有内容变化才算修改
+        normalized = re.sub(r"\s+", " ", self.text).strip()
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def label(self) -> str:
+        return self.title or self.text.strip().splitlines()[0][:30]
+
+
+def split_sections(text: str) -> List[Section]:
+    """
+    按标题切分需求文本；没有识别到标题时按空行切分为段落
+
+    Returns:
+        Section列表，标题行包含在章节文本中
+    """
+    lines = text.strip().splitlines()
+    if any(_HEADING.match(line) for line in lines):
+        sections: List[Section] = []
+        title, buffer = "", []
+        for line in lines:
+            if _HEADING.match(line):
+                if any(item.strip() for item in buffer):
+                    sections.append(Section(title, "\n".join(buffer).strip()))
+                title, buffer = line.strip().lstrip("#").strip(), [line]
+            else:
+                buffer.append(line)
+        if any(item.strip() for item in buffer):
+            sections.append(Section(title, "\n".join(buffer).strip()))
+        return sections
+    paragraphs = re.split(r"\n\s*\n", text.strip())
+    return [Section("", paragraph.strip()) for paragraph in paragraphs if paragraph.strip()]
+
+
+@dataclass
+class RequirementsDiff:
+    """新旧需求文本的章节级差异"""
+    added: List[Section] = field(default_factory=list)
+    removed: List[Section] = field(default_factory=list)
+    changed: List[Tuple[Section, Section]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    @property
+    def change_ratio(self) -> float:
+        """变更章节占全部章节的比例"""
+        touched = len(self.added) + len(self.removed) + len(self.changed)
+        return touched / max(touched + self.unchanged, 1)
+
+    def to_prompt(self) -> str:
+        """作为Prompt负载的变更描述"""
+        parts = [f"【新增】\n{section.text}" for section in self.added]
+        parts += [f"【修改】\n原文：\n{old.text}\n修改后：\n{new.text}" for old, new in self.changed]
+        parts += [f"【删除】\n{section.text}" for section in self.removed]
+        return "\n\n".join(parts)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "added": [section.label() for section in self.added],
+            "removed": [section.label() for section in self.removed],
+            "changed": [new.label() for _, new in self.changed],
+            "unchanged": self.unchanged,
+            "change_ratio": round(self.change_ratio, 4),
+        }
+
+
+def diff_requirements(old_text: str, new_text: str) -> RequirementsDiff:
+    """
+    计算新旧需求文本的章节级diff
+
+    Args:
+        old_text: 上一次运行的需求文本
+        new_text: 新的需求文本
+
+    Returns:
+        RequirementsDiff；同一位置被替换的章节按顺序配对为修改，多出的部分记为新增或删除
+    """
+    old_sections, new_sections = split_sections(old_text), split_sections(new_text)
+    matcher = SequenceMatcher(None, [s.digest for s in old_sections], [s.digest for s in new_sections], autojunk=False)
+    diff = RequirementsDiff()
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            diff.unchanged += i2 - i1
+            continue
+        old_part, new_part = old_sections[i1:i2], new_sections[j1:j2]
+        paired = min(len(old_part), len(new_part))
+        diff.changed.extend(zip(old_part[:paired], new_part[:paired]))
+        diff.removed.extend(old_part[paired:])
+        diff.added.extend(new_part[paired:])
+    return diff
+
+
+def merge_by_name(items: Iterable[T], updates: Iterable[T], removed: Iterable[str] = (),
+                  key: Callable[[T], str] = lambda item: item.name) -> List[T]:
+    """按名称合并：同名项原位替换，新项追加在末尾，removed中的名称被删除"""
+    removed = set(removed)
+    updates_by_key = {key(item): item for item in updates}
+    merged = [updates_by_key.pop(key(item), item) for item in items if key(item) not in removed]
+    return merged + [item for name, item in updates_by_key.items() if name not in removed]
+
+
+def merge_usecase_delta(diagram: UseCaseDiagram, delta: UseCaseDelta) -> UseCaseDiagram:
+    """把用例增量合并到用例图，并清理对已删除用例的包含/扩展引用"""
+    removed = set(delta.removed_usecases)
+    usecases = merge_by_name(diagram.usecases, delta.usecases, removed)
+    if removed:
+        usecases = [
+            usecase.model_copy(update={
+                "includes": [name for name in usecase.includes if name not in removed],
+                "extends": [name for name in usecase.extends if name not in removed],
+            })
+            for usecase in usecases
+        ]
+    return diagram.model_copy(update={
+        "actors": merge_by_name(diagram.actors, delta.actors),
+        "usecases": usecases,
+    })
+
+
+def _relationship_key(relationship) -> str:
+    return f"{relationship.source}->{relationship.target}:{relationship.name}"
+
+
+def merge_class_delta(diagram: ConceptualClassDiagram, delta: ClassDiagramDelta) -> ConceptualClassDiagram:
+    """把类增量合并到类图，删除的类连同其关系一并移除"""
+    removed = set(delta.removed_classes)
+    relationships = merge_by_name(diagram.relationships, delta.relationships, key=_relationship_key)
+    return diagram.model_copy(update={
+        "classes": merge_by_name(diagram.classes, delta.classes, removed),
+        "relationships": [r for r in relationships if r.source not in removed and r.target not in removed],
+    })
+
+
+def diagrams_by_usecase(usecase_names: List[str], diagrams: List[SystemSequenceDiagram]) -> Dict[str, SystemSequenceDiagram]:
+    """按名称包含关系把顺序图对应到用例，较长的用例名称优先匹配"""
+    remaining = list(diagrams)
+    matched: Dict[str, SystemSequenceDiagram] = {}
+    for name in sorted(usecase_names, key=len, reverse=True):
+        for diagram in remaining:
+            if name in diagram.name:
+                matched[name] = diagram
+                remaining.remove(diagram)
+                break
+    return matched
+
+
+def merge_sequence_diagrams(usecase_names: List[str], previous: List[SystemSequenceDiagram],
+                            updated: Dict[str, SystemSequenceDiagram]) -> List[SystemSequenceDiagram]:
+    """
+    按用例顺序组装顺序图：受影响的用例使用新生成的顺序图，其余沿用上一次的结果
+
+    Args:
+        usecase_names: 合并后用例图中的用例名称
+        previous: 上一次运行的顺序图
+        updated: 本次重新生成的 {用例名: 顺序图}
+    """
+    matched = diagrams_by_usecase(usecase_names, previous)
+    merged = []
+    for name in usecase_names:
+        diagram = updated.get(name) or matched.get(name)
+        if diagram is not None:
+            merged.append(diagram)
+    return merged
+
+
+def merge_ocl_constraints(previous: List[OCLConstraint], updated: List[OCLConstraint],
+                          updated_classes: Iterable[str], removed_classes: Iterable[str] = (),
+                          failed_classes: Iterable[str] = ()) -> List[OCLConstraint]:
+    """
+    合并重新生成的OCL约束，同名约束去重
+
+    受影响的类只有在重新生成得到了该类的约束时才整体替换旧约束；生成失败（返回空结果）或
+    仍有未解决失败的类保留旧约束，新约束按名称合并进来。已删除类的约束被移除
+
+    Args:
+        previous: 上一次运行的约束
+        updated: 本次重新生成的约束
+        updated_classes: 重新生成约束的类
+        removed_classes: 已删除的类
+        failed_classes: OCL生成仍有未解决失败的类
+    """
+    regenerated = {constraint.context for constraint in updated} & set(updated_classes)
+    dropped = (regenerated - set(failed_classes)) | set(removed_classes)
+    kept = [constraint for constraint in previous if constraint.context not in dropped]
+    return merge_by_name(kept, updated)
+
+
+def usecase_subset(diagram: UseCaseDiagram, names: Iterable[str]) -> UseCaseDiagram:
+    """只包含指定用例（及其参与者）的用例图子集"""
+    names = set(names)
+    usecases = [usecase for usecase in diagram.usecases if usecase.name in names]
+    actors = {usecase.actor for usecase in usecases}
+    return diagram.model_copy(update={
+        "actors": [actor for actor in diagram.actors if actor.name in actors],
+        "usecases": usecases,
+    })
+
+
+def class_subset(diagram: ConceptualClassDiagram, names: Iterable[str]) -> ConceptualClassDiagram:
+    """只包含指定类及与其相连的关系的类图子集"""
+    names = set(names)
+    return diagram.model_copy(update={
+        "classes": [cls for cls in diagram.classes if cls.name in names],
+        "relationships": [r for r in diagram.relationships if r.source in names or r.target in names],
+    })
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token与费用记账模块
+按运行(run)、阶段(stage)和Agent记录每次completion的usage及本地预估token数，
+写入SQLite账本，并提供命令行报表和token预算告警
+
+用法:
+    python ledger.py report [--db PATH] [--limit N] [--days N]
+"""
+import argparse
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    usecase_count INTEGER,
+    token_budget INTEGER
+);
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    estimated_prompt_tokens INTEGER,
+    cost REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usage_run ON usage(run_id);
+CREATE INDEX IF NOT EXISTS idx_usage_stage_agent ON usage(stage, agent);
+CREATE INDEX IF NOT EXISTS idx_usage_created ON usage(created_at);
+"""
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """运行消耗的token超过预算上限"""
+
+
+def _is_cjk(ch: str) -> bool:
+    code = ord(ch)
+    return 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0x3000 <= code <= 0x303F or 0xFF00 <= code <= 0xFFEF
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    本地粗略估计文本的token数（不依赖分词器）
+    中日韩字符按每字1个token计，其余字符按每4个字符1个token计
+
+    Args:
+        text: 文本
+
+    Returns:
+        预估token数
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if _is_cjk(ch))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """预估一组chat消息的prompt token数（每条消息额外计4个token的格式开销）"""
+    return sum(estimate_tokens(m.get("content") or "") + 4 for m in messages) + 2
+
+
+def compute_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    按配置中的单价（美元/百万token）计算一次调用的费用
+
+    Args:
+        model: 模型名称
+        prompt_tokens: 输入token数（包含缓存命中部分）
+        completion_tokens: 输出token数
+        cached_tokens: 缓存命中的输入token数
+
+    Returns:
+        费用（美元）
+    """
+    prices = config.token_prices.get(model)
+    if not prices:
+        return 0.0
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * prices.get("prompt", 0.0)
+            + cached_tokens * prices.get("cached", prices.get("prompt", 0.0))
+            + completion_tokens * prices.get("completion", 0.0)) / 1_000_000
+
+
+class TokenBudget:
+    """
+    单次运行的token预算；超过上限时抛出TokenBudgetExceeded以中止运行
+
+    并行调用在开始时预留预估消耗、完成时按实际用量结算，检查时计入所有进行中调用的预留，
+    避免多个调用同时通过检查后一起超出上限（本类不加锁，由调用方串行化）
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.used = 0
+        self.reserved = 0
+
+    def check(self, estimated: int = 0) -> None:
+        """调用前检查：已用token、进行中调用的预留加上预估消耗是否超过上限"""
+        if self.limit is not None and self.used + self.reserved + estimated > self.limit:
+            raise TokenBudgetExceeded(
+                f"token预算超限: 已用 {self.used} + 预留 {self.reserved} + 预估 {estimated} > 上限 {self.limit}"
+            )
+
+    def reserve(self, estimated: int) -> None:
+        """调用开始时检查并预留预估消耗"""
+        self.check(estimated)
+        self.reserved += estimated
+
+    def release(self, estimated: int) -> None:
+        """释放预留（调用失败时）"""
+        self.reserved -= estimated
+
+    def settle(self, estimated: int, tokens: int) -> None:
+        """调用完成时释放预留并记入实际消耗"""
+        self.release(estimated)
+        self.add(tokens)
+
+    def add(self, tokens: int) -> None:
+        """累加实际消耗并检查是否超限"""
+        self.used += tokens
+        if self.limit is not None and self.used > self.limit:
+            raise TokenBudgetExceeded(f"token预算超限: 已用 {self.used} > 上限 {self.limit}")
+
+
+class TokenLedger:
+    """基于SQLite的token账本（线程安全）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.ledger_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def start_run(self, run_id: str, token_budget: Optional[int] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, started_at, status, token_budget) VALUES (?, ?, 'running', ?)",
+                (run_id, time.time(), token_budget),
+            )
+
+    def finish_run(self, run_id: str, status: str, usecase_count: Optional[int] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ?, usecase_count = ? WHERE run_id = ?",
+                (time.time(), status, usecase_count, run_id),
+            )
+
+    def record(self, run_id: str, stage: str, agent: str, model: str, usage: Any,
+               estimated_prompt_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        记录一次completion的usage
+
+        Args:
+            run_id: 运行ID
+            stage: 阶段名称
+            agent: Agent名称
+            model: 模型名称
+            usage: completion.usage对象（可能为None）
+            estimated_prompt_tokens: 调用前的本地预估prompt token数
+
+        Returns:
+            写入的记录（含计算出的费用）
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        entry = {
+            "run_id": run_id,
+            "stage": stage,
+            "agent": agent,
+            "model": model,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+            "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+            "estimated_prompt_tokens": estimated_prompt_tokens,
+            "created_at": time.time(),
+        }
+        entry["cost"] = compute_cost(model, entry["prompt_tokens"], entry["completion_tokens"], entry["cached_tokens"])
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO usage (run_id, stage, agent, model, prompt_tokens, completion_tokens, cached_tokens, "
+                "estimated_prompt_tokens, cost, created_at) VALUES (:run_id, :stage, :agent, :model, :prompt_tokens, "
+                ":completion_tokens, :cached_tokens, :estimated_prompt_tokens, :cost, :created_at)",
+                entry,
+            )
+        return entry
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def run_totals(self, run_id: str) -> Dict[str, Any]:
+        """单次运行的token与费用汇总"""
+        rows = self._query(
+            "SELECT COUNT(*) AS calls, COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens, "
+            "COALESCE(SUM(completion_tokens), 0) AS completion_tokens, COALESCE(SUM(cached_tokens), 0) AS cached_tokens, "
+            "COALESCE(SUM(cost), 0) AS cost FROM usage WHERE run_id = ?",
+            (run_id,),
+        )
+        return rows[0]
+
+    def top_consumers(self, limit: int = 10, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按总token数排序的(阶段, Agent)消耗排行"""
+        where, params = ("WHERE run_id = ?", (run_id,)) if run_id else ("", ())
+        return self._query(
+            "SELECT stage, agent, COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens, "
+            "SUM(completion_tokens) AS completion_tokens, SUM(cached_tokens) AS cached_tokens, "
+            f"SUM(prompt_tokens + completion_tokens) AS total_tokens, SUM(cost) AS cost FROM usage {where} "
+            "GROUP BY stage, agent ORDER BY total_tokens DESC LIMIT ?",
+            params + (limit,),
+        )
+
+    def cost_per_usecase(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """最近完成的运行中每个用例的平均费用和token数"""
+        return self._query(
+            "SELECT r.run_id, r.started_at, r.status, r.usecase_count, SUM(u.cost) AS cost, "
+            "SUM(u.prompt_tokens + u.completion_tokens) AS total_tokens, "
+            "SUM(u.cost) / r.usecase_count AS cost_per_usecase, "
+            "SUM(u.prompt_tokens + u.completion_tokens) / r.usecase_count AS tokens_per_usecase "
+            "FROM runs r JOIN usage u ON u.run_id = r.run_id WHERE r.usecase_count > 0 "
+            "GROUP BY r.run_id ORDER BY r.started_at DESC LIMIT ?",
+            (limit,),
+        )
+
+    def daily_trend(self, days: int = 30) -> List[Dict[str, Any]]:
+        """按天汇总的调用次数、token数和费用"""
+        since = time.time() - days * 86400
+        return self._query(
+            "SELECT date(created_at, 'unixepoch', 'localtime') AS day, COUNT(DISTINCT run_id) AS runs, "
+            "COUNT(*) AS calls, SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens, "
+            "SUM(cached_tokens) AS cached_tokens, SUM(cost) AS cost FROM usage WHERE created_at >= ? "
+            "GROUP BY day ORDER BY day",
+            (since,),
+        )
+
+
+def _print_table(title: str, rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    print(f"\n{title}")
+    if not rows:
+        print("  (无数据)")
+        return
+    cells = [[_format_cell(row.get(c)) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def _format_cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    if value is None:
+        return "-"
+    return str(value)
+
+
+def report(ledger: TokenLedger, limit: int = 10, days: int = 30) -> None:
+    """打印token消耗排行、每用例费用和每日趋势"""
+    _print_table("📊 Token消耗排行（阶段/Agent）", ledger.top_consumers(limit),
+                 ["stage", "agent", "calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost"])
+    _print_table("💰 每用例费用（最近运行）", ledger.cost_per_usecase(limit),
+                 ["run_id", "status", "usecase_count", "total_tokens", "cost", "cost_per_usecase"])
+    _print_table(f"📈 最近{days}天趋势", ledger.daily_trend(days),
+                 ["day", "runs", "calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost"])
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="Token与费用账本报表")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="显示消耗排行、每用例费用和趋势")
+    report_parser.add_argument("--db", default=config.ledger_path, help="账本SQLite文件路径")
+    report_parser.add_argument("--limit", type=int, default=10, help="排行显示条数")
+    report_parser.add_argument("--days", type=int, default=30, help="趋势统计天数")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ 账本文件不存在: {args.db}")
+        return
+    ledger = TokenLedger(args.db)
+    try:
+        report(ledger, limit=args.limit, days=args.days)
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+阶段记忆化模块
+类似构建系统的增量缓存：每个阶段（以及每个用例的顺序图）的输出按其确切输入的哈希索引——
+Prompt版本（Agent指令、few-shot示例、输出格式和任务说明）、上游产物在该阶段Prompt中的投影、模型参数。
+输入完全相同时跨运行直接复用；修改一个用例只会使依赖它的产物失效
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional, Sequence
+
+from pydantic import BaseModel
+
+from checkpoint import dump_value, load_value, write_json_atomic
+from config import config
+from prompt_builder import build_agent_prompt
+
+# 解析逻辑变化（会影响同样输出解析出的产物）时递增，使已有缓存全部失效
+CACHE_VERSION = 1
+
+
+def content_hash(value: Any) -> str:
+    """产物或Prompt负载的内容哈希：字符串按原文，模型按JSON，列表按元素顺序"""
+    digest = hashlib.sha256()
+    if isinstance(value, str):
+        digest.update(value.encode("utf-8"))
+    elif isinstance(value, BaseModel):
+        digest.update(value.model_dump_json().encode("utf-8"))
+    else:
+        digest.update(json.dumps(dump_value(value), ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def prompt_version(agent, task: str) -> str:
+    """Prompt版本：稳定前缀（system指令、示例、任务说明）的哈希"""
+    return build_agent_prompt(agent, task).prefix_hash
+
+
+class StageCache:
+    """按输入哈希存放阶段输出的缓存目录 <memo_dir>/<key[:2]>/<key>.json"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or config.memo_dir
+
+    def key(self, stage: str, prompt_versions: Sequence[str], inputs: Sequence[Any],
+            params: Dict[str, Any]) -> str:
+        """
+        计算阶段输出的缓存键
+
+        Args:
+            stage: 阶段名称
+            prompt_versions: 该阶段用到的各Agent的Prompt版本
+            inputs: 上游输入（该阶段Prompt中的实际负载）
+            params: 模型参数，如 {"model": ..., "max_tokens": ...}
+        """
+        material = {
+            "version": CACHE_VERSION,
+            "stage": stage,
+            "prompts": list(prompt_versions),
+            "inputs": [content_hash(item) for item in inputs],
+            "params": params,
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str, model_class=None) -> Any:
+        """读取缓存的阶段输出，不存在时抛出KeyError"""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(key) from None
+        return load_value(entry["value"], model_class)
+
+    def put(self, key: str, stage: str, value: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json_atomic(path, {"stage": stage, "value": dump_value(value)})
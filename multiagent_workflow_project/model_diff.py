@@ -0,0 +1,282 @@
+"""
+领域模型结构化对比模块
+比较两个DomainModel版本（验证迭代的前后两轮，或同一需求的两次运行），按元素报告增加、删除、修改和重命名，
+而不是对几十KB的JSON文本做行diff。
+元素先按名称（属性/方法按所属类，约束按上下文）精确匹配；剩余的元素再依次按内容（除名称外的字段完全相同且唯一）
+和名称相似度（同义词归一后的字符n-gram余弦相似度，见 entity_resolution）匹配为重命名。
+两个模型各只序列化一次，精确匹配和内容匹配都是字典查找，整体为线性时间
+"""
+import argparse
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import config
+from dsl_models import DomainModel
+from entity_resolution import canonical_form, similar_pairs
+
+# 报告中的元素种类（按输出顺序）
+KIND_LABELS = {
+    "actor": "参与者",
+    "usecase": "用例",
+    "sequence_diagram": "顺序图",
+    "class": "类",
+    "attribute": "属性",
+    "method": "方法",
+    "relationship": "关系",
+    "constraint": "约束",
+}
+_SYMBOLS = {"added": "+", "removed": "-", "modified": "~", "renamed": "→"}
+
+# 元素键：(所属分组, 名称)；分组为所属类名或约束上下文，其余元素为空字符串
+Key = Tuple[str, str]
+
+
+@dataclass
+class Change:
+    """一个元素的变化"""
+    kind: str
+    change: str  # added/removed/modified/renamed
+    name: str  # 新版本中的名称（删除的元素为旧名称）
+    group: str = ""
+    old_name: Optional[str] = None
+    fields: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)  # {字段: (旧值, 新值)}
+
+    @property
+    def label(self) -> str:
+        return f"{self.group}.{self.name}" if self.group else self.name
+
+    def format(self) -> str:
+        text = f"{_SYMBOLS[self.change]} {KIND_LABELS[self.kind]} "
+        text += f"{self.old_name} -> {self.label}" if self.change == "renamed" else self.label
+        if self.fields:
+            text += ": " + "; ".join(f"{name} {old!r} -> {new!r}" for name, (old, new) in self.fields.items())
+        return text
+
+
+@dataclass
+class ModelDiff:
+    """两个模型版本之间的全部变化，按元素种类排列"""
+    changes: List[Change] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changes
+
+    def of(self, kind: str, change: Optional[str] = None) -> List[Change]:
+        return [c for c in self.changes if c.kind == kind and (change is None or c.change == change)]
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """{种类: {变化类型: 数量}}，只包含有变化的种类"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for c in self.changes:
+            kind = counts.setdefault(c.kind, {})
+            kind[c.change] = kind.get(c.change, 0) + 1
+        return counts
+
+    def format(self, limit: Optional[int] = 50) -> str:
+        """可读的变化报告，最多列出limit条"""
+        if self.is_empty:
+            return "两个模型没有结构差异"
+        lines = [f"{KIND_LABELS[kind]}: " + "，".join(f"{_SYMBOLS[change]}{count}" for change, count in counts.items())
+                 for kind, counts in self.summary().items()]
+        shown = self.changes if limit is None else self.changes[:limit]
+        lines += [c.format() for c in shown]
+        if len(shown) < len(self.changes):
+            lines.append(f"... 另有 {len(self.changes) - len(shown)} 处变化")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "changes": [asdict(c) for c in self.changes]}
+
+
+def _content(element: Dict[str, Any], exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """元素（model_dump后的数据）除名称（和嵌套集合）外的字段"""
+    exclude = {"name", *exclude}
+    return {key: value for key, value in element.items() if key not in exclude}
+
+
+def _elements(items: Iterable[Dict[str, Any]], group: Callable[[Dict], str] = lambda item: "",
+              name: Callable[[Dict], str] = lambda item: item["name"], exclude: Iterable[str] = ()) -> Dict[Key, Dict[str, Any]]:
+    """{(分组, 名称): 内容}，同一键的重复元素只保留第一个"""
+    elements: Dict[Key, Dict[str, Any]] = {}
+    for item in items:
+        key = (group(item), name(item))
+        if key not in elements:
+            elements[key] = _content(item, exclude)
+    return elements
+
+
+def _grams(form: str) -> set:
+    return set(form) | {form[i:i + 2] for i in range(len(form) - 1)}
+
+
+def _similarity(a: str, b: str) -> float:
+    grams_a, grams_b = _grams(a), _grams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / math.sqrt(len(grams_a) * len(grams_b))
+
+
+def _match_by_content(removed: List[Key], added: List[Key], old: Dict[Key, Dict], new: Dict[Key, Dict]) -> List[Tuple[Key, Key]]:
+    """除名称外内容完全相同、且在两侧都唯一的元素视为重命名"""
+    def index(keys, elements):
+        found: Dict[Tuple[str, str], List[Key]] = {}
+        for key in keys:
+            found.setdefault((key[0], json.dumps(elements[key], sort_keys=True, ensure_ascii=False)), []).append(key)
+        return found
+
+    removed_by_content, added_by_content = index(removed, old), index(added, new)
+    return [(keys[0], added_by_content[content][0]) for content, keys in removed_by_content.items()
+            if len(keys) == 1 and len(added_by_content.get(content, ())) == 1]
+
+
+def _match_by_name(removed: List[Key], added: List[Key], threshold: float) -> List[Tuple[Key, Key]]:
+    """同一分组内名称相似度不低于threshold的元素按相似度从高到低一一配对"""
+    by_group: Dict[str, Tuple[List[Key], List[Key]]] = {}
+    for key in removed:
+        by_group.setdefault(key[0], ([], []))[0].append(key)
+    for key in added:
+        if key[0] in by_group:
+            by_group[key[0]][1].append(key)
+    pairs = []
+    for old_keys, new_keys in by_group.values():
+        if not new_keys:
+            continue
+        forms = [canonical_form(key[1]) for key in old_keys + new_keys]
+        candidates = []
+        for i, j in similar_pairs(forms, threshold):
+            i, j = min(i, j), max(i, j)
+            if i < len(old_keys) <= j:
+                candidates.append((_similarity(forms[i], forms[j]), i, j - len(old_keys)))
+        used_old, used_new = set(), set()
+        for _, i, j in sorted(candidates, key=lambda item: (-item[0], item[1], item[2])):
+            if i not in used_old and j not in used_new:
+                used_old.add(i)
+                used_new.add(j)
+                pairs.append((old_keys[i], new_keys[j]))
+    return pairs
+
+
+def _fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    return {name: (old.get(name), new.get(name)) for name in dict.fromkeys([*old, *new]) if old.get(name) != new.get(name)}
+
+
+def _diff_kind(kind: str, old: Dict[Key, Dict], new: Dict[Key, Dict], threshold: Optional[float]) -> Tuple[List[Change], Dict[Key, Key]]:
+    """
+    比较一种元素
+
+    Args:
+        threshold: 名称相似度阈值，None表示不做名称模糊匹配
+
+    Returns:
+        (变化列表, {旧键: 新键} 重命名映射)
+    """
+    removed = [key for key in old if key not in new]
+    added = [key for key in new if key not in old]
+    renamed: Dict[Key, Key] = {}
+    if removed and added:
+        renamed.update(_match_by_content(removed, added, old, new))
+        if threshold is not None:
+            matched_new = set(renamed.values())
+            renamed.update(_match_by_name([key for key in removed if key not in renamed],
+                                          [key for key in added if key not in matched_new], threshold))
+    matched_new = set(renamed.values())
+
+    changes = []
+    for key, content in old.items():
+        if key in new:
+            if content != new[key]:
+                changes.append(Change(kind, "modified", key[1], key[0], fields=_fields(content, new[key])))
+        elif key in renamed:
+            target = renamed[key]
+            changes.append(Change(kind, "renamed", target[1], target[0], old_name=key[1], fields=_fields(content, new[target])))
+        else:
+            changes.append(Change(kind, "removed", key[1], key[0]))
+    changes += [Change(kind, "added", key[1], key[0]) for key in added if key not in matched_new]
+    return changes, renamed
+
+
+def diff_models(old: DomainModel, new: DomainModel, threshold: Optional[float] = None) -> ModelDiff:
+    """
+    对比两个领域模型版本
+
+    类先于属性、方法、关系和约束比较：类的重命名映射用于把旧模型中的所属类、关系两端和约束上下文换成新名称，
+    重命名的类中未变化的属性不会被报告为删除再增加
+
+    Args:
+        old: 旧版本
+        new: 新版本
+        threshold: 名称模糊匹配的相似度阈值，默认使用配置
+
+    Returns:
+        ModelDiff
+    """
+    threshold = config.diff_similarity_threshold if threshold is None else threshold
+    old_data, new_data = old.model_dump(mode="json"), new.model_dump(mode="json")
+    changes: Dict[str, List[Change]] = {}
+
+    def compare(kind: str, select: Callable[[Dict], List[Dict]], fuzzy: bool = True, **options) -> Dict[Key, Key]:
+        changes[kind], renamed = _diff_kind(kind, _elements(select(old_data), **options),
+                                            _elements(select(new_data), **options), threshold if fuzzy else None)
+        return renamed
+
+    compare("actor", lambda data: data["usecase_diagram"]["actors"])
+    compare("usecase", lambda data: data["usecase_diagram"]["usecases"])
+    compare("sequence_diagram", lambda data: data["sequence_diagrams"])
+    renamed = compare("class", lambda data: data["class_diagram"]["classes"], exclude=("attributes", "methods"))
+    class_name = {old_key[1]: new_key[1] for old_key, new_key in renamed.items()}
+
+    def mapped(name: str) -> str:
+        return class_name.get(name, name)
+
+    for kind, attribute in (("attribute", "attributes"), ("method", "methods")):
+        changes[kind], _ = _diff_kind(
+            kind,
+            {(mapped(cls["name"]), member["name"]): _content(member) for cls in old_data["class_diagram"]["classes"]
+             for member in cls[attribute]},
+            {(cls["name"], member["name"]): _content(member) for cls in new_data["class_diagram"]["classes"]
+             for member in cls[attribute]},
+            threshold,
+        )
+
+    def relationship_name(r: Dict[str, Any], rename: Callable[[str], str]) -> str:
+        label = f" {r['name']}" if r["name"] else ""
+        return f"{rename(r['source'])} -{r['type']}{label}-> {rename(r['target'])}"
+
+    endpoints = ("source", "target", "type")
+    changes["relationship"], _ = _diff_kind(
+        "relationship",
+        _elements(old_data["class_diagram"]["relationships"], name=lambda r: relationship_name(r, mapped), exclude=endpoints),
+        _elements(new_data["class_diagram"]["relationships"], name=lambda r: relationship_name(r, str), exclude=endpoints),
+        None,
+    )
+    changes["constraint"], _ = _diff_kind(
+        "constraint",
+        _elements(old_data["ocl_constraints"], group=lambda c: mapped(c["context"]), exclude=("context",)),
+        _elements(new_data["ocl_constraints"], group=lambda c: c["context"], exclude=("context",)),
+        threshold,
+    )
+    return ModelDiff([c for kind in KIND_LABELS for c in changes[kind]])
+
+
+def main():
+    """命令行入口：python model_diff.py 旧模型.json 新模型.json"""
+    parser = argparse.ArgumentParser(description="对比两个领域模型JSON文件")
+    parser.add_argument("old", help="旧版本的领域模型JSON文件")
+    parser.add_argument("new", help="新版本的领域模型JSON文件")
+    parser.add_argument("--limit", type=int, default=50, help="最多列出的变化条数")
+    parser.add_argument("--json", action="store_true", help="以JSON输出全部变化")
+    args = parser.parse_args()
+
+    models = []
+    for path in (args.old, args.new):
+        with open(path, "r", encoding="utf-8") as f:
+            models.append(DomainModel.model_validate(json.load(f)))
+    diff = diff_models(*models)
+    print(json.dumps(diff.to_dict(), ensure_ascii=False, indent=2) if args.json else diff.format(args.limit))
+
+
+if __name__ == "__main__":
+    main()
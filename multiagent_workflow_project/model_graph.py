@@ -0,0 +1,281 @@
+"""
+模型图分析模块
+用例的包含/扩展关系和类之间的关系只以名称列表的形式存在于模型中。
+这里把它们构建为邻接数组（CSR）表示的有向图，提供线性时间的强连通分量（环检测）、可达性、
+度数/中心性和泛化链深度分析，供 analyze_domain_complexity 计算结构化的复杂度指标
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from dsl_models import ConceptualClassDiagram, DomainModel, RelationshipType, UseCaseDiagram
+from sharding import DisjointSet
+
+
+class Graph:
+    """
+    邻接数组表示的有向图
+
+    节点按名称编号；第i个节点的后继为 targets[offsets[i]:offsets[i + 1]]。
+    重复的边只保留一条，引用不存在节点的边被忽略（由 missing_edges 记录）
+    """
+
+    def __init__(self, nodes: Sequence[str], edges: Iterable[Tuple[str, str]]):
+        self.nodes: List[str] = list(dict.fromkeys(nodes))
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.nodes)}
+        self.missing_edges: List[Tuple[str, str]] = []
+        adjacency: List[List[int]] = [[] for _ in self.nodes]
+        seen = set()
+        for source, target in edges:
+            if source not in self.index or target not in self.index:
+                self.missing_edges.append((source, target))
+                continue
+            edge = (self.index[source], self.index[target])
+            if edge not in seen:
+                seen.add(edge)
+                adjacency[edge[0]].append(edge[1])
+        self.offsets: List[int] = [0]
+        self.targets: List[int] = []
+        for successors in adjacency:
+            self.targets.extend(successors)
+            self.offsets.append(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def successors(self, node: int) -> List[int]:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def out_degrees(self) -> List[int]:
+        return [self.offsets[i + 1] - self.offsets[i] for i in range(len(self.nodes))]
+
+    def in_degrees(self) -> List[int]:
+        degrees = [0] * len(self.nodes)
+        for target in self.targets:
+            degrees[target] += 1
+        return degrees
+
+    def strongly_connected_components(self) -> List[List[int]]:
+        """Tarjan算法（迭代实现，避免深图递归溢出），O(V+E)；返回的分量按逆拓扑序排列"""
+        count = len(self.nodes)
+        index_of = [-1] * count
+        lowlink = [0] * count
+        on_stack = [False] * count
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+        for root in range(count):
+            if index_of[root] != -1:
+                continue
+            work = [(root, self.offsets[root])]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, position = work[-1]
+                if position < self.offsets[node + 1]:
+                    work[-1] = (node, position + 1)
+                    successor = self.targets[position]
+                    if index_of[successor] == -1:
+                        index_of[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, self.offsets[successor]))
+                    elif on_stack[successor]:
+                        lowlink[node] = min(lowlink[node], index_of[successor])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def cycles(self) -> List[List[str]]:
+        """包含环的强连通分量（多个节点，或有自环的单个节点），节点按名称顺序排列"""
+        cyclic = []
+        for component in self.strongly_connected_components():
+            if len(component) > 1 or component[0] in self.successors(component[0]):
+                cyclic.append([self.nodes[i] for i in sorted(component)])
+        return cyclic
+
+    def reachable(self, sources: Iterable[str]) -> List[str]:
+        """从sources出发可达的节点（包含sources本身），O(V+E)"""
+        visited = [False] * len(self.nodes)
+        frontier = [self.index[name] for name in sources if name in self.index]
+        for node in frontier:
+            visited[node] = True
+        while frontier:
+            node = frontier.pop()
+            for successor in self.successors(node):
+                if not visited[successor]:
+                    visited[successor] = True
+                    frontier.append(successor)
+        return [name for name, flag in zip(self.nodes, visited) if flag]
+
+    def _condensation(self) -> Tuple[List[List[int]], List[int], List[int]]:
+        """强连通分量、节点所属分量、每个分量出发的最长路径边数"""
+        components = self.strongly_connected_components()
+        component_of = [0] * len(self.nodes)
+        for c, component in enumerate(components):
+            for node in component:
+                component_of[node] = c
+        length = [0] * len(components)
+        # Tarjan输出的分量是逆拓扑序：后继所在的分量总是先出现
+        for c, component in enumerate(components):
+            for node in component:
+                for successor in self.successors(node):
+                    if component_of[successor] != c:
+                        length[c] = max(length[c], length[component_of[successor]] + 1)
+        return components, component_of, length
+
+    def longest_paths(self) -> List[int]:
+        """
+        每个节点出发的最长路径边数，O(V+E)
+
+        先把强连通分量缩成一个点（环上的节点共享同一长度），再在缩点后的DAG上按逆拓扑序做动态规划
+        """
+        _, component_of, length = self._condensation()
+        return [length[component_of[node]] for node in range(len(self.nodes))]
+
+    def longest_path(self) -> List[str]:
+        """最长路径上的节点名称（环缩为一个点），图为空时返回空列表"""
+        if not self.nodes:
+            return []
+        components, component_of, length = self._condensation()
+        node = max(range(len(self.nodes)), key=lambda i: length[component_of[i]])
+        path = [node]
+        while length[component_of[node]] > 0:
+            current = component_of[node]
+            node = next(successor for member in components[current] for successor in self.successors(member)
+                        if component_of[successor] != current and length[component_of[successor]] == length[current] - 1)
+            path.append(node)
+        return [self.nodes[i] for i in path]
+
+    def degree_centrality(self) -> List[float]:
+        """(入度 + 出度) / (2 × (V - 1))"""
+        scale = 2 * (len(self.nodes) - 1)
+        return [(i + o) / scale if scale else 0.0 for i, o in zip(self.in_degrees(), self.out_degrees())]
+
+    def pagerank(self, damping: float = 0.85, iterations: int = 50, tolerance: float = 1e-8) -> List[float]:
+        """PageRank中心性（幂迭代，每轮O(V+E)），悬挂节点的权重均匀分配"""
+        count = len(self.nodes)
+        if count == 0:
+            return []
+        rank = [1.0 / count] * count
+        out_degrees = self.out_degrees()
+        for _ in range(iterations):
+            dangling = sum(rank[i] for i in range(count) if out_degrees[i] == 0)
+            base = (1.0 - damping + damping * dangling) / count
+            updated = [base] * count
+            for node in range(count):
+                if out_degrees[node]:
+                    share = damping * rank[node] / out_degrees[node]
+                    for successor in self.successors(node):
+                        updated[successor] += share
+            converged = sum(abs(a - b) for a, b in zip(rank, updated)) < tolerance
+            rank = updated
+            if converged:
+                break
+        return rank
+
+
+def usecase_graph(diagram: UseCaseDiagram, with_actors: bool = False) -> Graph:
+    """
+    用例关系图：用例 -> 包含/扩展的用例
+
+    with_actors为True时参与者也作为节点，并添加 参与者 -> 用例 的边，用于可达性分析
+    """
+    nodes = [usecase.name for usecase in diagram.usecases]
+    edges = [(usecase.name, target) for usecase in diagram.usecases for target in usecase.includes + usecase.extends]
+    if with_actors:
+        nodes += [actor.name for actor in diagram.actors] + [usecase.actor for usecase in diagram.usecases]
+        edges += [(usecase.actor, usecase.name) for usecase in diagram.usecases]
+    return Graph(nodes, edges)
+
+
+def class_graph(diagram: ConceptualClassDiagram, types: Optional[Iterable[RelationshipType]] = None) -> Graph:
+    """类关系图：关系的源类 -> 目标类，types限定关系类型（如只看泛化关系）"""
+    types = set(types) if types is not None else None
+    edges = [(r.source, r.target) for r in diagram.relationships if types is None or r.type in types]
+    return Graph([cls.name for cls in diagram.classes], edges)
+
+
+def god_classes(graph: Graph, min_degree: int = 8, z_score: float = 2.5) -> List[Tuple[str, int]]:
+    """
+    关系数远高于平均水平的类：度数 >= min_degree 且超过平均值 z_score 个标准差
+
+    Returns:
+        [(类名, 度数)]，按度数降序
+    """
+    degrees = [i + o for i, o in zip(graph.in_degrees(), graph.out_degrees())]
+    if not degrees:
+        return []
+    mean = sum(degrees) / len(degrees)
+    std = math.sqrt(sum((d - mean) ** 2 for d in degrees) / len(degrees))
+    threshold = max(min_degree, mean + z_score * std)
+    found = [(graph.nodes[i], d) for i, d in enumerate(degrees) if d >= threshold]
+    return sorted(found, key=lambda item: -item[1])
+
+
+def analyze_model_graph(model: DomainModel, top: int = 5) -> Dict[str, object]:
+    """
+    领域模型的结构分析
+
+    Returns:
+        {
+            "include_cycles": 包含/扩展关系中的环,
+            "unreachable_usecases": 从任何参与者出发都不可达的用例,
+            "dangling_references": 引用了不存在用例的包含/扩展关系,
+            "god_classes": [(类名, 度数)],
+            "central_classes": PageRank最高的类 [{"name", "pagerank", "degree_centrality"}],
+            "generalization_depth": 最长泛化链的边数,
+            "deepest_generalization_chain": 最长泛化链（子类 -> ... -> 祖先类）,
+            "containment_cycles": 组合/聚合关系中的环（整体-部分关系不应成环）,
+            "cyclomatic_complexity": 类关系图的圈复杂度 E - V + 连通分量数,
+            "average_class_degree": 类的平均关系数,
+        }
+    """
+    usecases = usecase_graph(model.usecase_diagram)
+    with_actors = usecase_graph(model.usecase_diagram, with_actors=True)
+    actor_names = [actor.name for actor in model.usecase_diagram.actors]
+    reachable = set(with_actors.reachable(actor_names))
+    classes = class_graph(model.class_diagram)
+    generalization = class_graph(model.class_diagram, [RelationshipType.GENERALIZATION])
+    containment = class_graph(model.class_diagram, [RelationshipType.COMPOSITION, RelationshipType.AGGREGATION])
+    rank, centrality = classes.pagerank(), classes.degree_centrality()
+    central = sorted(range(len(classes)), key=lambda i: -rank[i])[:top]
+    chain = generalization.longest_path()
+
+    # 弱连通分量数：忽略方向后的连通分量
+    connected = DisjointSet(range(len(classes)))
+    for source in range(len(classes)):
+        for target in classes.successors(source):
+            connected.union(source, target)
+    components = len(connected.groups())
+    return {
+        "include_cycles": usecases.cycles(),
+        "unreachable_usecases": [name for name in usecases.nodes if name not in reachable],
+        "dangling_references": [f"{source} -> {target}" for source, target in usecases.missing_edges],
+        "god_classes": god_classes(classes),
+        "central_classes": [{"name": classes.nodes[i], "pagerank": round(rank[i], 4),
+                             "degree_centrality": round(centrality[i], 4)} for i in central],
+        "generalization_depth": max(len(chain) - 1, 0),
+        "deepest_generalization_chain": chain if len(chain) > 1 else [],
+        "containment_cycles": containment.cycles(),
+        "cyclomatic_complexity": classes.edge_count - len(classes) + components,
+        "average_class_degree": round(2 * classes.edge_count / len(classes), 2) if len(classes) else 0.0,
+    }
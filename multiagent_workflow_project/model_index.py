@@ -0,0 +1,47 @@
+"""
+模型索引模块
+tools.py中的校验和导出在列表上按名称查找（`name in [...]`），用例和参与者多时是平方复杂度。
+索引视图为用例图建立名称到元素的字典/集合，并预先分配PlantUML别名；
+每次校验或导出调用建立一个索引（一次线性遍历）并在调用内部传递使用
+"""
+from collections import Counter
+from typing import Dict, List, Set
+
+from dsl_models import Actor, UseCase, UseCaseDiagram
+from plantuml_export import AliasTable
+
+
+class UseCaseIndex:
+    """用例图的索引视图（只引用图中的元素，不持有用例图本身）"""
+
+    def __init__(self, diagram: UseCaseDiagram):
+        self.usecases: Dict[str, UseCase] = {}
+        self.actors: Dict[str, Actor] = {}
+        for usecase in diagram.usecases:
+            self.usecases.setdefault(usecase.name, usecase)
+        for actor in diagram.actors:
+            self.actors.setdefault(actor.name, actor)
+        self.actor_names: Set[str] = set(self.actors)
+        self.usecase_names: Set[str] = set(self.usecases)
+        self.aliases = AliasTable()
+        for name in self.actors:
+            self.aliases.alias(name, "actor")
+        for name in self.usecases:
+            self.aliases.alias(name, "usecase")
+        self.usecase_count = len(diagram.usecases)
+        self.actor_count = len(diagram.actors)
+        self.duplicate_usecases: List[str] = []
+        if len(self.usecases) != self.usecase_count:
+            self.duplicate_usecases = [name for name, count in Counter(u.name for u in diagram.usecases).items() if count > 1]
+
+    @property
+    def has_duplicate_usecases(self) -> bool:
+        return bool(self.duplicate_usecases)
+
+    @property
+    def has_duplicate_actors(self) -> bool:
+        return len(self.actors) != self.actor_count
+
+    def alias(self, name: str, kind: str = "usecase") -> str:
+        """名称的PlantUML别名（kind为actor或usecase），不在索引中的名称（如引用了不存在的用例）也会分配别名"""
+        return self.aliases.alias(name, kind)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+领域模型流式JSONL格式
+每行一条记录，以kind标记元素种类：先是模型头（model）和两个图头（usecase_diagram、class_diagram），
+之后每个参与者、用例、顺序图、类（含属性和方法）、关系和OCL约束各占一行。
+写入端可以随时向已有文件追加记录；同一元素（按名称等键）出现多次时以最后一条为准，位置保持首次出现的位置。
+读取端打开文件时只扫描一遍，记录每种元素各行的字节偏移，按需读取并构建单个图或单个顺序图，
+峰值内存与所请求的部分成正比，而不是与整个文件成正比
+
+用法:
+    python model_jsonl.py convert 模型.json 模型.jsonl
+    python model_jsonl.py info 模型.jsonl
+"""
+import argparse
+import json
+from array import array
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from pydantic import BaseModel
+
+from dsl_models import (
+    Actor, Class, ConceptualClassDiagram, DomainModel, OCLConstraint, Relationship, SystemSequenceDiagram,
+    UseCase, UseCaseDiagram
+)
+
+FORMAT = "domain-model-jsonl"
+VERSION = 1
+
+# 元素种类：(模型类, 去重键)
+ELEMENT_KINDS: Dict[str, Tuple[type, Callable[[Dict[str, Any]], Any]]] = {
+    "actor": (Actor, lambda r: r["name"]),
+    "usecase": (UseCase, lambda r: r["name"]),
+    "sequence_diagram": (SystemSequenceDiagram, lambda r: r["name"]),
+    "class": (Class, lambda r: r["name"]),
+    "relationship": (Relationship, lambda r: (r["source"], r["target"], r["type"], r.get("name"))),
+    "constraint": (OCLConstraint, lambda r: (r["context"], r["name"])),
+}
+# 头记录：同种头记录出现多次时以最后一条为准
+HEADER_KINDS = ("model", "usecase_diagram", "class_diagram")
+
+_PREFIX = b'{"kind":"'
+
+
+def _dumps(kind: str, data: Dict[str, Any]) -> str:
+    # kind固定为第一个键，读取端扫描时不必解析整行
+    return json.dumps({"kind": kind, **data}, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+
+
+class ModelJsonlWriter:
+    """向文本句柄写入JSONL记录（新文件或以追加模式打开的已有文件）"""
+
+    def __init__(self, f: TextIO):
+        self._f = f
+        self.count = 0
+
+    def write(self, kind: str, element: Union[BaseModel, Dict[str, Any]]) -> None:
+        """写入一条元素记录，已存在的同名元素在读取时被这一条替换"""
+        if kind not in ELEMENT_KINDS and kind not in HEADER_KINDS:
+            raise ValueError(f"未知的记录种类: {kind}")
+        data = element.model_dump(mode="json") if isinstance(element, BaseModel) else element
+        self._f.write(_dumps(kind, data))
+        self.count += 1
+
+    def write_all(self, kind: str, elements: Iterable[Union[BaseModel, Dict[str, Any]]]) -> None:
+        for element in elements:
+            self.write(kind, element)
+
+    def write_header(self, name: str, description: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.write("model", {"format": FORMAT, "version": VERSION, "name": name, "description": description,
+                             "metadata": metadata or {}})
+
+    def write_model(self, model: DomainModel) -> None:
+        """写入完整的领域模型"""
+        usecase_diagram, class_diagram = model.usecase_diagram, model.class_diagram
+        self.write_header(model.name, model.description, model.metadata)
+        self.write("usecase_diagram", {"name": usecase_diagram.name, "description": usecase_diagram.description})
+        self.write("class_diagram", {"name": class_diagram.name, "description": class_diagram.description})
+        self.write_all("actor", usecase_diagram.actors)
+        self.write_all("usecase", usecase_diagram.usecases)
+        self.write_all("sequence_diagram", model.sequence_diagrams)
+        self.write_all("class", class_diagram.classes)
+        self.write_all("relationship", class_diagram.relationships)
+        self.write_all("constraint", model.ocl_constraints)
+
+
+def write_model_jsonl(model: DomainModel, path: str) -> int:
+    """把领域模型写成JSONL文件，返回记录数"""
+    with open(path, "w", encoding="utf-8") as f:
+        writer = ModelJsonlWriter(f)
+        writer.write_model(model)
+    return writer.count
+
+
+def append_jsonl(path: str, kind: str, elements: Iterable[Union[BaseModel, Dict[str, Any]]]) -> int:
+    """
+    向已有的JSONL模型文件追加元素（新增或替换同名元素），不重写已有内容
+
+    Returns:
+        追加的记录数
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        writer = ModelJsonlWriter(f)
+        writer.write_all(kind, elements)
+    return writer.count
+
+
+class ModelJsonlReader:
+    """JSONL模型文件的惰性读取器"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f: BinaryIO = open(path, "rb")
+        self._offsets: Dict[str, array] = {}
+        self._sequence_names: Optional[Dict[str, int]] = None
+        try:
+            self._scan()
+        except BaseException:
+            self._f.close()
+            raise
+
+    def __enter__(self) -> "ModelJsonlReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def _scan(self) -> None:
+        """记录每种元素各行的起始偏移（每行8字节）"""
+        offset = 0
+        for line in self._f:
+            if line.strip():
+                if line.startswith(_PREFIX):
+                    kind = line[len(_PREFIX):line.index(b'"', len(_PREFIX))].decode("utf-8")
+                else:
+                    kind = json.loads(line)["kind"]
+                self._offsets.setdefault(kind, array("q")).append(offset)
+            offset += len(line)
+        header = self._last("model")
+        if header is None or header.get("format") != FORMAT:
+            raise ValueError(f"不是领域模型JSONL文件: {self.path}")
+        if header.get("version", VERSION) > VERSION:
+            raise ValueError(f"不支持的JSONL格式版本: {header['version']}")
+
+    def _read(self, offset: int) -> Dict[str, Any]:
+        self._f.seek(offset)
+        record = json.loads(self._f.readline())
+        record.pop("kind")
+        return record
+
+    def _last(self, kind: str) -> Optional[Dict[str, Any]]:
+        offsets = self._offsets.get(kind)
+        return self._read(offsets[-1]) if offsets else None
+
+    def counts(self) -> Dict[str, int]:
+        """每种记录的行数（包含被后续记录替换的行）"""
+        return {kind: len(offsets) for kind, offsets in self._offsets.items()}
+
+    def records(self, kind: str) -> Iterator[Dict[str, Any]]:
+        """按文件顺序逐条读取某种记录的原始数据（不去重）"""
+        for offset in self._offsets.get(kind, ()):
+            yield self._read(offset)
+
+    def elements(self, kind: str) -> Iterator[BaseModel]:
+        """
+        逐个读取某种元素，同键的多条记录只返回最后一条
+
+        没有重复记录时逐行读取和构建；有追加的替换记录时先找出每个键最后一条记录的偏移，
+        内存中只保存键和偏移，不保存元素本身
+        """
+        model_class, key = ELEMENT_KINDS[kind]
+        offsets = self._offsets.get(kind, ())
+        latest: Dict[Any, int] = {}
+        for offset in offsets:
+            latest[key(self._read(offset))] = offset
+        if len(latest) == len(offsets):
+            selected: Iterable[int] = offsets
+        else:
+            selected = latest.values()
+        for offset in selected:
+            yield model_class.model_validate(self._read(offset))
+
+    def _collect(self, kind: str) -> List[BaseModel]:
+        """读取某种元素的全部最新版本（单遍，只保留最终结果）"""
+        model_class, key = ELEMENT_KINDS[kind]
+        latest: Dict[Any, Dict[str, Any]] = {}
+        for record in self.records(kind):
+            latest[key(record)] = record
+        return [model_class.model_validate(record) for record in latest.values()]
+
+    def header(self) -> Dict[str, Any]:
+        """模型头：名称、描述和元数据"""
+        return self._last("model")
+
+    def usecase_diagram(self) -> UseCaseDiagram:
+        header = self._last("usecase_diagram") or {"name": self.header()["name"]}
+        return UseCaseDiagram(**header, actors=self._collect("actor"), usecases=self._collect("usecase"))
+
+    def class_diagram(self) -> ConceptualClassDiagram:
+        header = self._last("class_diagram") or {"name": self.header()["name"]}
+        return ConceptualClassDiagram(**header, classes=self._collect("class"), relationships=self._collect("relationship"))
+
+    def sequence_diagrams(self) -> Iterator[SystemSequenceDiagram]:
+        """逐个读取顺序图，同一时刻只持有一个"""
+        return self.elements("sequence_diagram")
+
+    def sequence_diagram(self, name: str) -> Optional[SystemSequenceDiagram]:
+        """按名称读取单个顺序图（首次调用时建立名称到偏移的索引），不存在时返回None"""
+        if self._sequence_names is None:
+            self._sequence_names = {record["name"]: offset for offset, record in
+                                    zip(self._offsets.get("sequence_diagram", ()), self.records("sequence_diagram"))}
+        offset = self._sequence_names.get(name)
+        return SystemSequenceDiagram.model_validate(self._read(offset)) if offset is not None else None
+
+    def ocl_constraints(self, context: Optional[str] = None) -> List[OCLConstraint]:
+        return [c for c in self._collect("constraint") if context is None or c.context == context]
+
+    def load(self) -> DomainModel:
+        """构建完整的领域模型"""
+        header = self.header()
+        return DomainModel(
+            name=header["name"],
+            description=header.get("description"),
+            usecase_diagram=self.usecase_diagram(),
+            sequence_diagrams=self._collect("sequence_diagram"),
+            class_diagram=self.class_diagram(),
+            ocl_constraints=self._collect("constraint"),
+            metadata=header.get("metadata") or {},
+        )
+
+
+def load_model_jsonl(path: str) -> DomainModel:
+    """读取完整的JSONL模型文件"""
+    with ModelJsonlReader(path) as reader:
+        return reader.load()
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="领域模型JSONL格式转换和查看")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert_parser = subparsers.add_parser("convert", help="把领域模型JSON文件转换为JSONL")
+    convert_parser.add_argument("source", help="领域模型JSON文件")
+    convert_parser.add_argument("target", help="输出的JSONL文件")
+    info_parser = subparsers.add_parser("info", help="显示JSONL模型文件的记录数")
+    info_parser.add_argument("path", help="JSONL模型文件")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        with open(args.source, "r", encoding="utf-8") as f:
+            model = DomainModel.model_validate(json.load(f))
+        print(f"✅ 已写入 {write_model_jsonl(model, args.target)} 条记录: {args.target}")
+        return
+    with ModelJsonlReader(args.path) as reader:
+        header = reader.header()
+        print(f"📄 {header['name']}（格式版本 {header.get('version')}）")
+        for kind, count in reader.counts().items():
+            print(f"  {kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+领域模型仓库模块
+把领域模型按元素拆分写入SQLite的规范化表（参与者、用例、类、属性、方法、关系、OCL约束、顺序图），
+按名称建立索引：可以查询“包含某个类的所有模型”，也可以只读取一个模型的用例图、类图或单个顺序图而不加载整个模型。
+每个模型有唯一的model_id，并发运行各自写入、互不覆盖
+
+用法:
+    python model_store.py list [--db PATH] [--limit N]
+    python model_store.py find-class NAME [--db PATH]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from config import config
+from dsl_models import (
+    Actor, Attribute, Class, ConceptualClassDiagram, DomainModel, Method, OCLConstraint, Relationship,
+    SystemSequenceDiagram, UseCase, UseCaseDiagram
+)
+from validation import validate_list
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    model_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    run_id TEXT,
+    created_at REAL NOT NULL,
+    usecase_diagram_name TEXT NOT NULL,
+    usecase_diagram_description TEXT,
+    class_diagram_name TEXT NOT NULL,
+    class_diagram_description TEXT,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actors (
+    model_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    type TEXT NOT NULL,
+    PRIMARY KEY (model_id, position)
+);
+CREATE TABLE IF NOT EXISTS usecases (
+    model_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    actor TEXT NOT NULL,
+    includes TEXT NOT NULL,
+    extends TEXT NOT NULL,
+    preconditions TEXT NOT NULL,
+    postconditions TEXT NOT NULL,
+    PRIMARY KEY (model_id, position)
+);
+CREATE TABLE IF NOT EXISTS classes (
+    model_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    stereotypes TEXT NOT NULL,
+    PRIMARY KEY (model_id, position)
+);
+CREATE TABLE IF NOT EXISTS attributes (
+    model_id TEXT NOT NULL,
+    class_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    visibility TEXT NOT NULL,
+    multiplicity TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (model_id, class_position, position)
+);
+CREATE TABLE IF NOT EXISTS methods (
+    model_id TEXT NOT NULL,
+    class_position INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    return_type TEXT,
+    visibility TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (model_id, class_position, position)
+);
+CREATE TABLE IF NOT EXISTS relationships (
+    model_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    type TEXT NOT NULL,
+    source_multiplicity TEXT NOT NULL,
+    target_multiplicity TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (model_id, position)
+);
+CREATE TABLE IF NOT EXISTS constraints (
+    model_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    context TEXT NOT NULL,
+    type TEXT NOT NULL,
+    expression TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (model_id, position)
+);
+CREATE TABLE IF NOT EXISTS sequence_diagrams (
+    model_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (model_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_models_created ON models(created_at);
+CREATE INDEX IF NOT EXISTS idx_models_run ON models(run_id);
+CREATE INDEX IF NOT EXISTS idx_actors_name ON actors(name);
+CREATE INDEX IF NOT EXISTS idx_usecases_name ON usecases(name);
+CREATE INDEX IF NOT EXISTS idx_classes_name ON classes(name);
+CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source);
+CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target);
+CREATE INDEX IF NOT EXISTS idx_constraints_context ON constraints(context);
+CREATE INDEX IF NOT EXISTS idx_sequence_name ON sequence_diagrams(model_id, name);
+"""
+
+# 模型的所有子表，删除或覆盖模型时逐个清理
+_ELEMENT_TABLES = ["actors", "usecases", "classes", "attributes", "methods", "relationships", "constraints", "sequence_diagrams"]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class ModelStore:
+    """基于SQLite的领域模型仓库（线程安全；WAL模式下多个进程可以同时读写）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.model_store_path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def save(self, model: DomainModel, model_id: Optional[str] = None, run_id: Optional[str] = None) -> str:
+        """
+        保存领域模型
+
+        Args:
+            model: 领域模型
+            model_id: 模型ID，已存在时覆盖该模型；默认生成新的ID
+            run_id: 产生该模型的运行ID，默认取 metadata["run_id"]
+
+        Returns:
+            model_id
+        """
+        model_id = model_id or uuid.uuid4().hex
+        run_id = run_id or model.metadata.get("run_id")
+        usecase_diagram, class_diagram = model.usecase_diagram, model.class_diagram
+        with self._lock, self._conn:
+            for table in ["models"] + _ELEMENT_TABLES:
+                self._conn.execute(f"DELETE FROM {table} WHERE model_id = ?", (model_id,))
+            self._conn.execute(
+                "INSERT INTO models (model_id, name, description, run_id, created_at, usecase_diagram_name, "
+                "usecase_diagram_description, class_diagram_name, class_diagram_description, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (model_id, model.name, model.description, run_id, time.time(), usecase_diagram.name,
+                 usecase_diagram.description, class_diagram.name, class_diagram.description,
+                 json.dumps(model.metadata, ensure_ascii=False, default=str)),
+            )
+            self._conn.executemany(
+                "INSERT INTO actors VALUES (?, ?, ?, ?, ?)",
+                [(model_id, i, a.name, a.description, a.type) for i, a in enumerate(usecase_diagram.actors)],
+            )
+            self._conn.executemany(
+                "INSERT INTO usecases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(model_id, i, u.name, u.description, u.actor, _dumps(u.includes), _dumps(u.extends),
+                  _dumps(u.preconditions), _dumps(u.postconditions)) for i, u in enumerate(usecase_diagram.usecases)],
+            )
+            self._conn.executemany(
+                "INSERT INTO classes VALUES (?, ?, ?, ?, ?)",
+                [(model_id, i, c.name, c.description, _dumps(c.stereotypes)) for i, c in enumerate(class_diagram.classes)],
+            )
+            self._conn.executemany(
+                "INSERT INTO attributes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(model_id, i, j, a.name, a.type, a.visibility, a.multiplicity, a.description)
+                 for i, c in enumerate(class_diagram.classes) for j, a in enumerate(c.attributes)],
+            )
+            self._conn.executemany(
+                "INSERT INTO methods VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(model_id, i, j, m.name, _dumps(m.parameters), m.return_type, m.visibility, m.description)
+                 for i, c in enumerate(class_diagram.classes) for j, m in enumerate(c.methods)],
+            )
+            self._conn.executemany(
+                "INSERT INTO relationships VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(model_id, i, r.name, r.source, r.target, r.type.value, r.source_multiplicity, r.target_multiplicity,
+                  r.description) for i, r in enumerate(class_diagram.relationships)],
+            )
+            self._conn.executemany(
+                "INSERT INTO constraints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(model_id, i, c.name, c.context, c.type, c.expression, c.description)
+                 for i, c in enumerate(model.ocl_constraints)],
+            )
+            self._conn.executemany(
+                "INSERT INTO sequence_diagrams VALUES (?, ?, ?, ?)",
+                [(model_id, i, s.name, s.model_dump_json()) for i, s in enumerate(model.sequence_diagrams)],
+            )
+        return model_id
+
+    def delete(self, model_id: str) -> bool:
+        """删除模型，返回模型是否存在"""
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM models WHERE model_id = ?", (model_id,)).rowcount
+            for table in _ELEMENT_TABLES:
+                self._conn.execute(f"DELETE FROM {table} WHERE model_id = ?", (model_id,))
+        return bool(deleted)
+
+    def _model_row(self, model_id: str) -> sqlite3.Row:
+        rows = self._query("SELECT * FROM models WHERE model_id = ?", (model_id,))
+        if not rows:
+            raise KeyError(f"模型不存在: {model_id}")
+        return rows[0]
+
+    def load(self, model_id: str) -> DomainModel:
+        """读取完整的领域模型"""
+        row = self._model_row(model_id)
+        return DomainModel.model_validate(dict(
+            name=row["name"],
+            description=row["description"],
+            usecase_diagram=self.load_usecase_diagram(model_id),
+            sequence_diagrams=self.load_sequence_diagrams(model_id),
+            class_diagram=self.load_class_diagram(model_id),
+            ocl_constraints=self.load_ocl_constraints(model_id),
+            metadata=json.loads(row["metadata"]),
+        ))
+
+    def _records(self, table: str, model_id: str, json_columns: tuple = (), where: str = "", params: tuple = ()) -> List[Dict[str, Any]]:
+        """读取某个模型在子表中的元素数据（去掉model_id，JSON列已解码），按位置排序"""
+        order = "class_position, position" if table in ("attributes", "methods") else "position"
+        records = []
+        for row in self._query(f"SELECT * FROM {table} WHERE model_id = ?{where} ORDER BY {order}", (model_id,) + params):
+            record = dict(row)
+            del record["model_id"]
+            for column in json_columns:
+                record[column] = json.loads(record[column])
+            records.append(record)
+        return records
+
+    @staticmethod
+    def _elements(model_class, records: List[Dict[str, Any]]) -> List[Any]:
+        return validate_list(model_class, [{key: value for key, value in record.items() if key not in ("position", "class_position")}
+                                           for record in records])
+
+    def load_usecase_diagram(self, model_id: str) -> UseCaseDiagram:
+        """只读取用例图"""
+        row = self._model_row(model_id)
+        actors = self._elements(Actor, self._records("actors", model_id))
+        usecases = self._elements(UseCase, self._records("usecases", model_id, ("includes", "extends", "preconditions", "postconditions")))
+        return UseCaseDiagram.model_validate(dict(name=row["usecase_diagram_name"], description=row["usecase_diagram_description"],
+                                                  actors=actors, usecases=usecases))
+
+    def load_class_diagram(self, model_id: str) -> ConceptualClassDiagram:
+        """只读取概念类图"""
+        row = self._model_row(model_id)
+        members: Dict[str, Dict[int, List[Dict[str, Any]]]] = {"attributes": {}, "methods": {}}
+        for table, json_columns in (("attributes", ()), ("methods", ("parameters",))):
+            for record in self._records(table, model_id, json_columns):
+                members[table].setdefault(record["class_position"], []).append(record)
+        classes = []
+        for record in self._records("classes", model_id, ("stereotypes",)):
+            position = record["position"]
+            record["attributes"] = self._elements(Attribute, members["attributes"].get(position, []))
+            record["methods"] = self._elements(Method, members["methods"].get(position, []))
+            classes.append(record)
+        relationships = self._elements(Relationship, self._records("relationships", model_id))
+        return ConceptualClassDiagram.model_validate(dict(name=row["class_diagram_name"], description=row["class_diagram_description"],
+                                                          classes=self._elements(Class, classes), relationships=relationships))
+
+    def load_sequence_diagrams(self, model_id: str) -> List[SystemSequenceDiagram]:
+        return [SystemSequenceDiagram.model_validate_json(r["data"])
+                for r in self._query("SELECT data FROM sequence_diagrams WHERE model_id = ? ORDER BY position", (model_id,))]
+
+    def load_sequence_diagram(self, model_id: str, name: str) -> Optional[SystemSequenceDiagram]:
+        """按名称读取单个顺序图，不存在时返回None"""
+        rows = self._query("SELECT data FROM sequence_diagrams WHERE model_id = ? AND name = ? ORDER BY position LIMIT 1",
+                           (model_id, name))
+        return SystemSequenceDiagram.model_validate_json(rows[0]["data"]) if rows else None
+
+    def load_ocl_constraints(self, model_id: str, context: Optional[str] = None) -> List[OCLConstraint]:
+        """读取OCL约束，context指定时只读取该类的约束"""
+        if context is None:
+            return self._elements(OCLConstraint, self._records("constraints", model_id))
+        return self._elements(OCLConstraint, self._records("constraints", model_id, where=" AND context = ?", params=(context,)))
+
+    def list_models(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """最近保存的模型及其元素数"""
+        return [dict(row) for row in self._query(
+            "SELECT m.model_id, m.name, m.run_id, m.created_at, "
+            "(SELECT COUNT(*) FROM usecases u WHERE u.model_id = m.model_id) AS usecase_count, "
+            "(SELECT COUNT(*) FROM classes c WHERE c.model_id = m.model_id) AS class_count "
+            "FROM models m ORDER BY m.created_at DESC LIMIT ?",
+            (limit,),
+        )]
+
+    def _models_with(self, table: str, name: str) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._query(
+            f"SELECT m.model_id, m.name, m.run_id, m.created_at FROM models m WHERE m.model_id IN "
+            f"(SELECT model_id FROM {table} WHERE name = ?) ORDER BY m.created_at DESC",
+            (name,),
+        )]
+
+    def models_with_class(self, name: str) -> List[Dict[str, Any]]:
+        """包含指定类的所有模型（按保存时间倒序）"""
+        return self._models_with("classes", name)
+
+    def models_with_actor(self, name: str) -> List[Dict[str, Any]]:
+        return self._models_with("actors", name)
+
+    def models_with_usecase(self, name: str) -> List[Dict[str, Any]]:
+        return self._models_with("usecases", name)
+
+    def relationships_of(self, class_name: str, model_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """以指定类为源或目标的关系（可限定模型）"""
+        where, params = "", (class_name, class_name)
+        if model_id is not None:
+            where, params = " AND model_id = ?", params + (model_id,)
+        return [dict(row) for row in self._query(
+            f"SELECT * FROM (SELECT * FROM relationships WHERE source = ? UNION ALL "
+            f"SELECT * FROM relationships WHERE target = ? AND source <> target) WHERE 1 = 1{where} "
+            "ORDER BY model_id, position",
+            params,
+        )]
+
+
+def _print_rows(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    if not rows:
+        print("  (无数据)")
+        return
+    cells = [[time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[c])) if c == "created_at" else str(row.get(c) or "-")
+              for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="领域模型仓库查询")
+    parser.add_argument("--db", default=config.model_store_path, help="模型仓库SQLite文件路径")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="最近保存的模型")
+    list_parser.add_argument("--limit", type=int, default=20, help="显示条数")
+    class_parser = subparsers.add_parser("find-class", help="包含指定类的模型")
+    class_parser.add_argument("name", help="类名")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ 模型仓库不存在: {args.db}")
+        return
+    store = ModelStore(args.db)
+    try:
+        if args.command == "list":
+            _print_rows(store.list_models(args.limit), ["model_id", "name", "run_id", "created_at", "usecase_count", "class_count"])
+        else:
+            _print_rows(store.models_with_class(args.name), ["model_id", "name", "run_id", "created_at"])
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+PlantUML导出模块
+把用例图、概念类图和每个系统顺序图导出为PlantUML源文件：逐行写入文件句柄而不是先拼成整个字符串，
+名称中的标点在别名中替换为下划线并自动去重；顺序图很多时用进程池并行写入。
+节点数超过预算的用例图和类图按参与者/关系聚类分页导出，另生成一张页面索引图。
+所有文件经 artifacts.ArtifactWriter 写入：内容未变化的图不会被重写
+"""
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+from artifacts import ArtifactWriter, write_if_changed
+from config import config
+from dsl_models import ConceptualClassDiagram, DomainModel, RelationshipType, SystemSequenceDiagram, UseCaseDiagram
+from sharding import DisjointSet, cluster_usecases
+
+_VISIBILITY = {"public": "+", "private": "-", "protected": "#", "package": "~"}
+_ARROWS = {
+    RelationshipType.ASSOCIATION: "--",
+    RelationshipType.GENERALIZATION: "--|>",
+    RelationshipType.COMPOSITION: "*--",
+    RelationshipType.AGGREGATION: "o--",
+    RelationshipType.INCLUDE: "..>",
+    RelationshipType.EXTEND: "..>",
+}
+
+
+def sanitize_alias(name: str) -> str:
+    """PlantUML别名：非单词字符（空格、标点等）替换为下划线，不能以数字开头"""
+    alias = re.sub(r"\W", "_", name or "")
+    return alias if alias and not alias[0].isdigit() else f"_{alias}"
+
+
+def quote(text: str) -> str:
+    """双引号内的显示名称（PlantUML不支持转义双引号，替换为单引号）"""
+    return (text or "").replace('"', "'").replace("\n", " ")
+
+
+def file_slug(name: str, max_length: int = 40) -> str:
+    """文件名中可用的名称片段"""
+    return re.sub(r"[\\/:*?\"<>|\s]+", "_", name or "").strip("_")[:max_length] or "diagram"
+
+
+class AliasTable:
+    """为名称分配唯一别名；同名的不同种类元素（如同名的参与者和用例）得到不同别名"""
+
+    def __init__(self):
+        self._aliases: Dict[Tuple[str, str], str] = {}
+        self._taken = set()
+
+    def alias(self, name: str, kind: str = "") -> str:
+        key = (kind, name)
+        alias = self._aliases.get(key)
+        if alias is None:
+            base = alias = sanitize_alias(name)
+            suffix = 2
+            while alias in self._taken:
+                alias = f"{base}_{suffix}"
+                suffix += 1
+            self._taken.add(alias)
+            self._aliases[key] = alias
+        return alias
+
+
+def write_usecase_diagram(diagram: UseCaseDiagram, out: TextIO, aliases: Optional[AliasTable] = None) -> None:
+    """写入用例图：参与者、用例、参与者关联和包含/扩展关系"""
+    aliases = aliases or AliasTable()
+    out.write("@startuml\n")
+    out.write(f"title {diagram.name}\n")
+    for actor in diagram.actors:
+        out.write(f"actor \"{quote(actor.name)}\" as {aliases.alias(actor.name, 'actor')}\n")
+    for usecase in diagram.usecases:
+        out.write(f"usecase \"{quote(usecase.name)}\" as {aliases.alias(usecase.name, 'usecase')}\n")
+    _write_relations(diagram.usecases, out, aliases)
+    out.write("@enduml\n")
+
+
+def _write_relations(usecases: Iterable, out: TextIO, aliases: AliasTable) -> None:
+    for usecase in usecases:
+        usecase_alias = aliases.alias(usecase.name, "usecase")
+        out.write(f"{aliases.alias(usecase.actor, 'actor')} --> {usecase_alias}\n")
+        for included in usecase.includes:
+            out.write(f"{usecase_alias} ..> {aliases.alias(included, 'usecase')} : <<include>>\n")
+        for extended in usecase.extends:
+            out.write(f"{usecase_alias} ..> {aliases.alias(extended, 'usecase')} : <<extend>>\n")
+
+
+def write_usecase_page(diagram: UseCaseDiagram, names: Set[str], page_of: Dict[str, int], title: str, out: TextIO) -> None:
+    """
+    写入用例图的一页：页内用例按主要参与者分包，引用的其他页用例画为带页码构造型的占位节点
+
+    Args:
+        diagram: 完整的用例图
+        names: 本页的用例名称
+        page_of: 用例名称 -> 所在页码（从1开始）
+        title: 本页标题
+        out: 文本句柄
+    """
+    aliases = AliasTable()
+    members = [usecase for usecase in diagram.usecases if usecase.name in names]
+    by_actor: Dict[str, List] = {}
+    for usecase in members:
+        by_actor.setdefault(usecase.actor, []).append(usecase)
+    out.write("@startuml\n")
+    out.write(f"title {title}\n")
+    for actor in by_actor:
+        out.write(f"actor \"{quote(actor)}\" as {aliases.alias(actor, 'actor')}\n")
+    for actor, usecases in by_actor.items():
+        out.write(f"package \"{quote(actor)}的用例\" {{\n")
+        for usecase in usecases:
+            out.write(f"  usecase \"{quote(usecase.name)}\" as {aliases.alias(usecase.name, 'usecase')}\n")
+        out.write("}\n")
+    external = [name for usecase in members for name in usecase.includes + usecase.extends if name not in names]
+    for name in dict.fromkeys(external):
+        page = f" <<第{page_of[name]}页>>" if name in page_of else ""
+        out.write(f"usecase \"{quote(name)}\" as {aliases.alias(name, 'usecase')}{page}\n")
+    _write_relations(members, out, aliases)
+    out.write("@enduml\n")
+
+
+def _write_class(cls, out: TextIO, aliases: AliasTable) -> None:
+    stereotypes = "".join(f" <<{s}>>" for s in cls.stereotypes)
+    out.write(f"class \"{quote(cls.name)}\" as {aliases.alias(cls.name)}{stereotypes} {{\n")
+    for attribute in cls.attributes:
+        multiplicity = f" [{attribute.multiplicity}]" if attribute.multiplicity != "1" else ""
+        out.write(f"  {_VISIBILITY.get(attribute.visibility, '')}{attribute.name} : {attribute.type}{multiplicity}\n")
+    for method in cls.methods:
+        return_type = f" : {method.return_type}" if method.return_type else ""
+        out.write(f"  {_VISIBILITY.get(method.visibility, '')}{method.name}({', '.join(method.parameters)}){return_type}\n")
+    out.write("}\n")
+
+
+def _write_relationships(relationships: Iterable, out: TextIO, aliases: AliasTable) -> None:
+    for relationship in relationships:
+        source, target = aliases.alias(relationship.source), aliases.alias(relationship.target)
+        label = f" : {relationship.name}" if relationship.name else ""
+        if relationship.type == RelationshipType.GENERALIZATION:
+            out.write(f"{source} --|> {target}{label}\n")
+            continue
+        out.write(f"{source} \"{relationship.source_multiplicity}\" {_ARROWS[relationship.type]} "
+                  f"\"{relationship.target_multiplicity}\" {target}{label}\n")
+
+
+def write_class_diagram(diagram: ConceptualClassDiagram, out: TextIO) -> None:
+    """写入概念类图：类的属性（可见性、类型、多重性）、方法和各类关系及两端多重性"""
+    aliases = AliasTable()
+    out.write("@startuml\n")
+    out.write(f"title {diagram.name}\n")
+    for cls in diagram.classes:
+        _write_class(cls, out, aliases)
+    _write_relationships(diagram.relationships, out, aliases)
+    out.write("@enduml\n")
+
+
+def _relationship_owner(relationship, declared: Set[str]) -> str:
+    """关系画在哪个类所在的页：源类已声明时为源类，否则为目标类"""
+    return relationship.source if relationship.source in declared or relationship.target not in declared else relationship.target
+
+
+def write_class_page(diagram: ConceptualClassDiagram, names: Set[str], page_of: Dict[str, int], title: str, out: TextIO) -> None:
+    """
+    写入类图的一页：页内的类及以它们为归属端的关系，关系另一端在其他页时画为带页码构造型的占位类
+
+    Args:
+        diagram: 完整的类图
+        names: 本页的类名
+        page_of: 类名 -> 所在页码（从1开始）
+        title: 本页标题
+        out: 文本句柄
+    """
+    aliases = AliasTable()
+    declared = {cls.name for cls in diagram.classes}
+    relationships = [r for r in diagram.relationships if _relationship_owner(r, declared) in names]
+    out.write("@startuml\n")
+    out.write(f"title {title}\n")
+    for cls in diagram.classes:
+        if cls.name in names:
+            _write_class(cls, out, aliases)
+    external = [name for r in relationships for name in (r.source, r.target) if name not in names]
+    for name in dict.fromkeys(external):
+        page = f" <<第{page_of[name]}页>>" if name in page_of else ""
+        out.write(f"class \"{quote(name)}\" as {aliases.alias(name)}{page}\n")
+    _write_relationships(relationships, out, aliases)
+    out.write("@enduml\n")
+
+
+def write_page_index(title: str, pages: List[Tuple[str, int]], links: Dict[Tuple[int, int], int], out: TextIO,
+                     actors: Optional[Dict[str, List[int]]] = None) -> None:
+    """
+    写入分页导出的索引图：每页一个节点，页间引用画为带引用数的依赖
+
+    Args:
+        title: 索引图标题
+        pages: [(页文件名, 页内元素数)]
+        links: {(引用方页码, 被引用方页码): 引用数}，页码从1开始
+        out: 文本句柄
+        actors: {参与者: [出现的页码]}，用例图索引中画出参与者到页的关联
+    """
+    out.write("@startuml\n")
+    out.write(f"title {title}\n")
+    for number, (filename, count) in enumerate(pages, 1):
+        out.write(f"rectangle \"第{number}页\\n{quote(filename)}\\n{count}个元素\" as page_{number}\n")
+    aliases = AliasTable()
+    for actor, numbers in (actors or {}).items():
+        alias = aliases.alias(actor, "actor")
+        out.write(f"actor \"{quote(actor)}\" as {alias}\n")
+        for number in numbers:
+            out.write(f"{alias} --> page_{number}\n")
+    for (source, target), count in sorted(links.items()):
+        out.write(f"page_{source} ..> page_{target} : {count}\n")
+    out.write("@enduml\n")
+
+
+class _Page:
+    """分页时一页的节点集合：本页元素、附带节点（如参与者）和引用的其他元素（画为占位节点）"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.members: Set[str] = set()
+        self.extra: Set = set()
+        self.references: Set[str] = set()
+
+    def cost(self, names: List[str], extra: Set, references: Set[str]) -> int:
+        """加入names后本页的节点数"""
+        members = self.members.union(names)
+        return len(members) + len(self.extra | extra) + len((self.references | references) - members)
+
+    def add(self, names: List[str], extra: Set, references: Set[str]) -> None:
+        self.names.extend(names)
+        self.members.update(names)
+        self.extra |= extra
+        self.references |= references
+
+
+def paginate(units: List[List[str]], extra: Callable[[str], Iterable], references: Callable[[str], Iterable[str]],
+             max_nodes: int) -> List[List[str]]:
+    """
+    把元素分组装入节点数不超过max_nodes的页
+
+    每个分组（聚类）整体放入第一个装得下的页（首次适应）；单个分组就超过预算时按顺序拆到连续的新页。
+    一页的节点数 = 本页元素 + 附带节点 + 引用的其他页元素（占位节点）
+
+    Args:
+        units: 元素分组，同组的元素尽量在同一页
+        extra: 元素 -> 随元素出现在页上的附带节点（如用例的参与者）
+        references: 元素 -> 引用的元素（如包含的用例、关系的另一端）
+        max_nodes: 每页的节点预算
+
+    Returns:
+        各页的元素名称列表
+    """
+    pages: List[_Page] = []
+    for unit in units:
+        unit_extra = {node for name in unit for node in extra(name)}
+        unit_references = {target for name in unit for target in references(name)}
+        page = next((p for p in pages if p.cost(unit, unit_extra, unit_references) <= max_nodes), None)
+        if page is None and _Page().cost(unit, unit_extra, unit_references) <= max_nodes:
+            page = _Page()
+            pages.append(page)
+        if page is not None:
+            page.add(unit, unit_extra, unit_references)
+            continue
+        page = _Page()
+        pages.append(page)
+        for name in unit:
+            name_extra, name_references = set(extra(name)), set(references(name))
+            if page.names and page.cost([name], name_extra, name_references) > max_nodes:
+                page = _Page()
+                pages.append(page)
+            page.add([name], name_extra, name_references)
+    return [page.names for page in pages]
+
+
+def write_sequence_diagram(diagram: SystemSequenceDiagram, out: TextIO) -> None:
+    """写入系统顺序图：参与者、系统和消息（有返回值时画返回消息）"""
+    aliases = AliasTable()
+    out.write("@startuml\n")
+    out.write(f"title {diagram.name}\n")
+    for actor in diagram.actors:
+        out.write(f"actor \"{quote(actor)}\" as {aliases.alias(actor)}\n")
+    for system in diagram.systems:
+        out.write(f"participant \"{quote(system)}\" as {aliases.alias(system)}\n")
+    for message in diagram.messages:
+        arrow = "->>" if message.message_type == "asynchronous" else "->"
+        sender, receiver = aliases.alias(message.sender), aliases.alias(message.receiver)
+        out.write(f"{sender} {arrow} {receiver} : {message.name}({', '.join(message.parameters)})\n")
+        if message.return_value:
+            out.write(f"{receiver} --> {sender} : {message.return_value}\n")
+    out.write("@enduml\n")
+
+
+def _write_pages(title: str, pages: List[List[str]], page_writer, diagram, directory: str, index_path: str,
+                 links: Dict[Tuple[int, int], int], artifacts: ArtifactWriter,
+                 actors: Optional[Dict[str, List[int]]] = None) -> List[str]:
+    """逐页写入 directory/NNN.puml，再把索引图写入index_path，返回各页路径"""
+    page_of = {name: number for number, names in enumerate(pages, 1) for name in names}
+    paths = []
+    for number, names in enumerate(pages, 1):
+        path = os.path.join(directory, f"{number:03d}.puml")
+        page_title = f"{title}（第{number}/{len(pages)}页）"
+        artifacts.write(path, lambda f, names=names, page_title=page_title:
+                        page_writer(diagram, set(names), page_of, page_title, f))
+        paths.append(path)
+    relative = os.path.basename(directory)
+    index = [(f"{relative}/{os.path.basename(path)}", len(names)) for path, names in zip(paths, pages)]
+    artifacts.write(index_path, lambda f: write_page_index(f"{title}（索引）", index, links, f, actors))
+    return paths
+
+
+def _page_links(pages: List[List[str]], references: Callable[[str], Iterable[str]]) -> Dict[Tuple[int, int], int]:
+    page_of = {name: number for number, names in enumerate(pages, 1) for name in names}
+    links: Counter = Counter()
+    for number, names in enumerate(pages, 1):
+        for name in names:
+            for target in references(name):
+                if page_of.get(target, number) != number:
+                    links[(number, page_of[target])] += 1
+    return dict(links)
+
+
+def export_usecase_pages(diagram: UseCaseDiagram, directory: str, index_path: str, max_nodes: int,
+                         artifacts: ArtifactWriter) -> List[str]:
+    """
+    分页导出用例图：用例先按包含/扩展关系和主要参与者聚类（见 sharding.cluster_usecases），再装入节点预算内的页
+
+    Returns:
+        各页的文件路径（索引图写入index_path）
+    """
+    usecases = {}
+    for usecase in diagram.usecases:
+        usecases.setdefault(usecase.name, usecase)
+
+    def references(name: str) -> List[str]:
+        return usecases[name].includes + usecases[name].extends
+
+    # 参与者与用例不在同一命名空间，附带节点用 ("actor", 名称) 表示
+    pages = paginate(cluster_usecases(diagram, max(1, max_nodes - 1)), lambda name: [("actor", usecases[name].actor)],
+                     references, max_nodes)
+    actors: Dict[str, List[int]] = {}
+    for number, names in enumerate(pages, 1):
+        for actor in dict.fromkeys(usecases[name].actor for name in names):
+            actors.setdefault(actor, []).append(number)
+    return _write_pages(diagram.name, pages, write_usecase_page, diagram, directory, index_path,
+                        _page_links(pages, references), artifacts, actors)
+
+
+def export_class_pages(diagram: ConceptualClassDiagram, directory: str, index_path: str, max_nodes: int,
+                       artifacts: ArtifactWriter) -> List[str]:
+    """
+    分页导出类图：泛化、组合和聚合关系相连的类聚为一组，再装入节点预算内的页
+
+    Returns:
+        各页的文件路径（索引图写入index_path）
+    """
+    declared = [cls.name for cls in diagram.classes]
+    clusters = DisjointSet(declared)
+    owned: Dict[str, List[str]] = {}
+    for relationship in diagram.relationships:
+        owner = _relationship_owner(relationship, clusters)
+        owned.setdefault(owner, []).append(relationship.target if owner == relationship.source else relationship.source)
+        if relationship.type != RelationshipType.ASSOCIATION and relationship.source in clusters and relationship.target in clusters:
+            clusters.union(relationship.source, relationship.target)
+
+    def references(name: str) -> List[str]:
+        return owned.get(name, [])
+
+    pages = paginate(clusters.groups(), lambda name: (), references, max_nodes)
+    return _write_pages(diagram.name, pages, write_class_page, diagram, directory, index_path,
+                        _page_links(pages, references), artifacts)
+
+
+def _write_sequence_batch(batch: List[Tuple[dict, str, Optional[dict]]]) -> List[Tuple[str, dict, bool]]:
+    """进程池任务：把一批顺序图（model_dump后的数据）写入各自的文件，返回 [(路径, 清单记录, 是否变化)]"""
+    results = []
+    for data, path, previous in batch:
+        diagram = SystemSequenceDiagram.model_validate(data)
+        entry, changed = write_if_changed(path, lambda f: write_sequence_diagram(diagram, f), previous)
+        results.append((path, entry, changed))
+    return results
+
+
+def _batches(items: List, count: int) -> Iterable[List]:
+    size = max(1, -(-len(items) // count))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def export_plantuml(model: DomainModel, output_dir: str, prefix: str, workers: Optional[int] = None,
+                    max_nodes: Optional[int] = None, artifacts: Optional[ArtifactWriter] = None) -> Dict[str, object]:
+    """
+    导出领域模型的全部PlantUML图
+
+    文件布局：<prefix>_usecase.puml、<prefix>_class.puml、<prefix>_sequence/NNN_<顺序图名>.puml，
+    分页时另有 <prefix>_usecase/NNN.puml、<prefix>_class/NNN.puml
+
+    Args:
+        model: 领域模型
+        output_dir: 输出目录
+        prefix: 文件名前缀
+        workers: 顺序图并行写入的进程数，默认使用配置；顺序图少于配置的阈值时在当前进程写入
+        max_nodes: 每张图的节点预算，默认使用配置；超过预算的用例图/类图分页写入 <prefix>_usecase/、<prefix>_class/，
+            此时 <prefix>_usecase.puml、<prefix>_class.puml 为页面索引图
+        artifacts: 增量写入会话，与其他产物（如保存的模型）共用一个清单时传入，由调用方调用finish；
+            默认使用 <output_dir>/<prefix>_manifest.json 并在导出结束时写入清单
+
+    Returns:
+        {"usecase": 路径, "class": 路径, "sequence": [路径], "usecase_pages": [路径], "class_pages": [路径],
+         "changed": [内容有变化、被重写的产物]}
+    """
+    workers = workers or config.plantuml_workers
+    max_nodes = max_nodes or config.plantuml_max_nodes
+    own_session = artifacts is None
+    artifacts = artifacts or ArtifactWriter(output_dir, prefix)
+    changed_before = len(artifacts.changed)
+    sequence_dir = os.path.join(output_dir, f"{prefix}_sequence")
+    usecase_diagram, class_diagram = model.usecase_diagram, model.class_diagram
+    result: Dict[str, object] = {
+        "usecase": os.path.join(output_dir, f"{prefix}_usecase.puml"),
+        "class": os.path.join(output_dir, f"{prefix}_class.puml"),
+        "usecase_pages": [],
+        "class_pages": [],
+    }
+    if len(usecase_diagram.actors) + len(usecase_diagram.usecases) > max_nodes:
+        result["usecase_pages"] = export_usecase_pages(usecase_diagram, os.path.join(output_dir, f"{prefix}_usecase"),
+                                                       result["usecase"], max_nodes, artifacts)
+    else:
+        artifacts.write(result["usecase"], lambda f: write_usecase_diagram(usecase_diagram, f))
+    if len(class_diagram.classes) > max_nodes:
+        result["class_pages"] = export_class_pages(class_diagram, os.path.join(output_dir, f"{prefix}_class"),
+                                                   result["class"], max_nodes, artifacts)
+    else:
+        artifacts.write(result["class"], lambda f: write_class_diagram(class_diagram, f))
+    paths = [os.path.join(sequence_dir, f"{i:03d}_{file_slug(diagram.name)}.puml")
+             for i, diagram in enumerate(model.sequence_diagrams)]
+    if workers > 1 and len(paths) >= config.plantuml_parallel_min_diagrams:
+        items = [(diagram.model_dump(), path, artifacts.previous(path)) for diagram, path in zip(model.sequence_diagrams, paths)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch in executor.map(_write_sequence_batch, _batches(items, workers * 4)):
+                for path, entry, changed in batch:
+                    artifacts.record(path, entry, changed)
+    else:
+        for diagram, path in zip(model.sequence_diagrams, paths):
+            artifacts.write(path, lambda f, diagram=diagram: write_sequence_diagram(diagram, f))
+    result["sequence"] = paths
+    result["changed"] = artifacts.changed[changed_before:]
+    if own_session:
+        artifacts.finish()
+    return result
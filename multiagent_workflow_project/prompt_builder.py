@@ -0,0 +1,61 @@
+"""
+Prompt构建模块
+按"稳定部分在前、可变负载在后"组织chat消息，使上游前缀缓存能够命中：
+system指令（含输出格式说明）、few-shot示例和每个阶段固定的任务说明构成跨调用逐字节一致的前缀，
+本次调用的数据（需求文本、用例、模型JSON、反馈）只出现在最后一条user消息的末尾
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from ledger import estimate_messages_tokens, estimate_tokens
+
+
+@dataclass
+class PromptLayout:
+    """构建好的消息列表及其稳定前缀的指纹"""
+    messages: List[Dict[str, str]]
+    prefix_hash: str
+    prefix_tokens: int
+
+
+def _section(title: str, content: str) -> str:
+    return f"{title}：\n{content}" if title else content
+
+
+def build_prompt(instructions: str, task: str, sections: Sequence[Tuple[str, str]] = (),
+                 examples: Sequence[Tuple[str, str]] = ()) -> PromptLayout:
+    """
+    构建前缀缓存友好的消息列表
+
+    Args:
+        instructions: system指令（稳定）
+        task: 阶段固定的任务说明，不能包含用例名等本次调用的数据（稳定）
+        sections: 可变负载 [(标题, 内容)]，按顺序追加在任务说明之后
+        examples: few-shot示例 [(输入, 输出)]，作为user/assistant消息对放在system之后（稳定）
+
+    Returns:
+        PromptLayout，prefix_hash可用于确认不同调用是否共享同一前缀
+    """
+    messages = [{"role": "system", "content": instructions}]
+    for example_input, example_output in examples:
+        messages.append({"role": "user", "content": example_input})
+        messages.append({"role": "assistant", "content": example_output})
+    prefix_tokens = estimate_messages_tokens(messages) + estimate_tokens(task)
+
+    digest = hashlib.sha1()
+    for message in messages:
+        digest.update(message["role"].encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(message["content"].encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(task.encode("utf-8"))
+
+    payload = "\n\n".join(_section(title, content) for title, content in sections)
+    messages.append({"role": "user", "content": f"{task}\n\n{payload}" if payload else task})
+    return PromptLayout(messages=messages, prefix_hash=digest.hexdigest()[:16], prefix_tokens=prefix_tokens)
+
+
+def build_agent_prompt(agent, task: str, sections: Sequence[Tuple[str, str]] = ()) -> PromptLayout:
+    """以Agent的指令作为system消息构建Prompt"""
+    return build_prompt(agent.instructions, task, sections, agent.examples or ())
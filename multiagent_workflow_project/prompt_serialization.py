@@ -0,0 +1,145 @@
+"""
+Prompt序列化模块
+将嵌入下游Prompt的模型按阶段投影为紧凑JSON：只保留该阶段需要的字段，
+去掉空值和默认值，使用紧凑分隔符，并统计相对 model_dump_json(indent=2) 的token缩减
+"""
+import json
+from typing import Any, Dict, Optional, Set, Union
+
+from pydantic import BaseModel
+
+from ledger import estimate_tokens
+
+# 每个阶段的投影：include为pydantic的include规格，drop为递归删除的字段名
+PROJECTIONS: Dict[str, Dict[str, Any]] = {
+    # 类图设计只需要用例、参与者及其关系，参与者和系统描述对识别概念类帮助不大
+    "class_design": {
+        "include": {
+            "name": True,
+            "actors": {"__all__": {"name", "type"}},
+            "usecases": {"__all__": {"name", "description", "actor", "includes", "extends",
+                                     "preconditions", "postconditions"}},
+        },
+        "drop": set(),
+    },
+    # 顺序图针对单个用例，保留完整用例内容
+    "sequence_design": {
+        "include": None,
+        "drop": set(),
+    },
+    # OCL只需要名称、属性、方法签名和关系
+    "ocl_usecases": {
+        "include": {
+            "usecases": {"__all__": {"name", "actor", "preconditions", "postconditions"}},
+        },
+        "drop": {"description"},
+    },
+    "ocl_classes": {
+        "include": {
+            "classes": {"__all__": {
+                "name": True,
+                "attributes": {"__all__": {"name", "type", "multiplicity"}},
+                "methods": {"__all__": {"name", "parameters", "return_type"}},
+            }},
+            "relationships": {"__all__": {"source", "target", "type", "source_multiplicity", "target_multiplicity"}},
+        },
+        "drop": {"description"},
+    },
+    # 增量建模时Agent返回的修改后元素会整体替换原元素，当前图保留合并会覆盖的全部字段
+    "delta": {
+        "include": None,
+        "drop": set(),
+    },
+    # 验证关注结构一致性，去掉所有描述文字和元数据
+    "validation": {
+        "include": {"name", "usecase_diagram", "sequence_diagrams", "class_diagram", "ocl_constraints"},
+        "drop": {"description"},
+    },
+    # 协调者需要返回完整模型，只做紧凑化，不删字段
+    "improvement": {
+        "include": {"name", "description", "usecase_diagram", "sequence_diagrams", "class_diagram", "ocl_constraints"},
+        "drop": set(),
+    },
+}
+
+
+def _drop_keys(data: Any, keys: Set[str]) -> Any:
+    if isinstance(data, dict):
+        return {k: _drop_keys(v, keys) for k, v in data.items() if k not in keys}
+    if isinstance(data, list):
+        return [_drop_keys(v, keys) for v in data]
+    return data
+
+
+def _drop_empty(data: Any) -> Any:
+    # exclude_defaults会保留在include中显式列出的空列表，这里统一去掉
+    if isinstance(data, dict):
+        return {k: _drop_empty(v) for k, v in data.items() if v not in (None, [], {}, "")}
+    if isinstance(data, list):
+        return [_drop_empty(v) for v in data]
+    return data
+
+
+def project(obj: Union[BaseModel, list], stage: Optional[str] = None) -> Any:
+    """
+    按阶段投影模型为普通Python数据
+
+    Args:
+        obj: pydantic模型或模型列表
+        stage: 阶段名称（PROJECTIONS中的键），为None时只去掉空值和默认值
+
+    Returns:
+        投影后的dict或list
+    """
+    if isinstance(obj, list):
+        return [project(item, stage) for item in obj]
+    projection = PROJECTIONS.get(stage, {}) if stage else {}
+    data = obj.model_dump(mode="json", include=projection.get("include"), exclude_none=True, exclude_defaults=True)
+    drop = projection.get("drop")
+    if drop:
+        data = _drop_keys(data, drop)
+    return _drop_empty(data)
+
+
+def to_prompt_json(obj: Union[BaseModel, list], stage: Optional[str] = None) -> str:
+    """
+    将模型按阶段投影并序列化为紧凑JSON字符串
+
+    Args:
+        obj: pydantic模型或模型列表
+        stage: 阶段名称
+
+    Returns:
+        紧凑JSON字符串（不转义中文）
+    """
+    return json.dumps(project(obj, stage), ensure_ascii=False, separators=(",", ":"))
+
+
+def _baseline_json(obj: Union[BaseModel, list]) -> str:
+    if isinstance(obj, list):
+        return "[" + ",\n".join(item.model_dump_json(indent=2) for item in obj) + "]"
+    return obj.model_dump_json(indent=2)
+
+
+def compaction_report(obj: Union[BaseModel, list], stage: Optional[str] = None,
+                      compact: Optional[str] = None) -> Dict[str, Any]:
+    """
+    统计紧凑序列化相对 model_dump_json(indent=2) 的token缩减
+
+    Args:
+        obj: pydantic模型或模型列表
+        stage: 阶段名称
+        compact: 已经序列化好的紧凑JSON，避免重复序列化
+
+    Returns:
+        {"stage", "baseline_tokens", "compact_tokens", "reduction"}
+    """
+    compact = compact if compact is not None else to_prompt_json(obj, stage)
+    baseline_tokens = estimate_tokens(_baseline_json(obj))
+    compact_tokens = estimate_tokens(compact)
+    return {
+        "stage": stage,
+        "baseline_tokens": baseline_tokens,
+        "compact_tokens": compact_tokens,
+        "reduction": round(1 - compact_tokens / baseline_tokens, 4) if baseline_tokens else 0.0,
+    }
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON序列化模块
+`json.dump(model.model_dump())` 先构建整棵字典副本，再由纯Python编码器逐个对象输出。
+这里直接使用pydantic-core的Rust序列化器（不构建中间字典），安装了 orjson 时也可以选用它；
+输出格式可配置为带缩进或紧凑，中文字符原样输出。
+大型模型按元素分块流式写入文件（模型逐字段展开，模型列表中的每个元素各序列化一次），
+峰值内存与最大的单个元素成正比，输出与一次性序列化的结果逐字节相同
+"""
+import json
+from typing import Any, Optional, TextIO
+
+import pydantic_core
+from pydantic import BaseModel
+
+from config import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("pydantic", "orjson", "json")
+
+
+def _backend(backend: Optional[str]) -> str:
+    backend = backend or config.serialization_backend
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的序列化后端: {backend}")
+    if backend == "orjson" and orjson is None:
+        return "pydantic"
+    return backend
+
+
+def _indent(pretty: Optional[bool]) -> Optional[int]:
+    return 2 if (config.serialization_pretty if pretty is None else pretty) else None
+
+
+def dumps(value: Any, pretty: Optional[bool] = None, backend: Optional[str] = None) -> bytes:
+    """
+    把pydantic模型或普通数据序列化为UTF-8编码的JSON
+
+    Args:
+        value: pydantic模型、列表、字典等
+        pretty: 是否缩进2格输出，默认使用配置
+        backend: pydantic（默认）、orjson（未安装时退回pydantic）或json
+
+    Returns:
+        JSON字节串
+    """
+    indent = _indent(pretty)
+    backend = _backend(backend)
+    if backend == "pydantic":
+        return pydantic_core.to_json(value, indent=indent)
+    # orjson和标准库json只接受普通数据
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    if backend == "orjson":
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0)
+    separators = None if indent else (",", ":")
+    return json.dumps(value, ensure_ascii=False, indent=indent, separators=separators).encode("utf-8")
+
+
+def dumps_text(value: Any, pretty: Optional[bool] = None, backend: Optional[str] = None) -> str:
+    return dumps(value, pretty, backend).decode("utf-8")
+
+
+class _StreamWriter:
+    """按元素分块写入"""
+
+    def __init__(self, f: TextIO, indent: Optional[int]):
+        self._f = f
+        self._indent = indent
+
+    def _newline(self, level: int) -> str:
+        return "\n" + " " * (self._indent * level) if self._indent else ""
+
+    def _chunk(self, value: Any, level: int) -> None:
+        text = pydantic_core.to_json(value, indent=self._indent).decode("utf-8")
+        if self._indent and level:
+            text = text.replace("\n", self._newline(level))
+        self._f.write(text)
+
+    def write(self, value: Any, level: int = 0) -> None:
+        if isinstance(value, BaseModel):
+            items = [(name, getattr(value, name)) for name in type(value).model_fields]
+            items += list((value.__pydantic_extra__ or {}).items())
+            if not items:
+                self._f.write("{}")
+                return
+            self._f.write("{")
+            key_separator = ": " if self._indent else ":"
+            for i, (name, item) in enumerate(items):
+                self._f.write(("," if i else "") + self._newline(level + 1) + json.dumps(name, ensure_ascii=False) + key_separator)
+                self.write(item, level + 1)
+            self._f.write(self._newline(level) + "}")
+        elif isinstance(value, list) and value and isinstance(value[0], BaseModel):
+            self._f.write("[")
+            for i, item in enumerate(value):
+                self._f.write(("," if i else "") + self._newline(level + 1))
+                self._chunk(item, level + 1)
+            self._f.write(self._newline(level) + "]")
+        else:
+            self._chunk(value, level)
+
+
+def write_json(model: BaseModel, f: TextIO, pretty: Optional[bool] = None) -> None:
+    """
+    把pydantic模型流式写入文本句柄，输出与 dumps(model, pretty) 相同
+
+    Args:
+        model: pydantic模型
+        f: 文本句柄（也可以是 artifacts 中计算哈希的写入器）
+        pretty: 是否缩进输出，默认使用配置
+    """
+    _StreamWriter(f, _indent(pretty)).write(model)
+
+
+def save_json(model: BaseModel, path: str, pretty: Optional[bool] = None) -> None:
+    """把pydantic模型流式写入文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        write_json(model, f, pretty)
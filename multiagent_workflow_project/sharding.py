@@ -0,0 +1,158 @@
+"""
+子系统分片模块
+用例很多的系统一次生成类图时Prompt和输出都过长：按包含/扩展关系的连通性和主要参与者把用例划分为子系统，
+各子系统并行生成类图和OCL约束，再按规范化名称去重合并为一个概念类图
+"""
+import re
+import unicodedata
+from typing import Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+
+from dsl_models import Class, ConceptualClassDiagram, OCLConstraint, UseCaseDiagram
+
+K = TypeVar("K", bound=Hashable)
+
+
+class DisjointSet(Generic[K]):
+    """并查集（路径压缩 + 按大小合并）"""
+
+    def __init__(self, items: Iterable[K] = ()):
+        self._parent: Dict[K, K] = {}
+        self._size: Dict[K, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: K) -> None:
+        if item not in self._parent:
+            self._parent[item] = item
+            self._size[item] = 1
+
+    def __contains__(self, item: K) -> bool:
+        return item in self._parent
+
+    def find(self, item: K) -> K:
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, a: K, b: K) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+
+    def groups(self) -> List[List[K]]:
+        """按元素首次加入的顺序返回各个集合"""
+        groups: Dict[K, List[K]] = {}
+        for item in self._parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return list(groups.values())
+
+
+def normalize_name(name: str) -> str:
+    """规范化名称：全半角统一、忽略大小写、空白、下划线和连字符"""
+    return re.sub(r"[\s_\-]+", "", unicodedata.normalize("NFKC", name or "")).lower()
+
+
+def cluster_usecases(diagram: UseCaseDiagram, max_size: int) -> List[List[str]]:
+    """
+    把用例划分为子系统
+
+    有包含/扩展关系的用例必须在同一子系统中（连通分量不拆分，即使超过max_size）；
+    同一主要参与者的连通分量按顺序放入第一个装得下的子系统（首次适应），每个子系统不超过max_size个用例
+
+    Args:
+        diagram: 用例图
+        max_size: 每个子系统的用例数上限
+
+    Returns:
+        各子系统的用例名称列表，按用例在用例图中的顺序排列
+    """
+    names = [usecase.name for usecase in diagram.usecases]
+    links = DisjointSet(names)
+    for usecase in diagram.usecases:
+        for target in usecase.includes + usecase.extends:
+            if target in links:
+                links.union(usecase.name, target)
+
+    actor_of = {usecase.name: usecase.actor for usecase in diagram.usecases}
+    bins_by_actor: Dict[str, List[List[str]]] = {}
+    for component in links.groups():
+        bins = bins_by_actor.setdefault(actor_of[component[0]], [])
+        target = next((group for group in bins if len(group) + len(component) <= max_size), None)
+        if target is None:
+            target = []
+            bins.append(target)
+        target.extend(component)
+
+    order = {name: i for i, name in enumerate(names)}
+    clusters = [sorted(group, key=order.get) for bins in bins_by_actor.values() for group in bins]
+    return sorted(clusters, key=lambda group: order[group[0]])
+
+
+def _merge_members(items: List, updates: List) -> List:
+    """按规范化名称合并属性或方法，已有的保持不变"""
+    seen = {normalize_name(item.name) for item in items}
+    merged = list(items)
+    for item in updates:
+        if normalize_name(item.name) not in seen:
+            seen.add(normalize_name(item.name))
+            merged.append(item)
+    return merged
+
+
+def merge_class_diagrams(diagrams: List[ConceptualClassDiagram]) -> Tuple[ConceptualClassDiagram, Dict[str, str]]:
+    """
+    合并各子系统的类图
+
+    规范化名称相同的类合并为一个（保留首次出现的名称，属性、方法和构造型取并集），
+    关系指向合并后的类名，并按（源、目标、类型、名称）去重
+
+    Returns:
+        (合并后的类图, {规范化名称: 合并后的类名})
+    """
+    classes: Dict[str, Class] = {}
+    for diagram in diagrams:
+        for cls in diagram.classes:
+            key = normalize_name(cls.name)
+            existing = classes.get(key)
+            if existing is None:
+                classes[key] = cls
+                continue
+            classes[key] = existing.model_copy(update={
+                "description": existing.description or cls.description,
+                "attributes": _merge_members(existing.attributes, cls.attributes),
+                "methods": _merge_members(existing.methods, cls.methods),
+                "stereotypes": existing.stereotypes + [s for s in cls.stereotypes if s not in existing.stereotypes],
+            })
+    canonical = {key: cls.name for key, cls in classes.items()}
+
+    relationships = {}
+    for diagram in diagrams:
+        for relationship in diagram.relationships:
+            source = canonical.get(normalize_name(relationship.source), relationship.source)
+            target = canonical.get(normalize_name(relationship.target), relationship.target)
+            key = (normalize_name(source), normalize_name(target), relationship.type, normalize_name(relationship.name or ""))
+            if key not in relationships:
+                relationships[key] = relationship.model_copy(update={"source": source, "target": target})
+
+    first = diagrams[0] if diagrams else ConceptualClassDiagram(name="概念类图")
+    merged = first.model_copy(update={"classes": list(classes.values()), "relationships": list(relationships.values())})
+    return merged, canonical
+
+
+def merge_ocl_constraints(constraint_lists: List[List[OCLConstraint]], canonical: Dict[str, str]) -> List[OCLConstraint]:
+    """合并各子系统的OCL约束：上下文指向合并后的类名，上下文、类型和表达式都相同的约束只保留一条"""
+    merged: Dict[Tuple[str, str, str], OCLConstraint] = {}
+    for constraints in constraint_lists:
+        for constraint in constraints:
+            context = canonical.get(normalize_name(constraint.context), constraint.context)
+            key = (normalize_name(context), constraint.type, re.sub(r"\s+", " ", constraint.expression).strip())
+            if key not in merged:
+                merged[key] = constraint.model_copy(update={"context": context})
+    return list(merged.values())
@@ -0,0 +1,409 @@
+"""
+紧凑行式输出DSL
+为Agent提供可选的行式输出语法以减少completion token，并提供解析为dsl_models对象的本地解析器
+
+语法（每行一条记录，字段用 " | " 分隔，列表项用 ";" 或 "," 分隔）：
+    用例图    S 系统名 | 描述
+              A 参与者 | primary | 描述
+              U 用例 | 参与者 | 包含用例1,包含用例2 | 扩展用例 | 描述 | 前置条件1;前置条件2 | 后置条件
+    类图      D 类图名 | 描述
+              C Book <<entity>> | title:String; -price:Double; items:Item[*] | +getTitle():String; setPrice(price):void | 描述
+              R Order -> Book | association | 1 | * | 关系名
+    顺序图    Q 顺序图名 | 描述
+              P 参与者1,参与者2 | 系统1
+              M 顾客 -> 系统 | 查询图书(bookId) | bookInfo      （"->>" 表示异步消息）
+    OCL约束   K 约束名 | 上下文 | inv | OCL表达式 -- 描述
+可见性前缀：+ public，- private，# protected；属性默认private，方法默认public
+紧凑语法不保留属性、方法和关系的描述
+"""
+import dataclasses
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from dsl_models import (
+    Attribute, ConceptualClassDiagram, Method, OCLConstraint, SystemSequenceDiagram, UseCaseDiagram
+)
+
+_VISIBILITY = {"+": "public", "-": "private", "#": "protected"}
+_VISIBILITY_PREFIX = {v: k for k, v in _VISIBILITY.items()}
+_ATTRIBUTE_RE = re.compile(r"^([+\-#]?)\s*([^:\[]+?)\s*(?::\s*([^\[]+?))?\s*(?:\[([^\]]+)\])?$")
+_METHOD_RE = re.compile(r"^([+\-#]?)\s*([^(]+?)\s*\(([^)]*)\)\s*(?::\s*(.+))?$")
+_CALL_RE = re.compile(r"^([^(]+?)\s*(?:\(([^)]*)\))?$")
+_STEREOTYPE_RE = re.compile(r"^(.+?)\s*<<([^>]*)>>$")
+
+
+def _fields(line: str, maxsplit: int = -1) -> List[str]:
+    return [f.strip() for f in line.split("|", maxsplit)]
+
+
+def _items(text: str) -> List[str]:
+    return [item.strip() for item in re.split(r"[;,，；]", text) if item.strip()]
+
+
+def _conditions(text: str) -> List[str]:
+    # 条件本身可能含逗号，只按分号拆分
+    return [item.strip() for item in re.split(r"[;；]", text) if item.strip()]
+
+
+def _field(fields: List[str], index: int, default: Optional[str] = None) -> Optional[str]:
+    if index < len(fields) and fields[index]:
+        return fields[index]
+    return default
+
+
+def _records(text: str) -> List[Tuple[str, str]]:
+    """拆分为 (记录类型, 记录内容)，忽略空行、代码块围栏和注释行"""
+    records = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("```") or line.startswith("#"):
+            continue
+        tag, _, rest = line.partition(" ")
+        if len(tag) == 1 and tag.isalpha():
+            records.append((tag.upper(), rest.strip()))
+    return records
+
+
+def _parse_attribute(text: str) -> Dict[str, Any]:
+    match = _ATTRIBUTE_RE.match(text)
+    if not match:
+        raise ValueError(f"无法解析属性: {text}")
+    prefix, name, type_, multiplicity = match.groups()
+    return dict(
+        name=name,
+        type=(type_ or "String").strip(),
+        visibility=_VISIBILITY.get(prefix, "private"),
+        multiplicity=multiplicity or "1",
+    )
+
+
+def _parse_method(text: str) -> Dict[str, Any]:
+    match = _METHOD_RE.match(text)
+    if not match:
+        # 省略括号时视为无参方法
+        match = _METHOD_RE.match(f"{text}()")
+    if not match:
+        raise ValueError(f"无法解析方法: {text}")
+    prefix, name, params, return_type = match.groups()
+    return dict(
+        name=name,
+        parameters=_items(params),
+        return_type=return_type.strip() if return_type else None,
+        visibility=_VISIBILITY.get(prefix, "public"),
+    )
+
+
+def _split_top_level(text: str) -> List[str]:
+    # 参数列表和泛型中的逗号不能作为分隔符，只按括号外的 ";" 或 "," 拆分
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch in "(<":
+            depth += 1
+        elif ch in ")>":
+            depth = max(depth - 1, 0)
+        if ch in ";；,，" and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def parse_usecase_diagram(text: str) -> UseCaseDiagram:
+    """解析紧凑语法的用例图"""
+    name, description = "系统用例图", None
+    actors, usecases = [], []
+    for tag, rest in _records(text):
+        fields = _fields(rest)
+        if tag == "S":
+            name, description = fields[0] or name, _field(fields, 1)
+        elif tag == "A":
+            actors.append(dict(name=fields[0], type=_field(fields, 1, "primary"), description=_field(fields, 2)))
+        elif tag == "U":
+            usecases.append(dict(
+                name=fields[0],
+                actor=_field(fields, 1, ""),
+                includes=_items(_field(fields, 2, "")),
+                extends=_items(_field(fields, 3, "")),
+                description=_field(fields, 4),
+                preconditions=_conditions(_field(fields, 5, "")),
+                postconditions=_conditions(_field(fields, 6, "")),
+            ))
+    if not usecases and not actors:
+        raise ValueError("紧凑输出中没有找到参与者(A)或用例(U)记录")
+    return UseCaseDiagram.model_validate(dict(name=name, description=description, actors=actors, usecases=usecases))
+
+
+def parse_class_diagram(text: str) -> ConceptualClassDiagram:
+    """解析紧凑语法的概念类图"""
+    name, description = "概念类图", None
+    classes, relationships = [], []
+    for tag, rest in _records(text):
+        if tag == "D":
+            fields = _fields(rest)
+            name, description = fields[0] or name, _field(fields, 1)
+        elif tag == "C":
+            fields = _fields(rest)
+            class_name, stereotypes = fields[0], []
+            match = _STEREOTYPE_RE.match(class_name)
+            if match:
+                class_name, stereotypes = match.group(1), _items(match.group(2))
+            classes.append(dict(
+                name=class_name,
+                stereotypes=stereotypes,
+                attributes=[_parse_attribute(a) for a in _split_top_level(_field(fields, 1, ""))],
+                methods=[_parse_method(m) for m in _split_top_level(_field(fields, 2, ""))],
+                description=_field(fields, 3),
+            ))
+        elif tag == "R":
+            fields = _fields(rest)
+            source, _, target = fields[0].partition("->")
+            relationships.append(dict(
+                source=source.strip(),
+                target=target.strip(),
+                type=_field(fields, 1, "association"),
+                source_multiplicity=_field(fields, 2, "1"),
+                target_multiplicity=_field(fields, 3, "1"),
+                name=_field(fields, 4),
+            ))
+    if not classes:
+        raise ValueError("紧凑输出中没有找到类(C)记录")
+    return ConceptualClassDiagram.model_validate(dict(name=name, description=description, classes=classes, relationships=relationships))
+
+
+def _parse_sequence_block(records: List[Tuple[str, str]]) -> SystemSequenceDiagram:
+    name, description = "系统顺序图", None
+    actors, systems, messages = [], [], []
+    for tag, rest in records:
+        fields = _fields(rest)
+        if tag == "Q":
+            name, description = fields[0] or name, _field(fields, 1)
+        elif tag == "P":
+            actors, systems = _items(fields[0]), _items(_field(fields, 1, ""))
+        elif tag == "M":
+            arrow = "->>" if "->>" in fields[0] else "->"
+            sender, _, receiver = fields[0].partition(arrow)
+            call = _CALL_RE.match(_field(fields, 1, "消息"))
+            messages.append(dict(
+                name=call.group(1).strip(),
+                sender=sender.strip(),
+                receiver=receiver.strip(),
+                message_type="asynchronous" if arrow == "->>" else "synchronous",
+                parameters=_items(call.group(2) or ""),
+                return_value=_field(fields, 2),
+            ))
+    return SystemSequenceDiagram.model_validate(dict(name=name, description=description, actors=actors, systems=systems, messages=messages))
+
+
+def parse_sequence_diagrams(text: str) -> List[SystemSequenceDiagram]:
+    """解析紧凑语法的一个或多个顺序图（每个以Q记录开头）"""
+    blocks: List[List[Tuple[str, str]]] = []
+    for record in _records(text):
+        if record[0] == "Q" or not blocks:
+            blocks.append([])
+        blocks[-1].append(record)
+    diagrams = [_parse_sequence_block(block) for block in blocks if any(tag == "M" for tag, _ in block)]
+    if not diagrams:
+        raise ValueError("紧凑输出中没有找到消息(M)记录")
+    return diagrams
+
+
+def parse_sequence_diagram(text: str) -> SystemSequenceDiagram:
+    """解析紧凑语法的单个顺序图"""
+    return parse_sequence_diagrams(text)[0]
+
+
+def parse_ocl_constraints(text: str) -> List[OCLConstraint]:
+    """解析紧凑语法的OCL约束列表；表达式可以包含 "|"，" -- " 之后为描述"""
+    constraints = []
+    for tag, rest in _records(text):
+        if tag != "K":
+            continue
+        fields = _fields(rest, maxsplit=3)
+        if len(fields) < 4:
+            raise ValueError(f"OCL约束记录字段不足: {rest}")
+        expression, _, description = fields[3].partition(" -- ")
+        constraints.append(OCLConstraint.model_validate(dict(
+            name=fields[0],
+            context=fields[1],
+            type=fields[2],
+            expression=expression.strip(),
+            description=description.strip() or None,
+        )))
+    if not constraints:
+        raise ValueError("紧凑输出中没有找到OCL约束(K)记录")
+    return constraints
+
+
+def _join(*fields: Optional[str]) -> str:
+    values = [f or "" for f in fields]
+    while len(values) > 1 and not values[-1]:
+        values.pop()
+    return " | ".join(values)
+
+
+def format_usecase_diagram(diagram: UseCaseDiagram) -> str:
+    """将用例图格式化为紧凑语法"""
+    lines = [f"S {_join(diagram.name, diagram.description)}"]
+    lines += [f"A {_join(a.name, a.type, a.description)}" for a in diagram.actors]
+    lines += [f"U {_join(u.name, u.actor, ','.join(u.includes), ','.join(u.extends), u.description, '; '.join(u.preconditions), '; '.join(u.postconditions))}"
+              for u in diagram.usecases]
+    return "\n".join(lines)
+
+
+def _format_attribute(attr: Attribute) -> str:
+    prefix = "" if attr.visibility == "private" else _VISIBILITY_PREFIX.get(attr.visibility, "")
+    multiplicity = "" if attr.multiplicity == "1" else f"[{attr.multiplicity}]"
+    return f"{prefix}{attr.name}:{attr.type}{multiplicity}"
+
+
+def _format_method(method: Method) -> str:
+    prefix = "" if method.visibility == "public" else _VISIBILITY_PREFIX.get(method.visibility, "")
+    return_type = f":{method.return_type}" if method.return_type else ""
+    return f"{prefix}{method.name}({','.join(method.parameters)}){return_type}"
+
+
+def format_class_diagram(diagram: ConceptualClassDiagram) -> str:
+    """将概念类图格式化为紧凑语法"""
+    lines = [f"D {_join(diagram.name, diagram.description)}"]
+    for cls in diagram.classes:
+        stereotypes = f" <<{','.join(cls.stereotypes)}>>" if cls.stereotypes else ""
+        lines.append("C " + _join(
+            cls.name + stereotypes,
+            "; ".join(_format_attribute(a) for a in cls.attributes),
+            "; ".join(_format_method(m) for m in cls.methods),
+            cls.description,
+        ))
+    for rel in diagram.relationships:
+        lines.append("R " + _join(f"{rel.source} -> {rel.target}", rel.type.value,
+                                  rel.source_multiplicity, rel.target_multiplicity, rel.name))
+    return "\n".join(lines)
+
+
+def format_sequence_diagram(diagram: SystemSequenceDiagram) -> str:
+    """将系统顺序图格式化为紧凑语法"""
+    lines = [f"Q {_join(diagram.name, diagram.description)}",
+             f"P {_join(','.join(diagram.actors), ','.join(diagram.systems))}"]
+    for msg in diagram.messages:
+        arrow = "->>" if msg.message_type == "asynchronous" else "->"
+        lines.append("M " + _join(f"{msg.sender} {arrow} {msg.receiver}",
+                                  f"{msg.name}({','.join(msg.parameters)})", msg.return_value))
+    return "\n".join(lines)
+
+
+def format_ocl_constraints(constraints: List[OCLConstraint]) -> str:
+    """将OCL约束列表格式化为紧凑语法"""
+    lines = []
+    for c in constraints:
+        description = f" -- {c.description}" if c.description else ""
+        lines.append(f"K {c.name} | {c.context} | {c.type} | {c.expression}{description}")
+    return "\n".join(lines)
+
+
+# 每种输出模型对应的语法说明，替换Agent指令中的JSON输出模板
+TERSE_SPECS: Dict[str, str] = {
+    "UseCaseDiagram": """
+    输出格式要求（紧凑行式语法）：
+    每行一条记录，字段之间用 " | " 分隔，不要输出JSON、解释或多余内容：
+    S 系统名称 | 系统描述
+    A 参与者名称 | primary或secondary
+    U 用例名称 | 主要参与者 | 包含的用例(逗号分隔) | 扩展的用例(逗号分隔) | 用例描述 | 前置条件(分号分隔) | 后置条件(分号分隔)
+    示例：
+    S 在线书店系统 | 图书销售系统
+    A 顾客 | primary
+    U 购买图书 | 顾客 | 验证库存 | | 顾客选购并支付图书 | 顾客已登录 | 订单已创建; 库存已扣减
+    """,
+    "ConceptualClassDiagram": """
+    输出格式要求（紧凑行式语法）：
+    每行一条记录，字段之间用 " | " 分隔，不要输出JSON、解释或多余内容：
+    D 类图名称
+    C 类名 | 属性名:类型; 属性名:类型[多重性] | 方法名(参数,参数):返回类型; 方法名():返回类型
+    R 源类 -> 目标类 | association/generalization/composition/aggregation | 源端多重性 | 目标端多重性
+    属性默认private、方法默认public，其他可见性用前缀 + public、- private、# protected 标注
+    类名后可用 <<构造型>> 标注，如 C PaymentGateway <<external>> | ...
+    示例：
+    D 在线书店类图
+    C Book | title:String; price:Double | getTitle():String; setPrice(price):void
+    R Order -> Book | association | 1 | *
+    """,
+    "SystemSequenceDiagram": """
+    输出格式要求（紧凑行式语法）：
+    每行一条记录，字段之间用 " | " 分隔，不要输出JSON、解释或多余内容：
+    Q 顺序图名称
+    P 参与者(逗号分隔) | 系统(逗号分隔)
+    M 发送方 -> 接收方 | 消息名(参数,参数) | 返回值
+    异步消息使用 "->>" 代替 "->"
+    示例：
+    Q 购买图书顺序图
+    P 顾客 | 系统
+    M 顾客 -> 系统 | 查询图书(bookId) | bookInfo
+    """,
+    "OCLConstraint": """
+    输出格式要求（紧凑行式语法）：
+    每行一条约束，不要输出JSON、解释或多余内容：
+    K 约束名称 | 上下文 | inv/pre/post | OCL表达式
+    示例：
+    K 库存非负 | Book | inv | self.stock >= 0
+    """,
+}
+
+# 输出模型 -> 解析函数
+PARSERS = {
+    "UseCaseDiagram": parse_usecase_diagram,
+    "ConceptualClassDiagram": parse_class_diagram,
+    "SystemSequenceDiagram": parse_sequence_diagram,
+    "OCLConstraint": parse_ocl_constraints,
+}
+
+# 输出类型为List[X]时优先使用的解析函数
+LIST_PARSERS = {
+    "SystemSequenceDiagram": parse_sequence_diagrams,
+}
+
+
+def with_output_format(agent, output_format: str):
+    """
+    返回指定输出格式的Agent副本
+
+    Args:
+        agent: Agent对象
+        output_format: "json" 或 "terse"
+
+    Returns:
+        Agent副本；terse格式会把指令中的JSON输出模板替换为紧凑语法说明
+    """
+    if output_format == agent.output_format:
+        return agent
+    if output_format != "terse":
+        raise ValueError(f"不支持的输出格式: {output_format}")
+    model_name = output_model_name(agent)
+    if model_name not in TERSE_SPECS:
+        raise ValueError(f"Agent '{agent.name}' 不支持紧凑输出格式")
+    base_instructions = agent.instructions.split("输出格式要求：")[0].rstrip()
+    return dataclasses.replace(
+        agent,
+        instructions=base_instructions + "\n" + TERSE_SPECS[model_name],
+        output_format="terse",
+    )
+
+
+def output_model_name(agent) -> Optional[str]:
+    """返回Agent输出模型的名称（List[X]取X）"""
+    output_type: Any = agent.output_type
+    if output_type is None:
+        return None
+    args = getattr(output_type, "__args__", None)
+    if args:
+        output_type = args[0]
+    return getattr(output_type, "__name__", None)
+
+
+def parse_output(agent, text: str):
+    """按Agent的输出模型解析紧凑语法文本"""
+    model_name = output_model_name(agent)
+    if model_name not in PARSERS:
+        raise ValueError(f"Agent '{agent.name}' 没有紧凑格式解析器")
+    if getattr(agent.output_type, "__origin__", None) is list and model_name in LIST_PARSERS:
+        return LIST_PARSERS[model_name](text)
+    return PARSERS[model_name](text)
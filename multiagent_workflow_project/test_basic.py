@@ -1,270 +1,1485 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-基本功能测试脚本
-测试MultiAgent Workflow系统的核心功能
-"""
-
-import asyncio
-import json
-import os
-from dsl_models import (
-    UseCaseDiagram, Actor, UseCase, ConceptualClassDiagram, 
-    Class, Attribute, Method, Relationship, RelationshipType,
-    SystemSequenceDiagram, Message, OCLConstraint, DomainModel
-)
-from tools import (
-    save_domain_model, load_domain_model, validate_use_case_diagram,
-    generate_sequence_diagram_from_usecase, extract_classes_from_usecases,
-    generate_ocl_constraints, export_to_plantuml, analyze_domain_complexity
-)
-from my_agents import requirements_analyst, usecase_modeler, class_diagram_designer, sequence_diagram_designer, ocl_expert, validation_expert, coordinator
-
-def test_dsl_models():
-    """测试DSL数据模型"""
-    print("🧪 测试DSL数据模型...")
-    
-    # 创建测试用例图
-    actors = [
-        Actor(name="顾客", description="购买图书的用户", type="primary"),
-        Actor(name="管理员", description="系统管理员", type="secondary")
-    ]
-    
-    usecases = [
-        UseCase(
-            name="购买图书",
-            description="顾客选择图书并完成购买",
-            actor="顾客",
-            includes=["验证库存"],
-            extends=[],
-            preconditions=["用户已登录", "图书有库存"],
-            postconditions=["订单创建成功", "库存减少"]
-        ),
-        UseCase(
-            name="验证库存",
-            description="检查图书库存是否充足",
-            actor="系统",
-            includes=[],
-            extends=[],
-            preconditions=["图书存在"],
-            postconditions=["库存状态已确认"]
-        )
-    ]
-    
-    usecase_diagram = UseCaseDiagram(
-        name="在线书店系统",
-        description="图书销售管理系统",
-        actors=actors,
-        usecases=usecases
-    )
-    
-    print("✅ 用例图创建成功")
-    
-    # 创建测试类图
-    classes = [
-        Class(
-            name="Book",
-            description="图书类",
-            attributes=[
-                Attribute(name="title", type="String", visibility="private"),
-                Attribute(name="price", type="Double", visibility="private"),
-                Attribute(name="stock", type="Integer", visibility="private")
-            ],
-            methods=[
-                Method(name="getTitle", return_type="String", visibility="public"),
-                Method(name="setPrice", parameters=["price"], return_type="void", visibility="public")
-            ],
-            stereotypes=[]
-        ),
-        Class(
-            name="Order",
-            description="订单类",
-            attributes=[
-                Attribute(name="orderId", type="String", visibility="private"),
-                Attribute(name="totalAmount", type="Double", visibility="private")
-            ],
-            methods=[
-                Method(name="calculateTotal", return_type="Double", visibility="public")
-            ],
-            stereotypes=[]
-        )
-    ]
-    
-    relationships = [
-        Relationship(
-            source="Order",
-            target="Book",
-            type=RelationshipType.ASSOCIATION,
-            source_multiplicity="1",
-            target_multiplicity="*",
-            description="订单包含多本图书"
-        )
-    ]
-    
-    class_diagram = ConceptualClassDiagram(
-        name="在线书店类图",
-        description="图书销售系统的概念类图",
-        classes=classes,
-        relationships=relationships
-    )
-    
-    print("✅ 类图创建成功")
-    
-    # 创建测试顺序图
-    messages = [
-        Message(
-            name="查询图书",
-            sender="顾客",
-            receiver="系统",
-            message_type="synchronous",
-            parameters=["bookId"],
-            return_value="bookInfo"
-        )
-    ]
-    
-    sequence_diagram = SystemSequenceDiagram(
-        name="购买图书顺序图",
-        description="顾客购买图书的交互流程",
-        actors=["顾客"],
-        systems=["系统"],
-        messages=messages
-    )
-    
-    print("✅ 顺序图创建成功")
-    
-    # 创建测试OCL约束
-    ocl_constraints = [
-        OCLConstraint(
-            name="库存非负",
-            context="Book",
-            type="inv",
-            expression="self.stock >= 0",
-            description="图书库存不能为负数"
-        )
-    ]
-    
-    print("✅ OCL约束创建成功")
-    
-    # 创建完整领域模型
-    domain_model = DomainModel(
-        name="在线书店领域模型",
-        description="完整的图书销售系统领域模型",
-        usecase_diagram=usecase_diagram,
-        sequence_diagrams=[sequence_diagram],
-        class_diagram=class_diagram,
-        ocl_constraints=ocl_constraints
-    )
-    
-    print("✅ 领域模型创建成功")
-    
-    return domain_model
-
-def test_tools():
-    """测试工具函数"""
-    print("\n🔧 测试工具函数...")
-    
-    # 创建测试模型
-    domain_model = test_dsl_models()
-    
-    # 测试保存和加载
-    try:
-        save_result = save_domain_model(domain_model, "test_model.json")
-        print(f"✅ {save_result}")
-        
-        loaded_model = load_domain_model("test_model.json")
-        print("✅ 模型加载成功")
-        
-        # 清理测试文件
-        os.remove("output/test_model.json")
-        print("✅ 测试文件清理完成")
-        
-    except Exception as e:
-        print(f"❌ 保存/加载测试失败: {e}")
-    
-    # 测试用例图验证
-    validation_result = validate_use_case_diagram(domain_model.usecase_diagram)
-    print(f"✅ 用例图验证: {'通过' if validation_result['is_valid'] else '失败'}")
-    if validation_result['errors']:
-        print(f"   错误: {validation_result['errors']}")
-    if validation_result['warnings']:
-        print(f"   警告: {validation_result['warnings']}")
-    
-    # 测试顺序图生成
-    for usecase in domain_model.usecase_diagram.usecases:
-        sequence_diagram = generate_sequence_diagram_from_usecase(usecase, "系统")
-        print(f"✅ 为用例 '{usecase.name}' 生成顺序图")
-    
-    # 测试类提取
-    classes = extract_classes_from_usecases(domain_model.usecase_diagram)
-    print(f"✅ 从用例图提取了 {len(classes)} 个类")
-    
-    # 测试OCL约束生成
-    constraints = generate_ocl_constraints(domain_model.usecase_diagram, domain_model.class_diagram)
-    print(f"✅ 生成了 {len(constraints)} 个OCL约束")
-    
-    # 测试PlantUML导出
-    plantuml_code = export_to_plantuml(domain_model)
-    print("✅ PlantUML代码生成成功")
-    print(f"   代码长度: {len(plantuml_code)} 字符")
-    
-    # 测试复杂度分析
-    complexity = analyze_domain_complexity(domain_model)
-    print(f"✅ 复杂度分析完成")
-    print(f"   复杂度评分: {complexity['complexity_score']}")
-    print(f"   复杂度等级: {complexity['complexity_level']}")
-
-def test_json_serialization():
-    """测试JSON序列化"""
-    print("\n📄 测试JSON序列化...")
-    
-    domain_model = test_dsl_models()
-    
-    # 序列化
-    json_str = domain_model.model_dump_json(indent=2)
-    print(f"✅ JSON序列化成功，长度: {len(json_str)} 字符")
-    
-    # 反序列化
-    data = json.loads(json_str)
-    reconstructed_model = DomainModel(**data)
-    print("✅ JSON反序列化成功")
-    
-    # 验证数据完整性
-    assert len(reconstructed_model.usecase_diagram.usecases) == len(domain_model.usecase_diagram.usecases)
-    assert len(reconstructed_model.class_diagram.classes) == len(domain_model.class_diagram.classes)
-    assert len(reconstructed_model.ocl_constraints) == len(domain_model.ocl_constraints)
-    print("✅ 数据完整性验证通过")
-
-def main():
-    """主测试函数"""
-    print("🚀 MultiAgent Workflow 基本功能测试")
-    print("=" * 50)
-    
-    try:
-        # 测试DSL模型
-        test_dsl_models()
-        
-        # 测试工具函数
-        test_tools()
-        
-        # 测试JSON序列化
-        test_json_serialization()
-        
-        print("\n🎉 所有基本功能测试通过！")
-        print("\n📋 测试总结:")
-        print("   ✅ DSL数据模型创建和验证")
-        print("   ✅ 工具函数功能测试")
-        print("   ✅ JSON序列化和反序列化")
-        print("   ✅ 用例图验证")
-        print("   ✅ 顺序图生成")
-        print("   ✅ 类提取")
-        print("   ✅ OCL约束生成")
-        print("   ✅ PlantUML导出")
-        print("   ✅ 复杂度分析")
-        
-    except Exception as e:
-        print(f"\n❌ 测试过程中出现错误: {e}")
-        import traceback
-        traceback.print_exc()
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基本功能测试脚本
+测试MultiAgent Workflow系统的核心功能
+"""
+
+import asyncio
+import json
+import os
+from dsl_models import (
+    UseCaseDiagram, Actor, UseCase, ConceptualClassDiagram, 
+    Class, Attribute, Method, Relationship, RelationshipType,
+    SystemSequenceDiagram, Message, OCLConstraint, DomainModel
+)
+from tools import (
+    save_domain_model, load_domain_model, validate_use_case_diagram,
+    generate_sequence_diagram_from_usecase, extract_classes_from_usecases,
+    generate_ocl_constraints, export_to_plantuml, analyze_domain_complexity
+)
+from my_agents import requirements_analyst, usecase_modeler, class_diagram_designer, sequence_diagram_designer, ocl_expert, validation_expert, coordinator
+
+def test_dsl_models():
+    """测试DSL数据模型"""
+    print("🧪 测试DSL数据模型...")
+    
+    # 创建测试用例图
+    actors = [
+        Actor(name="顾客", description="购买图书的用户", type="primary"),
+        Actor(name="管理员", description="系统管理员", type="secondary")
+    ]
+    
+    usecases = [
+        UseCase(
+            name="购买图书",
+            description="顾客选择图书并完成购买",
+            actor="顾客",
+            includes=["验证库存"],
+            extends=[],
+            preconditions=["用户已登录", "图书有库存"],
+            postconditions=["订单创建成功", "库存减少"]
+        ),
+        UseCase(
+            name="验证库存",
+            description="检查图书库存是否充足",
+            actor="系统",
+            includes=[],
+            extends=[],
+            preconditions=["图书存在"],
+            postconditions=["库存状态已确认"]
+        )
+    ]
+    
+    usecase_diagram = UseCaseDiagram(
+        name="在线书店系统",
+        description="图书销售管理系统",
+        actors=actors,
+        usecases=usecases
+    )
+    
+    print("✅ 用例图创建成功")
+    
+    # 创建测试类图
+    classes = [
+        Class(
+            name="Book",
+            description="图书类",
+            attributes=[
+                Attribute(name="title", type="String", visibility="private"),
+                Attribute(name="price", type="Double", visibility="private"),
+                Attribute(name="stock", type="Integer", visibility="private")
+            ],
+            methods=[
+                Method(name="getTitle", return_type="String", visibility="public"),
+                Method(name="setPrice", parameters=["price"], return_type="void", visibility="public")
+            ],
+            stereotypes=[]
+        ),
+        Class(
+            name="Order",
+            description="订单类",
+            attributes=[
+                Attribute(name="orderId", type="String", visibility="private"),
+                Attribute(name="totalAmount", type="Double", visibility="private")
+            ],
+            methods=[
+                Method(name="calculateTotal", return_type="Double", visibility="public")
+            ],
+            stereotypes=[]
+        )
+    ]
+    
+    relationships = [
+        Relationship(
+            source="Order",
+            target="Book",
+            type=RelationshipType.ASSOCIATION,
+            source_multiplicity="1",
+            target_multiplicity="*",
+            description="订单包含多本图书"
+        )
+    ]
+    
+    class_diagram = ConceptualClassDiagram(
+        name="在线书店类图",
+        description="图书销售系统的概念类图",
+        classes=classes,
+        relationships=relationships
+    )
+    
+    print("✅ 类图创建成功")
+    
+    # 创建测试顺序图
+    messages = [
+        Message(
+            name="查询图书",
+            sender="顾客",
+            receiver="系统",
+            message_type="synchronous",
+            parameters=["bookId"],
+            return_value="bookInfo"
+        )
+    ]
+    
+    sequence_diagram = SystemSequenceDiagram(
+        name="购买图书顺序图",
+        description="顾客购买图书的交互流程",
+        actors=["顾客"],
+        systems=["系统"],
+        messages=messages
+    )
+    
+    print("✅ 顺序图创建成功")
+    
+    # 创建测试OCL约束
+    ocl_constraints = [
+        OCLConstraint(
+            name="库存非负",
+            context="Book",
+            type="inv",
+            expression="self.stock >= 0",
+            description="图书库存不能为负数"
+        )
+    ]
+    
+    print("✅ OCL约束创建成功")
+    
+    # 创建完整领域模型
+    domain_model = DomainModel(
+        name="在线书店领域模型",
+        description="完整的图书销售系统领域模型",
+        usecase_diagram=usecase_diagram,
+        sequence_diagrams=[sequence_diagram],
+        class_diagram=class_diagram,
+        ocl_constraints=ocl_constraints
+    )
+    
+    print("✅ 领域模型创建成功")
+    
+    return domain_model
+
+def test_tools():
+    """测试工具函数"""
+    print("\n🔧 测试工具函数...")
+    
+    # 创建测试模型
+    domain_model = test_dsl_models()
+    
+    # 测试保存和加载
+    try:
+        save_result = save_domain_model(domain_model, "test_model.json")
+        print(f"✅ {save_result}")
+        
+        loaded_model = load_domain_model("test_model.json")
+        print("✅ 模型加载成功")
+        
+        # 清理测试文件
+        os.remove("output/test_model.json")
+        print("✅ 测试文件清理完成")
+        
+    except Exception as e:
+        print(f"❌ 保存/加载测试失败: {e}")
+    
+    # 测试用例图验证
+    validation_result = validate_use_case_diagram(domain_model.usecase_diagram)
+    print(f"✅ 用例图验证: {'通过' if validation_result['is_valid'] else '失败'}")
+    if validation_result['errors']:
+        print(f"   错误: {validation_result['errors']}")
+    if validation_result['warnings']:
+        print(f"   警告: {validation_result['warnings']}")
+    
+    # 测试顺序图生成
+    for usecase in domain_model.usecase_diagram.usecases:
+        sequence_diagram = generate_sequence_diagram_from_usecase(usecase, "系统")
+        print(f"✅ 为用例 '{usecase.name}' 生成顺序图")
+    
+    # 测试类提取
+    classes = extract_classes_from_usecases(domain_model.usecase_diagram)
+    print(f"✅ 从用例图提取了 {len(classes)} 个类")
+    
+    # 测试OCL约束生成
+    constraints = generate_ocl_constraints(domain_model.usecase_diagram, domain_model.class_diagram)
+    print(f"✅ 生成了 {len(constraints)} 个OCL约束")
+    
+    # 测试PlantUML导出
+    plantuml_code = export_to_plantuml(domain_model)
+    print("✅ PlantUML代码生成成功")
+    print(f"   代码长度: {len(plantuml_code)} 字符")
+    
+    # 测试复杂度分析
+    complexity = analyze_domain_complexity(domain_model)
+    print(f"✅ 复杂度分析完成")
+    print(f"   复杂度评分: {complexity['complexity_score']}")
+    print(f"   复杂度等级: {complexity['complexity_level']}")
+
+def test_json_serialization():
+    """测试JSON序列化"""
+    print("\n📄 测试JSON序列化...")
+    
+    domain_model = test_dsl_models()
+    
+    # 序列化
+    json_str = domain_model.model_dump_json(indent=2)
+    print(f"✅ JSON序列化成功，长度: {len(json_str)} 字符")
+    
+    # 反序列化
+    data = json.loads(json_str)
+    reconstructed_model = DomainModel(**data)
+    print("✅ JSON反序列化成功")
+    
+    # 验证数据完整性
+    assert len(reconstructed_model.usecase_diagram.usecases) == len(domain_model.usecase_diagram.usecases)
+    assert len(reconstructed_model.class_diagram.classes) == len(domain_model.class_diagram.classes)
+    assert len(reconstructed_model.ocl_constraints) == len(domain_model.ocl_constraints)
+    print("✅ 数据完整性验证通过")
+
+def test_tracing():
+    """测试追踪span和导出"""
+    print("\n🧭 测试追踪...")
+    import tempfile
+    from tracing import Tracer
+    
+    tracer = Tracer()
+    with tracer.span("workflow.run") as root:
+        with tracer.span("agent.call", agent="用例建模师", model="gpt-4o") as call:
+            call.set_attributes(prompt_tokens=120, completion_tokens=80, cached_tokens=64)
+        try:
+            with tracer.span("json.extract"):
+                raise ValueError("坏JSON")
+        except ValueError:
+            pass
+    
+    spans = tracer.spans(root.trace_id)
+    assert [s.name for s in spans] == ["workflow.run", "agent.call", "json.extract"]
+    assert spans[1].parent_id == root.span_id and spans[2].parent_id == root.span_id
+    assert spans[2].status == "error"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        chrome_path = tracer.export_chrome_trace(os.path.join(tmp, "trace.json"), trace_id=root.trace_id)
+        with open(chrome_path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        assert len(events) == 3 and all(e["ph"] == "X" for e in events)
+        assert events[1]["args"]["cached_tokens"] == 64
+        
+        otlp_path = tracer.export_otlp_json(os.path.join(tmp, "trace.otlp.json"), trace_id=root.trace_id)
+        with open(otlp_path, encoding="utf-8") as f:
+            otlp_spans = json.loads(f.readline())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert otlp_spans[1]["parentSpanId"] == root.span_id
+        assert otlp_spans[2]["status"]["code"] == 2
+    print("✅ 追踪span嵌套和导出正确")
+
+def test_event_log():
+    """测试结构化事件日志、采样和原始输出缓冲区"""
+    print("\n📝 测试事件日志...")
+    import io
+    from event_log import get_logger, configure_logging, RawOutputBuffer
+    
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", sample_rates={"noisy.event": 0.0}, stream=stream)
+    try:
+        logger = get_logger("test")
+        logger.debug("stage.start", "调试信息不应输出", stage="class_design")
+        logger.info("noisy.event", "采样率为0的INFO事件被丢弃")
+        logger.warning("noisy.event", "WARNING事件不参与采样")
+        logger.info("workflow.completed", "工作流完成", usecases=3)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    finally:
+        configure_logging(stream=io.StringIO())
+    assert [line["event"] for line in lines] == ["noisy.event", "workflow.completed"]
+    assert lines[0]["level"] == "WARNING" and lines[1]["usecases"] == 3
+    
+    buffer = RawOutputBuffer(maxlen=2, max_chars=5)
+    for i in range(3):
+        buffer.record("用例建模师", f"output-{i}")
+    recent = buffer.recent()
+    assert len(recent) == 2 and recent[-1]["text"] == "outpu" and recent[-1]["truncated"]
+    print("✅ 事件日志分级、采样和环形缓冲区正确")
+
+def test_token_ledger():
+    """测试token账本、费用计算和预算告警"""
+    print("\n💰 测试token账本...")
+    import tempfile
+    from types import SimpleNamespace
+    from ledger import TokenLedger, TokenBudget, TokenBudgetExceeded, estimate_tokens
+    
+    assert estimate_tokens("在线书店") == 4
+    assert estimate_tokens("abcdefgh") == 2
+    
+    def usage(prompt, completion, cached=0):
+        return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion, total_tokens=prompt + completion,
+                               prompt_tokens_details=SimpleNamespace(cached_tokens=cached))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = TokenLedger(os.path.join(tmp, "ledger.sqlite3"))
+        try:
+            ledger.start_run("run-1")
+            ledger.record("run-1", "class_design", "类图设计师", "gpt-4o", usage(1000, 500), estimated_prompt_tokens=900)
+            entry = ledger.record("run-1", "validation", "验证专家", "gpt-4o", usage(4000, 200, cached=2000))
+            ledger.record("run-1", "validation", "协调者", "gpt-4o", None)
+            ledger.finish_run("run-1", "completed", usecase_count=4)
+            
+            assert abs(entry["cost"] - (2000 * 2.5 + 2000 * 1.25 + 200 * 10.0) / 1_000_000) < 1e-12
+            top = ledger.top_consumers()
+            assert (top[0]["stage"], top[0]["agent"]) == ("validation", "验证专家")
+            totals = ledger.run_totals("run-1")
+            assert totals["calls"] == 3 and totals["prompt_tokens"] == 5000
+            per_usecase = ledger.cost_per_usecase()
+            assert per_usecase[0]["tokens_per_usecase"] == (1500 + 4200) // 4
+            assert ledger.daily_trend()[0]["calls"] == 3
+        finally:
+            ledger.close()
+    
+    budget = TokenBudget(limit=1000)
+    budget.add(600)
+    try:
+        budget.check(estimated=500)
+        assert False, "预算超限时应抛出异常"
+    except TokenBudgetExceeded:
+        pass
+    # 并行调用的预留计入检查：两个进行中的调用已占满预算时第三个调用不能开始
+    budget = TokenBudget(limit=1000)
+    budget.reserve(400)
+    budget.reserve(400)
+    try:
+        budget.reserve(400)
+        assert False, "进行中调用的预留应计入预算检查"
+    except TokenBudgetExceeded:
+        pass
+    budget.settle(400, 300)
+    budget.release(400)
+    budget.reserve(600)
+    assert (budget.used, budget.reserved) == (300, 600)
+    print("✅ token账本记录、报表和预算告警正确")
+
+def test_prompt_serialization():
+    """测试按阶段投影的紧凑Prompt序列化"""
+    print("\n🗜️ 测试Prompt紧凑序列化...")
+    from prompt_serialization import to_prompt_json, compaction_report
+    
+    domain_model = test_dsl_models()
+    
+    ocl_classes = json.loads(to_prompt_json(domain_model.class_diagram, "ocl_classes"))
+    book = ocl_classes["classes"][0]
+    assert "description" not in book and "visibility" not in book["attributes"][0]
+    assert ocl_classes["relationships"][0] == {"source": "Order", "target": "Book", "type": "association", "target_multiplicity": "*"}
+    
+    # 协调者阶段只紧凑化，投影结果仍能还原为完整模型
+    restored = DomainModel.model_validate(json.loads(to_prompt_json(domain_model, "improvement")))
+    assert restored.class_diagram == domain_model.class_diagram
+    assert restored.usecase_diagram == domain_model.usecase_diagram
+    
+    for obj, stage in [(domain_model.usecase_diagram, "class_design"),
+                       (domain_model.class_diagram, "ocl_classes"),
+                       (domain_model, "validation")]:
+        report = compaction_report(obj, stage)
+        print(f"   {stage}: {report['baseline_tokens']} -> {report['compact_tokens']} tokens ({report['reduction']:.0%})")
+        assert report["reduction"] >= 0.4
+    print("✅ Prompt紧凑序列化正确")
+
+def test_terse_dsl():
+    """测试紧凑行式输出语法的解析和格式化"""
+    print("\n✂️ 测试紧凑输出语法...")
+    import terse_dsl
+    
+    domain_model = test_dsl_models()
+    
+    # 用例图完整往返
+    usecase_text = terse_dsl.format_usecase_diagram(domain_model.usecase_diagram)
+    assert terse_dsl.parse_usecase_diagram(usecase_text) == domain_model.usecase_diagram
+    
+    # 类图往返（紧凑语法不保留属性和方法的描述）
+    class_diagram = terse_dsl.parse_class_diagram(terse_dsl.format_class_diagram(domain_model.class_diagram))
+    assert [c.name for c in class_diagram.classes] == [c.name for c in domain_model.class_diagram.classes]
+    assert class_diagram.relationships[0].target_multiplicity == "*"
+    
+    # 模型常见输出：代码块围栏、可见性前缀、多重性、异步消息、含 "|" 的OCL表达式
+    parsed = terse_dsl.parse_class_diagram("""```
+D 书店类图
+C Order <<entity>> | +id:String; items:OrderItem[1..*] | total():Double; #recalc(a, b)
+R Order -> Book | composition | 1 | *
+```""")
+    order = parsed.classes[0]
+    assert order.stereotypes == ["entity"]
+    assert order.attributes[0].visibility == "public" and order.attributes[1].multiplicity == "1..*"
+    assert order.methods[1].visibility == "protected" and order.methods[1].parameters == ["a", "b"]
+    sequence = terse_dsl.parse_sequence_diagram("Q 下单\nP 顾客 | 系统\nM 系统 ->> 支付网关 | 支付(orderId,amount) | ok")
+    assert sequence.messages[0].message_type == "asynchronous" and sequence.messages[0].parameters == ["orderId", "amount"]
+    constraints = terse_dsl.parse_ocl_constraints("K 数量为正 | Order | inv | self.items->forAll(i | i.qty > 0) -- 每项数量为正")
+    assert constraints[0].expression == "self.items->forAll(i | i.qty > 0)" and constraints[0].description == "每项数量为正"
+    
+    # 按Agent选择输出格式，原Agent不受影响
+    terse_agent = terse_dsl.with_output_format(class_diagram_designer, "terse")
+    assert terse_agent.output_format == "terse" and class_diagram_designer.output_format == "json"
+    assert "C 类名" in terse_agent.instructions and '"classes"' not in terse_agent.instructions
+    assert terse_dsl.parse_output(terse_agent, "C Book | title:String").classes[0].attributes[0].name == "title"
+    
+    from benchmarks import bench_output_format, synthetic_domain_model
+    total = bench_output_format(synthetic_domain_model(5), runs=1)["total"]
+    print(f"   输出token: JSON {total['json_tokens']} -> 紧凑语法 {total['terse_tokens']} ({total['reduction']:.0%})")
+    assert total["reduction"] >= 0.5
+    print("✅ 紧凑输出语法解析正确")
+
+def test_prompt_builder():
+    """测试前缀缓存友好的Prompt布局"""
+    print("\n🧱 测试Prompt布局...")
+    from prompt_builder import build_agent_prompt, build_prompt
+    
+    # 同一阶段不同用例的调用共享逐字节一致的前缀，可变数据只出现在最后
+    first = build_agent_prompt(sequence_diagram_designer, "为以下用例创建系统顺序图：", [("用例", '{"name":"购买图书"}')])
+    second = build_agent_prompt(sequence_diagram_designer, "为以下用例创建系统顺序图：", [("用例", '{"name":"验证库存"}')])
+    assert first.prefix_hash == second.prefix_hash and first.prefix_tokens == second.prefix_tokens
+    assert first.messages[0] == {"role": "system", "content": sequence_diagram_designer.instructions}
+    assert first.messages[-1]["content"].startswith("为以下用例创建系统顺序图：")
+    assert first.messages[-1]["content"].endswith('用例：\n{"name":"购买图书"}')
+    assert build_agent_prompt(class_diagram_designer, "为以下用例创建系统顺序图：").prefix_hash != first.prefix_hash
+    
+    # few-shot示例作为user/assistant消息对放在system之后，属于稳定前缀
+    layout = build_prompt("指令", "任务：", [("数据", "x")], examples=[("示例输入", "示例输出")])
+    assert [m["role"] for m in layout.messages] == ["system", "user", "assistant", "user"]
+    assert layout.messages[-1]["content"] == "任务：\n\n数据：\nx"
+    print("✅ Prompt布局正确")
+
+def test_sequence_batching():
+    """测试顺序图自适应批处理、失败二分重试和JSON数组提取"""
+    print("\n📦 测试顺序图批处理...")
+    import tempfile
+    from types import SimpleNamespace
+    from batching import AdaptiveBatcher, bisect, match_by_name
+    from ledger import TokenLedger
+    from workflow import MultiAgentWorkflow
+    
+    # 批大小按输出预算和实际usage自适应
+    batcher = AdaptiveBatcher(output_budget=1000, max_size=8, prior_tokens_per_item=250)
+    assert batcher.next_size() == 4
+    batcher.observe(items=4, completion_tokens=400)
+    assert batcher.next_size() == 5
+    assert bisect([1, 2, 3]) == [[1], [2, 3]] and bisect([1]) == [[1]]
+    named = [SimpleNamespace(name="用户登录顺序图"), SimpleNamespace(name="登录顺序图")]
+    assert match_by_name(["登录", "用户登录", "注册"], named) == [named[1], named[0], None]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        workflow = MultiAgentWorkflow(ledger=TokenLedger(os.path.join(tmp, "ledger.sqlite3")), sequence_batching=True,
+                                      checkpoints=None, memo=None)
+        
+        # 顶层数组和嵌套对象都能完整提取
+        assert json.loads(workflow.extract_json('结果如下：\n[{"a": {"b": 1}}, {"c": 2}]\n完毕')) == [{"a": {"b": 1}}, {"c": 2}]
+        assert json.loads(workflow.extract_json('```json\n{"x": {"y": [1]}}\n```')) == {"x": {"y": [1]}}
+        
+        # 模拟模型：超过2个用例的批次输出被截断，2个以内正常返回
+        calls = []
+        def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+            usecases = json.loads(sections[0][1])
+            calls.append(len(usecases))
+            workflow.last_usage = SimpleNamespace(completion_tokens=100 * len(usecases))
+            if len(usecases) > 2:
+                return '[{"name": "截断'
+            return json.dumps([{"name": f"{u['name']}顺序图", "messages": []} for u in usecases], ensure_ascii=False)
+        workflow._run_agent = fake_run_agent
+        
+        usecases = [UseCase(name=f"用例{i}", actor="顾客") for i in range(5)]
+        diagrams = workflow._design_sequence_diagrams_batched(usecases)
+        assert [diagrams[u.name].name for u in usecases] == [f"用例{i}顺序图" for i in range(5)]
+        assert calls[0] == 5 and len(calls) < 2 * len(usecases)
+        workflow.ledger.close()
+    print(f"   请求次数: {len(calls)}（批大小 {calls}）")
+    print("✅ 顺序图批处理正确")
+
+def test_artifact_retry():
+    """测试失败产物的定向重试和完整性报告"""
+    print("\n🔁 测试失败产物重试...")
+    from types import SimpleNamespace
+    from failure_queue import FailureQueue
+    from workflow import MultiAgentWorkflow
+    
+    queue = FailureQueue(max_retries=2)
+    failure = queue.add("sequence_diagram", "登录", "JSON解析失败", "{截断")
+    assert queue.feedback(failure) == [("上次输出", "{截断"), ("解析错误", "JSON解析失败")]
+    queue.record_attempt(failure, "仍然失败", "garbage")
+    assert queue.pending() == [failure] and failure.raw_output == "garbage"
+    queue.record_attempt(failure, "仍然失败")
+    assert queue.pending() == [] and queue.summary()["unresolved"][0]["attempts"] == 2
+    
+    workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=None)
+    
+    # 模拟模型：第一次输出截断，重试时Prompt末尾带有解析错误，返回正确结果
+    prompts = []
+    def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+        prompts.append((task, [title for title, _ in sections]))
+        workflow.last_usage = SimpleNamespace(completion_tokens=100)
+        if "解析错误" in prompts[-1][1]:
+            return '{"name": "登录顺序图", "messages": []}'
+        return '{"name": "登录顺序图", "mess'
+    workflow._run_agent = fake_run_agent
+    
+    agent = workflow.agents["sequence_diagram_designer"]
+    failure = workflow.failures.add("sequence_diagram", "登录", "JSON解析失败", '{"name": "登录顺序图", "mess')
+    diagram = workflow._retry_artifact(failure, "sequence_design", agent, "为以下用例创建系统顺序图：", [("用例", "{}")],
+                                       lambda text: workflow.parse_agent_output(agent, text, SystemSequenceDiagram))
+    assert diagram.name == "登录顺序图" and failure.resolved
+    # 任务说明固定、反馈追加在可变负载之后，前缀保持稳定
+    assert prompts[0][0].startswith("为以下用例创建系统顺序图：") and prompts[0][1] == ["用例", "上次输出", "解析错误"]
+    
+    # 无效的OCL约束被单独收集，而不是静默丢弃
+    invalid = []
+    constraints = workflow._parse_ocl_json('[{"name": "a", "context": "图书", "type": "inv", "expression": "true"}, {"name": "b"}]', invalid)
+    assert len(constraints) == 1 and len(invalid) == 1 and invalid[0][0] == {"name": "b"}
+    
+    # 同一实例的下一次运行重新开始验证迭代计数和失败队列
+    workflow.iteration_count = workflow.max_iterations
+    workflow._reset_run("run-2")
+    assert workflow.iteration_count == 0 and len(workflow.failures) == 0
+    print(f"   重试次数: {failure.attempts}")
+    print("✅ 失败产物重试正确")
+
+def test_checkpoint_resume():
+    """测试运行检查点的保存、校验和按用例续跑"""
+    print("\n💾 测试运行检查点...")
+    import tempfile
+    from types import SimpleNamespace
+    from checkpoint import CheckpointMismatch, CheckpointStore
+    from memo import StageCache
+    from workflow import MultiAgentWorkflow
+    
+    usecases = [UseCase(name=f"用例{i}", actor="顾客") for i in range(3)]
+    diagram = UseCaseDiagram(name="书店", actors=[Actor(name="顾客", type="primary")], usecases=usecases)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(tmp)
+        checkpoint = store.create("run1", "在线书店需求", "gpt-4o")
+        checkpoint.save("requirements_analysis", "分析结果")
+        checkpoint.save("usecase_modeling", diagram)
+        
+        # 重新打开后阶段输出和需求文本都能恢复，输入不一致时拒绝续跑
+        reopened = store.open("run1")
+        assert reopened.completed_stages == ["requirements_analysis", "usecase_modeling"]
+        assert reopened.load("usecase_modeling", UseCaseDiagram) == diagram
+        assert reopened.requirements == "在线书店需求"
+        try:
+            reopened.verify("另一个需求", "gpt-4o")
+            assert False, "输入不一致时应抛出CheckpointMismatch"
+        except CheckpointMismatch:
+            pass
+        
+        # 已保存的顺序图不再生成，只为剩余的用例调用模型
+        reopened.save_artifact("sequence_design", "用例0", SystemSequenceDiagram(name="用例0顺序图"))
+        workflow = MultiAgentWorkflow(ledger=None, checkpoints=store, memo=StageCache(os.path.join(tmp, "memo")))
+        workflow.checkpoint = reopened
+        calls = []
+        def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+            name = json.loads(sections[0][1])["name"]
+            calls.append(name)
+            workflow.last_usage = SimpleNamespace(completion_tokens=100)
+            return json.dumps({"name": f"{name}顺序图", "messages": []}, ensure_ascii=False)
+        workflow._run_agent = fake_run_agent
+        sequence_diagrams = workflow._design_sequences(diagram)
+        assert calls == ["用例1", "用例2"]
+        assert [d.name for d in sequence_diagrams] == ["用例0顺序图", "用例1顺序图", "用例2顺序图"]
+        assert len(reopened.load_artifacts("sequence_design", SystemSequenceDiagram)) == 3
+    print(f"   续跑调用: {len(calls)}/{len(usecases)}")
+    print("✅ 运行检查点正确")
+
+def test_stage_memo():
+    """测试阶段缓存：输入不变时复用，修改一个用例只重新生成它的顺序图"""
+    print("\n🧠 测试阶段缓存...")
+    import tempfile
+    from types import SimpleNamespace
+    from memo import StageCache, content_hash
+    from workflow import MultiAgentWorkflow
+    
+    assert content_hash("a") == content_hash("a") != content_hash("b")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = StageCache(tmp)
+        key = cache.key("class_design", ["v1"], ["用例图"], {"models": ["gpt-4o"]})
+        assert key != cache.key("class_design", ["v2"], ["用例图"], {"models": ["gpt-4o"]})
+        assert key != cache.key("class_design", ["v1"], ["用例图"], {"models": ["gpt-4o-mini"]})
+        cache.put(key, "class_design", [])
+        assert cache.has(key) and cache.get(key) == []
+        
+        workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=StageCache(os.path.join(tmp, "memo")))
+        calls = []
+        def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+            usecase = json.loads(sections[0][1])
+            calls.append(usecase["name"])
+            workflow.last_usage = SimpleNamespace(completion_tokens=100)
+            return json.dumps({"name": f"{usecase['name']}顺序图", "description": usecase.get("description", ""),
+                               "messages": []}, ensure_ascii=False)
+        workflow._run_agent = fake_run_agent
+        
+        usecases = [UseCase(name=f"用例{i}", actor="顾客") for i in range(3)]
+        diagram = UseCaseDiagram(name="书店", actors=[Actor(name="顾客", type="primary")], usecases=usecases)
+        workflow._design_sequences(diagram)
+        assert calls == ["用例0", "用例1", "用例2"]
+        
+        # 只修改用例1，其余两个顺序图从缓存复用
+        calls.clear()
+        workflow.memo_stats = {"reused": [], "recomputed": []}
+        usecases[1] = UseCase(name="用例1", actor="顾客", description="修改后的描述")
+        diagram = UseCaseDiagram(name="书店", actors=[Actor(name="顾客", type="primary")], usecases=usecases)
+        sequence_diagrams = workflow._design_sequences(diagram)
+        assert calls == ["用例1"] and sequence_diagrams[1].description == "修改后的描述"
+        assert workflow.memo_stats["reused"] == ["sequence_design[用例0]", "sequence_design[用例2]"]
+        assert workflow.memo_stats["recomputed"] == ["sequence_design[用例1]"]
+    print(f"   复用: {len(workflow.memo_stats['reused'])}，重新生成: {len(workflow.memo_stats['recomputed'])}")
+    print("✅ 阶段缓存正确")
+
+def test_incremental_modeling():
+    """测试按需求章节diff增量更新模型"""
+    print("\n✏️ 测试增量建模...")
+    import tempfile
+    from types import SimpleNamespace
+    from incremental import diff_requirements
+    from memo import StageCache
+    from workflow import MultiAgentWorkflow
+    
+    old_requirements = "在线书店系统需求：\n1. 用户注册和登录\n2. 购物车管理\n3. 订单处理和支付"
+    new_requirements = "在线书店系统需求：\n1. 用户注册和登录\n2. 购物车管理，支持收藏夹\n3. 订单处理和支付\n4. 图书评价"
+    diff = diff_requirements(old_requirements, new_requirements)
+    assert [new.title for _, new in diff.changed] == ["2. 购物车管理，支持收藏夹"]
+    assert [section.title for section in diff.added] == ["4. 图书评价"] and diff.unchanged == 3
+    assert diff_requirements(old_requirements, old_requirements.replace("\n", "\n\n")).is_empty
+    
+    usecases = [UseCase(name="用户登录", actor="顾客"), UseCase(name="管理购物车", actor="顾客"),
+                UseCase(name="支付订单", actor="顾客", includes=["管理购物车"])]
+    previous = DomainModel(
+        name="在线书店",
+        usecase_diagram=UseCaseDiagram(name="在线书店", actors=[Actor(name="顾客")], usecases=usecases),
+        sequence_diagrams=[SystemSequenceDiagram(name=f"{u.name}顺序图") for u in usecases],
+        class_diagram=ConceptualClassDiagram(name="类图", classes=[
+            Class(name="用户"),
+            Class(name="购物车", description="顾客选购的图书", attributes=[Attribute(name="容量", type="int", visibility="public")])],
+            relationships=[Relationship(name="拥有", source="用户", target="购物车", type=RelationshipType.ASSOCIATION)]),
+        ocl_constraints=[OCLConstraint(name="用户名非空", context="用户", type="inv", expression="self.name <> ''"),
+                         OCLConstraint(name="购物车容量", context="购物车", type="inv", expression="self.items->size() < 100")],
+        metadata={"run_id": "base", "requirements": old_requirements},
+    )
+    
+    # 模拟模型：每个阶段返回增量结果，记录调用的阶段
+    outputs = {
+        "usecase_delta": {"usecases": [{"name": "管理购物车", "actor": "顾客", "description": "支持收藏夹"},
+                                       {"name": "评价图书", "actor": "顾客"}], "removed_usecases": []},
+        "class_delta": {"classes": [{"name": "购物车", "attributes": [{"name": "收藏夹", "type": "List"}]},
+                                    {"name": "评价"}],
+                        "relationships": [{"source": "用户", "target": "评价", "type": "association"}]},
+        "ocl_generation": [{"name": "购物车容量", "context": "购物车", "type": "inv", "expression": "self.items->size() < 200"}],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=StageCache(tmp))
+        stages, prompts = [], {}
+        def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+            stages.append(stage)
+            prompts[stage] = dict(sections)
+            workflow.last_usage = SimpleNamespace(completion_tokens=100, total_tokens=200)
+            if stage == "sequence_design":
+                return json.dumps({"name": json.loads(sections[0][1])["name"] + "顺序图（新）"}, ensure_ascii=False)
+            output = outputs[stage]
+            return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+        workflow._run_agent = fake_run_agent
+        model = workflow.run_incremental(previous, new_requirements)
+    
+    assert sorted(stages) == ["class_delta", "ocl_generation", "sequence_design", "sequence_design", "usecase_delta"]
+    assert [u.name for u in model.usecase_diagram.usecases] == ["用户登录", "管理购物车", "支付订单", "评价图书"]
+    assert [d.name for d in model.sequence_diagrams] == ["用户登录顺序图", "管理购物车顺序图（新）", "支付订单顺序图", "评价图书顺序图（新）"]
+    assert [c.name for c in model.class_diagram.classes] == ["用户", "购物车", "评价"]
+    assert len(model.class_diagram.relationships) == 2
+    # 类增量Agent看到的当前类图包含描述、可见性和关系名称，整体替换修改后的类时不会丢失这些字段
+    current_classes = json.loads(prompts["class_delta"]["当前类图"])
+    assert current_classes["classes"][1]["description"] == "顾客选购的图书"
+    assert current_classes["classes"][1]["attributes"][0]["visibility"] == "public"
+    assert current_classes["relationships"][0]["name"] == "拥有"
+    assert {c.name: c.expression for c in model.ocl_constraints}["购物车容量"].endswith("< 200")
+    assert model.metadata["incremental"]["updated_usecases"] == ["管理购物车", "评价图书"]
+    assert model.metadata["requirements"] == new_requirements
+    calls = len(stages)
+    
+    # OCL输出无法解析且重试仍失败时，受影响类的旧约束保留而不是被清空
+    outputs["ocl_generation"] = "这不是JSON"
+    with tempfile.TemporaryDirectory() as tmp:
+        workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=StageCache(tmp))
+        workflow._run_agent = fake_run_agent
+        kept = workflow.run_incremental(previous, new_requirements)
+    assert workflow.failures.unresolved("ocl_constraints")
+    assert {c.name: c.expression for c in kept.ocl_constraints} == {c.name: c.expression for c in previous.ocl_constraints}
+    print(f"   Agent调用: {calls}（章节变更比例 {diff.change_ratio:.0%}）")
+    print("✅ 增量建模正确")
+
+def test_chunked_analysis():
+    """测试长需求文档的切分和map-reduce分析"""
+    print("\n📚 测试长文档分片分析...")
+    import threading
+    from chunking import split_document
+    from ledger import estimate_tokens
+    from workflow import MultiAgentWorkflow, STAGE_TASKS
+    
+    document = "\n".join(f"{i}. 功能{i}\n" + f"系统应支持功能{i}的第{i}项业务规则。" * 20 for i in range(1, 13))
+    chunks = split_document(document, max_tokens=400, overlap_tokens=30)
+    assert len(chunks) > 1 and all(estimate_tokens(chunk.text) <= 400 for chunk in chunks)
+    assert "".join(chunk.text for chunk in chunks).replace("\n", "") == document.replace("\n", "")
+    assert not chunks[0].overlap and all(chunk.overlap and chunks[i].text.endswith(chunk.overlap)
+                                         for i, chunk in enumerate(chunks[1:]))
+    # 没有分隔符的超长段落按字符切分
+    assert len(split_document("甲" * 1000, max_tokens=300)) == 4
+    
+    workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=None)
+    workflow._requirements_chunk_tokens = lambda: 400
+    calls = []
+    threads = set()
+    def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+        calls.append(task)
+        threads.add(threading.get_ident())
+        if task == STAGE_TASKS["requirements_chunk"]:
+            return "片段分析：" + sections[0][1].split("）", 1)[0]
+        return "合并分析：" + "+".join(text for _, text in sections)
+    workflow._run_agent = fake_run_agent
+    analysis = workflow._analyze_requirements(document)
+    
+    assert calls.count(STAGE_TASKS["requirements_chunk"]) == len(chunks)
+    assert calls.count(STAGE_TASKS["requirements_reduce"]) >= 1
+    assert STAGE_TASKS["requirements_analysis"] not in calls
+    # 合并结果按片段顺序包含所有片段的分析
+    assert [analysis.index(f"第{i + 1}/{len(chunks)}段") for i in range(len(chunks))] == sorted(
+        analysis.index(f"第{i + 1}/{len(chunks)}段") for i in range(len(chunks)))
+    # 短文档仍然单次分析
+    calls.clear()
+    workflow._analyze_requirements("在线书店系统需求：用户注册和登录")
+    assert calls == [STAGE_TASKS["requirements_analysis"]]
+    print(f"   片段数: {len(chunks)}，并行线程: {len(threads)}")
+    print("✅ 长文档分片分析正确")
+
+def test_sharding():
+    """测试大型系统按子系统分片生成类图和OCL约束并合并"""
+    print("\n🧩 测试子系统分片...")
+    from config import config
+    from sharding import cluster_usecases, normalize_name
+    from workflow import MultiAgentWorkflow
+    
+    usecases = [
+        UseCase(name="浏览图书", actor="顾客"), UseCase(name="下单", actor="顾客", includes=["支付"]),
+        UseCase(name="支付", actor="顾客"), UseCase(name="评价图书", actor="顾客"),
+        UseCase(name="管理库存", actor="管理员"), UseCase(name="统计销量", actor="管理员", extends=["管理库存"]),
+        UseCase(name="退款", actor="顾客", includes=["支付"]),
+    ]
+    diagram = UseCaseDiagram(name="在线书店", actors=[Actor(name="顾客"), Actor(name="管理员")], usecases=usecases)
+    clusters = cluster_usecases(diagram, max_size=2)
+    # 有包含关系的用例不拆分，同一参与者的连通分量按上限装箱
+    assert clusters == [["浏览图书", "评价图书"], ["下单", "支付", "退款"], ["管理库存", "统计销量"]]
+    assert normalize_name(" Order_Item ") == normalize_name("order-item") == "orderitem"
+    
+    workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=None)
+    # 各子系统的类图有重名（大小写、下划线不同）的类和重复的关系
+    def fake_run_agent(stage, agent, task, sections=(), max_tokens=2048):
+        shard = json.loads(sections[0][1])
+        names = [u["name"] for u in shard["usecases"]]
+        if stage == "class_design":
+            classes = [{"name": "Book" if "浏览图书" in names else "book", "attributes": [{"name": n, "type": "String"} for n in names]},
+                       {"name": f"{names[0]}记录"}]
+            relationships = [{"source": classes[1]["name"], "target": classes[0]["name"], "type": "association"}]
+            if "浏览图书" not in names:
+                relationships.append({"source": "BOOK", "target": classes[1]["name"], "type": "association"})
+            return json.dumps({"name": "类图", "classes": classes, "relationships": relationships}, ensure_ascii=False)
+        class_names = [c["name"] for c in json.loads(sections[1][1])["classes"]]
+        return json.dumps([{"name": "书名非空", "context": "book", "type": "inv", "expression": "self.title <> ''"},
+                           {"name": f"{names[0]}约束", "context": class_names[-1], "type": "inv", "expression": "true"}],
+                          ensure_ascii=False)
+    workflow._run_agent = fake_run_agent
+    
+    original = (config.sharding_min_usecases, config.shard_max_usecases)
+    config.sharding_min_usecases, config.shard_max_usecases = 5, 2
+    try:
+        shards = workflow._shard_usecases(diagram)
+        assert [[u.name for u in shard.usecases] for shard in shards] == clusters
+        class_diagram = workflow._design_classes_sharded(diagram, shards)
+        ocl_constraints = workflow._generate_ocl_sharded(diagram, class_diagram, shards)
+        config.sharding_min_usecases = 10
+        assert workflow._shard_usecases(diagram) == []
+    finally:
+        config.sharding_min_usecases, config.shard_max_usecases = original
+    
+    assert [c.name for c in class_diagram.classes] == ["Book", "浏览图书记录", "下单记录", "管理库存记录"]
+    assert len(class_diagram.classes[0].attributes) == len(usecases)
+    assert all(r.source in {c.name for c in class_diagram.classes} for r in class_diagram.relationships)
+    assert len(class_diagram.relationships) == 5
+    assert [c.name for c in ocl_constraints] == ["书名非空", "浏览图书约束", "下单约束", "管理库存约束"]
+    assert ocl_constraints[0].context == "Book"
+    print(f"   子系统: {len(shards)}，合并后类: {len(class_diagram.classes)}，OCL约束: {len(ocl_constraints)}")
+    print("✅ 子系统分片正确")
+
+def test_entity_resolution():
+    """测试参与者和类名的实体消解"""
+    print("\n🔗 测试实体消解...")
+    from entity_resolution import canonical_form, resolve_names, resolve_domain_model
+    
+    assert canonical_form("PaymentSystem") == canonical_form("支付系统")
+    assert canonical_form("Customers") == canonical_form("客户") == canonical_form("顾客")
+    resolution = resolve_names(["顾客", "客户", "顾客", "订单", "订单项", "OrderItem", "Order Item"])
+    assert resolution.aliases == {"客户": "顾客", "OrderItem": "订单项", "Order Item": "订单项"}
+    
+    model = DomainModel(
+        name="在线书店",
+        usecase_diagram=UseCaseDiagram(name="在线书店", actors=[Actor(name="顾客"), Actor(name="客户", description="购买图书的人")],
+                                       usecases=[UseCase(name="下单", actor="客户"), UseCase(name="支付", actor="顾客")]),
+        sequence_diagrams=[SystemSequenceDiagram(name="支付顺序图", actors=["Customer"], systems=["支付系统", "PaymentSystem"],
+                                                 messages=[Message(name="pay", sender="Customer", receiver="PaymentSystem"),
+                                                           Message(name="confirm", sender="支付系统", receiver="Customer")])],
+        class_diagram=ConceptualClassDiagram(name="类图", classes=[
+            Class(name="图书", attributes=[Attribute(name="title", type="String")]),
+            Class(name="Book", attributes=[Attribute(name="price", type="Decimal")]),
+            Class(name="订单", attributes=[Attribute(name="books", type="Book")]),
+        ], relationships=[Relationship(source="订单", target="Book", type=RelationshipType.AGGREGATION),
+                          Relationship(source="订单", target="图书", type=RelationshipType.AGGREGATION)]),
+        ocl_constraints=[OCLConstraint(name="价格非负", context="图书", type="inv", expression="self.price >= 0")],
+    )
+    resolved, aliases = resolve_domain_model(model)
+    
+    assert [a.name for a in resolved.usecase_diagram.actors] == ["顾客"]
+    assert resolved.usecase_diagram.actors[0].description == "购买图书的人"
+    assert {u.actor for u in resolved.usecase_diagram.usecases} == {"顾客"}
+    assert validate_use_case_diagram(resolved.usecase_diagram)["is_valid"]
+    sequence = resolved.sequence_diagrams[0]
+    assert sequence.actors == ["顾客"] and sequence.systems == ["支付系统"] and sequence.messages[0].receiver == "支付系统"
+    assert [c.name for c in resolved.class_diagram.classes] == ["图书", "订单"]
+    assert [a.name for a in resolved.class_diagram.classes[0].attributes] == ["title", "price"]
+    assert resolved.class_diagram.classes[1].attributes[0].type == "图书"
+    assert len(resolved.class_diagram.relationships) == 1 and resolved.ocl_constraints[0].context == "图书"
+    assert aliases["classes"] == {"Book": "图书"}
+    print(f"   参与者别名: {aliases['participants']}")
+    print(f"   类别名: {aliases['classes']}")
+    print("✅ 实体消解正确")
+
+def test_model_index():
+    """测试用例图索引视图"""
+    print("\n🗂️ 测试模型索引...")
+    from model_index import UseCaseIndex
+    from benchmarks import synthetic_domain_model
+    
+    diagram = UseCaseDiagram(name="在线书店", actors=[Actor(name="顾客")],
+                             usecases=[UseCase(name="下单", actor="顾客", includes=["支付"]), UseCase(name="支付", actor="顾客")])
+    index = UseCaseIndex(diagram)
+    assert index.usecases["支付"] is diagram.usecases[1] and index.usecase_names == {"下单", "支付"}
+    assert validate_use_case_diagram(diagram)["is_valid"]
+    
+    # 每次校验都按当前内容建立索引，列表增删和字段赋值后的结果随之更新
+    diagram.usecases.append(UseCase(name="退款", actor="客服", extends=["售后"]))
+    result = validate_use_case_diagram(diagram)
+    assert not result["is_valid"] and result["usecase_count"] == 3
+    assert result["errors"] == ["用例 '退款' 的参与者 '客服' 不存在", "用例 '退款' 扩展的用例 '售后' 不存在"]
+    diagram.actors.append(Actor(name="客服"))
+    diagram.usecases[2].extends = []
+    assert validate_use_case_diagram(diagram)["is_valid"]
+    diagram.usecases[1].name = "下单"
+    assert validate_use_case_diagram(diagram)["errors"] == ["存在重复的用例名称", "用例 '下单' 包含的用例 '支付' 不存在"]
+    assert UseCaseIndex(diagram).duplicate_usecases == ["下单"]
+    
+    model = synthetic_domain_model(usecases=50, classes=10)
+    model.usecase_diagram.actors[0].name = "在线 顾客"
+    model.usecase_diagram.usecases[0].actor = "在线 顾客"
+    plantuml = export_to_plantuml(model)
+    assert 'actor "在线 顾客" as 在线_顾客' in plantuml and "在线_顾客 --> 用例0" in plantuml
+    assert UseCaseIndex(model.usecase_diagram).alias("在线 顾客", "actor") == "在线_顾客"
+    print("✅ 模型索引正确")
+
+def test_model_graph():
+    """测试用例/类关系图的结构分析"""
+    print("\n🕸️ 测试模型图分析...")
+    from model_graph import Graph, analyze_model_graph
+    
+    graph = Graph(list("ABCDE"), [("A", "B"), ("B", "A"), ("B", "C"), ("C", "D"), ("E", "E"), ("A", "X")])
+    assert graph.cycles() == [["A", "B"], ["E"]] and graph.missing_edges == [("A", "X")]
+    assert graph.longest_paths() == [2, 2, 1, 0, 0] and graph.reachable(["C"]) == ["C", "D"]
+    # 迭代实现的Tarjan不受递归深度限制
+    chain = Graph([str(i) for i in range(5000)], [(str(i), str(i + 1)) for i in range(4999)])
+    assert len(chain.strongly_connected_components()) == 5000 and len(chain.longest_path()) == 5000
+    
+    usecases = [UseCase(name="下单", actor="顾客", includes=["支付"]), UseCase(name="支付", actor="顾客", includes=["下单"]),
+                UseCase(name="对账", actor="财务")]
+    hub = [Relationship(source="订单", target=f"实体{i}", type=RelationshipType.ASSOCIATION) for i in range(9)]
+    model = DomainModel(
+        name="在线书店",
+        usecase_diagram=UseCaseDiagram(name="在线书店", actors=[Actor(name="顾客")], usecases=usecases),
+        class_diagram=ConceptualClassDiagram(name="类图", classes=[Class(name=n) for n in
+                                                                  ["订单", "订单项", "商品", "图书", "电子书", "有声书"] + [f"实体{i}" for i in range(9)]],
+                                             relationships=hub + [
+            Relationship(source="订单", target="订单项", type=RelationshipType.COMPOSITION),
+            Relationship(source="订单项", target="订单", type=RelationshipType.AGGREGATION),
+            Relationship(source="有声书", target="电子书", type=RelationshipType.GENERALIZATION),
+            Relationship(source="电子书", target="图书", type=RelationshipType.GENERALIZATION),
+            Relationship(source="图书", target="商品", type=RelationshipType.GENERALIZATION),
+        ]),
+    )
+    structure = analyze_model_graph(model)
+    assert structure["include_cycles"] == [["下单", "支付"]]
+    assert structure["unreachable_usecases"] == ["对账"]
+    assert structure["containment_cycles"] == [["订单", "订单项"]]
+    assert structure["god_classes"] == [("订单", 11)] and structure["central_classes"][0]["name"] == "商品"
+    assert structure["generalization_depth"] == 3
+    assert structure["deepest_generalization_chain"] == ["有声书", "电子书", "图书", "商品"]
+    assert structure["cyclomatic_complexity"] == 14 - 15 + 2
+    
+    complexity = analyze_domain_complexity(model)
+    assert complexity["metrics"]["include_cycle_count"] == 1 and complexity["metrics"]["god_class_count"] == 1
+    assert complexity["complexity_level"] == "复杂" and len(complexity["recommendations"]) == 4
+    print(f"   复杂度评分: {complexity['complexity_score']}")
+    print("✅ 模型图分析正确")
+
+def test_plantuml_export():
+    """测试类图、顺序图和用例图的PlantUML导出"""
+    print("\n🖼️ 测试PlantUML导出...")
+    import io
+    import tempfile
+    from plantuml_export import export_plantuml, write_class_diagram, write_sequence_diagram, write_usecase_diagram
+    from benchmarks import synthetic_domain_model
+    
+    # 名称中的标点替换为下划线，替换后相同的名称和同名的参与者/用例得到不同的别名
+    diagram = UseCaseDiagram(name="书店", actors=[Actor(name="顾客"), Actor(name="客服(在线)")], usecases=[
+        UseCase(name="顾客", actor="顾客"), UseCase(name="退/换货", actor="客服(在线)", includes=["退-换货"]),
+        UseCase(name="退-换货", actor="客服(在线)")])
+    buffer = io.StringIO()
+    write_usecase_diagram(diagram, buffer)
+    lines = buffer.getvalue().splitlines()
+    assert 'actor "客服(在线)" as 客服_在线_' in lines and 'usecase "顾客" as 顾客_2' in lines
+    assert "退_换货 ..> 退_换货_2 : <<include>>" in lines and "顾客 --> 顾客_2" in lines
+    
+    classes = ConceptualClassDiagram(name="类图", classes=[
+        Class(name="Order Item", attributes=[Attribute(name="quantity", type="Integer", multiplicity="0..1")],
+              methods=[Method(name="subtotal", parameters=["rate"], return_type="Double")]),
+        Class(name="Order", stereotypes=["entity"]), Class(name="Entity")], relationships=[
+        Relationship(source="Order", target="Order Item", type=RelationshipType.COMPOSITION, target_multiplicity="1..*", name="contains"),
+        Relationship(source="Order", target="Entity", type=RelationshipType.GENERALIZATION)])
+    buffer = io.StringIO()
+    write_class_diagram(classes, buffer)
+    lines = buffer.getvalue().splitlines()
+    assert 'class "Order Item" as Order_Item {' in lines and 'class "Order" as Order <<entity>> {' in lines
+    assert "  -quantity : Integer [0..1]" in lines and "  +subtotal(rate) : Double" in lines
+    assert 'Order "1" *-- "1..*" Order_Item : contains' in lines and "Order --|> Entity" in lines
+    
+    sequence = SystemSequenceDiagram(name="下单", actors=["顾客"], systems=["书店系统"], messages=[
+        Message(name="submit", sender="顾客", receiver="书店系统", parameters=["order"], return_value="ok"),
+        Message(name="notify", sender="书店系统", receiver="顾客", message_type="asynchronous")])
+    buffer = io.StringIO()
+    write_sequence_diagram(sequence, buffer)
+    lines = buffer.getvalue().splitlines()
+    assert lines[-4:] == ["顾客 -> 书店系统 : submit(order)", "书店系统 --> 顾客 : ok", "书店系统 ->> 顾客 : notify()", "@enduml"]
+    
+    # 顺序图数量达到阈值时用进程池写入，结果与串行写入相同
+    model = synthetic_domain_model(usecases=60, classes=10)
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = export_plantuml(model, os.path.join(tmp, "serial"), "bookstore", workers=1)
+        parallel = export_plantuml(model, os.path.join(tmp, "parallel"), "bookstore", workers=2)
+        assert len(parallel["sequence"]) == len(model.sequence_diagrams) == 60
+        for a, b in zip(serial["sequence"] + [serial["class"]], parallel["sequence"] + [parallel["class"]]):
+            with open(a, encoding="utf-8") as fa, open(b, encoding="utf-8") as fb:
+                assert fa.read() == fb.read() and os.path.basename(a) == os.path.basename(b)
+        with open(serial["usecase"], encoding="utf-8") as f:
+            assert f.read() == export_to_plantuml(model)
+    print(f"   顺序图文件: {len(parallel['sequence'])} 个")
+    print("✅ PlantUML导出正确")
+
+def test_plantuml_pagination():
+    """测试超过节点预算的用例图/类图分页导出"""
+    print("\n📑 测试PlantUML分页导出...")
+    import re
+    import tempfile
+    from plantuml_export import export_plantuml, paginate
+    
+    # 同一参与者的用例为一组，有包含关系的用例（A0 -> B0）归入同一组
+    usecases = [UseCase(name=f"{actor}{i}", actor=actor, includes=["B0"] if (actor, i) == ("A", 0) else [])
+                for actor in "ABC" for i in range(5)]
+    # 一条长包含链超过预算时按顺序拆到连续的页，跨页的引用画为占位节点并出现在索引图中
+    usecases += [UseCase(name=f"链{i}", actor="D", includes=[f"链{i + 1}"] if i < 11 else []) for i in range(12)]
+    classes = [Class(name=f"类{i}") for i in range(20)]
+    relationships = [Relationship(source=f"类{i}", target=f"类{i // 4 * 4}", type=RelationshipType.GENERALIZATION)
+                     for i in range(20) if i % 4] + [Relationship(source="类12", target="类1", type=RelationshipType.ASSOCIATION)]
+    model = DomainModel(name="大型系统",
+                        usecase_diagram=UseCaseDiagram(name="大型系统", actors=[Actor(name=a) for a in "ABCD"], usecases=usecases),
+                        class_diagram=ConceptualClassDiagram(name="类图", classes=classes, relationships=relationships))
+    with tempfile.TemporaryDirectory() as tmp:
+        result = export_plantuml(model, tmp, "big", workers=1, max_nodes=8)
+        pages = []
+        for path in result["usecase_pages"] + result["class_pages"]:
+            with open(path, encoding="utf-8") as f:
+                pages.append(f.read())
+            assert len(re.findall(r"^\s*(?:actor|usecase|class) ", pages[-1], re.M)) <= 8
+        assert len(result["usecase_pages"]) == 5 and len(result["class_pages"]) == 3
+        assert 'package "B的用例" {' in pages[0] and 'usecase "链6" as 链6 <<第5页>>' in pages[3]
+        assert 'class "类1" as 类1 <<第1页>>' in pages[7] and '类12 "1" -- "1" 类1' in pages[7]
+        with open(result["usecase"], encoding="utf-8") as f:
+            index = f.read()
+        assert "page_4 ..> page_5 : 1" in index and "B --> page_1" in index and "B --> page_2" in index
+        assert 'rectangle "第1页\\nbig_usecase/001.puml\\n6个元素" as page_1' in index
+        with open(result["class"], encoding="utf-8") as f:
+            assert "page_3 ..> page_1 : 1" in f.read()
+        # 未超过预算时仍为单张图
+        small = export_plantuml(model, os.path.join(tmp, "small"), "big", workers=1, max_nodes=100)
+        assert small["usecase_pages"] == [] and small["class_pages"] == []
+    
+    assert paginate([["a", "b"], ["c"]], lambda name: (), lambda name: (), 3) == [["a", "b", "c"]]
+    print(f"   用例图 {len(result['usecase_pages'])} 页，类图 {len(result['class_pages'])} 页")
+    print("✅ PlantUML分页导出正确")
+
+def test_incremental_export():
+    """测试按内容哈希跳过未变化产物的增量导出"""
+    print("\n♻️ 测试增量导出...")
+    import tempfile
+    from artifacts import ArtifactWriter
+    from plantuml_export import export_plantuml
+    from benchmarks import synthetic_domain_model
+    
+    def export(model, root, workers=1, max_nodes=None):
+        artifacts = ArtifactWriter(root, "bookstore")
+        save_domain_model(model, "bookstore_model.json", artifacts=artifacts)
+        export_plantuml(model, root, "bookstore", workers=workers, max_nodes=max_nodes, artifacts=artifacts)
+        return artifacts.finish()
+    
+    model = synthetic_domain_model(usecases=60, classes=10)
+    with tempfile.TemporaryDirectory() as tmp:
+        first = export(model, tmp)
+        assert len(first["changed"]) == 63 and first["unchanged"] == [] and first["removed"] == []
+        mtimes = {name: os.stat(os.path.join(tmp, name)).st_mtime_ns for name in first["changed"]}
+        
+        # 内容未变化时不重写任何文件
+        second = export(model, tmp)
+        assert second["changed"] == [] and len(second["unchanged"]) == 63
+        assert all(os.stat(os.path.join(tmp, name)).st_mtime_ns == mtime for name, mtime in mtimes.items())
+        
+        # 只修改一个顺序图：并行写入时也只重写该文件和模型JSON
+        model.sequence_diagrams[7].messages[0].name = "提交订单"
+        third = export(model, tmp, workers=2)
+        assert third["changed"] == ["bookstore_model.json", "bookstore_sequence/007_用例7顺序图.puml"]
+        
+        # 清单之外被改动的文件按磁盘内容比较后重写；不再生成的产物（分页后的整图页面）被删除
+        with open(os.path.join(tmp, "bookstore_class.puml"), "a", encoding="utf-8") as f:
+            f.write("' edited\n")
+        paged = export(model, tmp, max_nodes=8)
+        assert "bookstore_class.puml" in paged["changed"] and "bookstore_class/001.puml" in paged["changed"]
+        whole = export(model, tmp)
+        assert "bookstore_class/001.puml" in whole["removed"] and not os.path.exists(os.path.join(tmp, "bookstore_class", "001.puml"))
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+        with open(os.path.join(tmp, "bookstore_manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        assert len(manifest["artifacts"]) == 63 and manifest["changed"] == whole["changed"]
+    print(f"   首次写入 {len(first['changed'])} 个产物，再次导出变化 {len(second['changed'])} 个")
+    print("✅ 增量导出正确")
+
+def test_model_diff():
+    """测试两个领域模型版本的结构化对比"""
+    print("\n🔀 测试模型对比...")
+    from model_diff import diff_models
+    from workflow import MultiAgentWorkflow
+    
+    def model(actors, usecases, classes, relationships, constraints):
+        return DomainModel(name="在线书店", usecase_diagram=UseCaseDiagram(name="在线书店", actors=actors, usecases=usecases),
+                           class_diagram=ConceptualClassDiagram(name="类图", classes=classes, relationships=relationships),
+                           ocl_constraints=constraints)
+    
+    old = model(
+        [Actor(name="顾客"), Actor(name="管理员")],
+        [UseCase(name="下单", actor="顾客", includes=["支付"]), UseCase(name="支付", actor="顾客"),
+         UseCase(name="上架图书", actor="管理员", description="录入新书")],
+        [Class(name="订单", attributes=[Attribute(name="金额", type="Double"), Attribute(name="状态", type="String")]),
+         Class(name="图书", attributes=[Attribute(name="标题", type="String")])],
+        [Relationship(source="订单", target="图书", type=RelationshipType.ASSOCIATION, target_multiplicity="1..*")],
+        [OCLConstraint(name="金额非负", context="订单", type="inv", expression="self.金额 >= 0")],
+    )
+    new = model(
+        [Actor(name="客户"), Actor(name="管理员")],
+        [UseCase(name="下单", actor="客户", includes=[]), UseCase(name="新增图书", actor="管理员", description="录入新书"),
+         UseCase(name="退货", actor="客户")],
+        [Class(name="订单", attributes=[Attribute(name="金额", type="Decimal"), Attribute(name="创建时间", type="Date")]),
+         Class(name="Book", attributes=[Attribute(name="标题", type="String")])],
+        [Relationship(source="订单", target="Book", type=RelationshipType.ASSOCIATION, target_multiplicity="0..*")],
+        [OCLConstraint(name="金额非负", context="订单", type="inv", expression="self.金额 > 0")],
+    )
+    assert diff_models(old, old.model_copy(deep=True)).is_empty
+    
+    diff = diff_models(old, new)
+    assert diff.summary() == {
+        "actor": {"renamed": 1}, "usecase": {"modified": 1, "renamed": 1, "removed": 1, "added": 1},
+        "class": {"renamed": 1}, "attribute": {"modified": 1, "removed": 1, "added": 1},
+        "relationship": {"modified": 1}, "constraint": {"modified": 1},
+    }
+    # 同义词归一后名称相同（顾客/客户、图书/Book）或内容完全相同（上架图书/新增图书）时视为重命名
+    renamed = {(c.kind, c.old_name, c.name) for c in diff.changes if c.change == "renamed"}
+    assert renamed == {("actor", "顾客", "客户"), ("class", "图书", "Book"), ("usecase", "上架图书", "新增图书")}
+    order = diff.of("usecase", "modified")[0]
+    assert order.name == "下单" and order.fields == {"actor": ("顾客", "客户"), "includes": (["支付"], [])}
+    # 重命名类中未变化的属性不会被报告；关系两端按类的重命名对应
+    assert [c.label for c in diff.of("attribute")] == ["订单.金额", "订单.状态", "订单.创建时间"]
+    assert diff.of("relationship")[0].fields == {"target_multiplicity": ("1..*", "0..*")}
+    assert diff.of("constraint")[0].fields == {"expression": ("self.金额 >= 0", "self.金额 > 0")}
+    assert "→ 参与者 顾客 -> 客户" in diff.format() and diff.to_dict()["summary"] == diff.summary()
+    
+    # 验证迭代中每轮改进的变化记入运行元数据
+    workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=None)
+    workflow.iteration_count = 1
+    workflow._record_iteration_diff(old, new.usecase_diagram, new.class_diagram, new.sequence_diagrams, new.ocl_constraints)
+    assert workflow.iteration_diffs[0]["summary"] == diff.summary() and len(workflow.iteration_diffs[0]["changes"]) == 11
+    print(diff.format(limit=3))
+    print("✅ 模型对比正确")
+
+def test_model_store():
+    """测试SQLite模型仓库的保存、按元素读取和跨模型查询"""
+    print("\n🗄️ 测试模型仓库...")
+    import tempfile
+    from benchmarks import synthetic_domain_model
+    from model_store import ModelStore
+    
+    model = synthetic_domain_model(12, 8)
+    model.class_diagram.classes[0].methods.append(Method(name="结算", parameters=["金额: Double"], return_type="Boolean"))
+    model.ocl_constraints.append(OCLConstraint(name="金额非负", context="实体1", type="inv", expression="self.金额 >= 0"))
+    model.metadata["run_id"] = "run-1"
+    other = synthetic_domain_model(3, 2)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ModelStore(os.path.join(tmp, "models.sqlite3"))
+        try:
+            model_id = store.save(model)
+            other_id = store.save(other, run_id="run-2")
+            assert model_id != other_id
+            assert store.load(model_id) == model
+            
+            # 只读取单个图或单个顺序图
+            assert store.load_class_diagram(model_id) == model.class_diagram
+            assert store.load_usecase_diagram(other_id) == other.usecase_diagram
+            sequence = model.sequence_diagrams[5]
+            assert store.load_sequence_diagram(model_id, sequence.name) == sequence
+            assert store.load_sequence_diagram(model_id, "不存在") is None
+            constraints = store.load_ocl_constraints(model_id, context="实体1")
+            assert constraints == [c for c in model.ocl_constraints if c.context == "实体1"] and constraints[-1].name == "金额非负"
+            
+            # 跨模型查询
+            assert {m["model_id"] for m in store.models_with_class("实体1")} == {model_id, other_id}
+            assert [m["model_id"] for m in store.models_with_class("实体5")] == [model_id]
+            assert [m["run_id"] for m in store.models_with_usecase("用例10")] == ["run-1"]
+            relationships = store.relationships_of("实体1", model_id)
+            assert relationships and all("实体1" in (r["source"], r["target"]) for r in relationships)
+            assert {m["model_id"]: m["class_count"] for m in store.list_models()} == {model_id: 8, other_id: 2}
+            
+            # 同一model_id再次保存时覆盖，删除后不再可查
+            other.class_diagram.classes.pop()
+            assert store.save(other, model_id=other_id) == other_id
+            assert store.load(other_id) == other and [m["model_id"] for m in store.models_with_class("实体1")] == [model_id]
+            assert store.delete(other_id) and not store.delete(other_id)
+            try:
+                store.load(other_id)
+                assert False, "已删除的模型不应能读取"
+            except KeyError:
+                pass
+        finally:
+            store.close()
+    
+    # 未指定文件名时，并发保存的JSON文件名互不冲突
+    with tempfile.TemporaryDirectory() as tmp:
+        first = save_domain_model(other, output_dir=tmp)
+        second = save_domain_model(other, output_dir=tmp)
+        assert first != second and len(os.listdir(tmp)) == 2
+        assert load_domain_model(os.listdir(tmp)[0], output_dir=tmp) == other
+    print(f"   模型 {model_id[:8]} 共 {len(relationships)} 条关系涉及实体1")
+    print("✅ 模型仓库正确")
+
+def test_model_jsonl():
+    """测试流式JSONL模型格式的写入、追加和按需读取"""
+    print("\n📄 测试JSONL模型格式...")
+    import tempfile
+    from benchmarks import synthetic_domain_model
+    from model_jsonl import ModelJsonlReader, append_jsonl, write_model_jsonl
+    
+    model = synthetic_domain_model(20, 10)
+    model.metadata["run_id"] = "run-1"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.jsonl")
+        records = write_model_jsonl(model, path)
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        assert len(lines) == records and json.loads(lines[0])["kind"] == "model"
+        assert all(line.startswith('{"kind":"') for line in lines)
+        
+        with ModelJsonlReader(path) as reader:
+            assert reader.counts()["class"] == 10 and reader.counts()["sequence_diagram"] == 20
+            assert reader.load() == model
+            assert reader.class_diagram() == model.class_diagram
+            assert reader.sequence_diagram("用例7顺序图") == model.sequence_diagrams[7]
+            assert reader.sequence_diagram("不存在") is None
+            assert list(reader.sequence_diagrams()) == model.sequence_diagrams
+        
+        # 追加记录：同名元素以最后一条为准并保持原位置，新元素排在末尾
+        changed = model.class_diagram.classes[3].model_copy(update={"description": "追加修改"})
+        added = Class(name="新类", attributes=[Attribute(name="编号", type="String")])
+        assert append_jsonl(path, "class", [changed, added]) == 2
+        with ModelJsonlReader(path) as reader:
+            assert reader.counts()["class"] == 12
+            classes = reader.class_diagram().classes
+            assert len(classes) == 11 and classes[3].description == "追加修改" and classes[-1].name == "新类"
+            assert [c.name for c in reader.elements("class")] == [c.name for c in classes]
+            assert reader.usecase_diagram() == model.usecase_diagram
+        
+        # 不是JSONL模型文件时报错
+        bad = os.path.join(tmp, "bad.jsonl")
+        with open(bad, "w", encoding="utf-8") as f:
+            f.write('{"kind":"class","name":"A"}\n')
+        try:
+            ModelJsonlReader(bad)
+            assert False, "缺少模型头的文件不应能读取"
+        except ValueError:
+            pass
+        
+        # save_domain_model/load_domain_model 按扩展名使用JSONL格式
+        save_domain_model(model, "model.jsonl", output_dir=tmp)
+        assert load_domain_model("model.jsonl", output_dir=tmp) == model
+    print(f"   {records} 条记录，追加后类图 {len(classes)} 个类")
+    print("✅ JSONL模型格式正确")
+
+def test_archive():
+    """测试内容寻址归档的去重、字典压缩和垃圾回收"""
+    print("\n🗜️ 测试模型归档...")
+    import tempfile
+    from benchmarks import synthetic_domain_model
+    from archive import ModelArchive, archive_run
+    
+    models = [synthetic_domain_model(3, seed=seed) for seed in range(12)]
+    with tempfile.TemporaryDirectory() as tmp, ModelArchive(tmp, codec="zlib") as archive:
+        # 相同内容只存一份
+        first = archive_run(archive, "run-1", models[0], [{"source": "类图设计师", "text": "CLASS 订单"}])
+        second = archive_run(archive, "run-2", models[0], [{"source": "类图设计师", "text": "CLASS 订单"}])
+        assert first == second == {"model": first["model"], "raw_outputs": 1}
+        assert archive.resolve("runs/run-2/model") == first["model"]
+        assert sum(row["blobs"] for row in archive.stats()) == 2
+        assert archive.get_json(first["model"]) == models[0].model_dump(mode="json")
+        
+        # 训练字典后新存入的内容使用字典压缩，之前的内容仍可读取
+        samples = [archive.get(archive.put_json(m.model_dump(mode="json"), kind="model", ref=f"runs/{i}/model"))
+                   for i, m in enumerate(models[1:8], 1)]
+        dict_id = archive.train_dictionary("model", samples)
+        assert dict_id is not None
+        digest = archive.put_json(models[9].model_dump(mode="json"), kind="model", ref="runs/9/model")
+        blob = archive._query("SELECT dict_id, size, stored_size FROM blobs WHERE hash = ?", (digest,))[0]
+        assert blob["dict_id"] == dict_id and blob["stored_size"] < blob["size"] / 3
+        assert archive.get_json(digest) == models[9].model_dump(mode="json")
+        assert archive.get_json(first["model"]) == models[0].model_dump(mode="json")
+        
+        # 垃圾回收只删除没有引用的内容
+        orphan = archive.put("临时内容" * 10, kind="raw_output")
+        assert archive.gc(grace_seconds=0, dry_run=True)["blobs"] == 1 and archive.has(orphan)
+        assert archive.gc(grace_seconds=0)["blobs"] == 1 and not archive.has(orphan)
+        assert archive.gc(grace_seconds=0)["blobs"] == 0
+        assert archive.remove_refs("runs/run-") == 4
+        assert archive.gc(grace_seconds=0)["blobs"] == 2
+        try:
+            archive.get(first["model"])
+            assert False, "已回收的内容不应能读取"
+        except KeyError:
+            pass
+        assert archive.get_json(digest) == models[9].model_dump(mode="json")
+        
+        # 没有blob使用的旧字典在重新训练后被回收
+        archive.remove_refs("runs/")
+        archive.train_dictionary("model", samples[:4])
+        result = archive.gc(grace_seconds=0)
+        assert (result["blobs"], result["dictionaries"]) == (8, 1) and archive.stats() == []
+    print(f"   字典压缩后 {blob['size']} -> {blob['stored_size']} 字节")
+    print("✅ 模型归档正确")
+
+def test_serialization():
+    """测试JSON序列化后端和流式写入"""
+    print("\n🧾 测试JSON序列化...")
+    import io
+    from benchmarks import synthetic_domain_model
+    from serialization import dumps, write_json
+    
+    model = synthetic_domain_model(6, 4)
+    model.metadata.update({"run_id": "run-1", "scores": [1, 2.5, None], "说明": "中文"})
+    # 流式写入与原来 json.dump(model_dump(), indent=2) 的输出逐字节相同
+    expected = json.dumps(model.model_dump(), ensure_ascii=False, indent=2)
+    buffer = io.StringIO()
+    write_json(model, buffer, pretty=True)
+    assert buffer.getvalue() == expected == dumps(model, pretty=True).decode("utf-8")
+    
+    compact = dumps(model, pretty=False)
+    assert b"\n" not in compact and "中文".encode("utf-8") in compact
+    buffer = io.StringIO()
+    write_json(model, buffer, pretty=False)
+    assert buffer.getvalue().encode("utf-8") == compact
+    for backend in ("orjson", "json"):
+        assert json.loads(dumps(model, pretty=False, backend=backend)) == json.loads(compact)
+    assert DomainModel.model_validate_json(compact) == model
+    
+    # 空列表和嵌套数据
+    empty = DomainModel(name="空", usecase_diagram=UseCaseDiagram(name="空"), class_diagram=ConceptualClassDiagram(name="空"))
+    for pretty in (True, False):
+        buffer = io.StringIO()
+        write_json(empty, buffer, pretty=pretty)
+        assert buffer.getvalue() == dumps(empty, pretty=pretty).decode("utf-8")
+    print(f"   缩进输出 {len(expected)} 字符，紧凑输出 {len(compact)} 字节")
+    print("✅ JSON序列化正确")
+
+def test_validation():
+    """测试批量校验、错误收集和存储数据的读回校验"""
+    print("\n✅ 测试批量校验...")
+    from pydantic import ValidationError
+    from checkpoint import load_value
+    from validation import list_adapter, validate_batch, validate_json_list
+    
+    assert list_adapter(OCLConstraint) is list_adapter(OCLConstraint)
+    items = [{"name": "a", "context": "图书", "type": "inv", "expression": "true"},
+             {"name": "b"},
+             "不是对象",
+             {"name": "c", "context": "订单", "type": "inv", "expression": "self.金额 >= 0"}]
+    result = validate_batch(OCLConstraint, items)
+    # 一次收集所有无效元素的全部错误，有效元素保持原位置
+    assert [c.name for c in result.valid] == ["a", "c"] and result.items[1] is None and result.items[2] is None
+    assert [e.index for e in result.errors] == [1, 2]
+    assert all(field in result.errors[0].message for field in ("context", "type", "expression"))
+    assert result.objects_per_second > 0
+    assert validate_batch(OCLConstraint, items[:1]).errors == []
+    assert validate_json_list(OCLConstraint, json.dumps([items[0]])) == [OCLConstraint.model_validate(items[0])]
+    
+    # 检查点读回的数据重新校验：被改动或旧版本写入的数据不会被当作有效模型
+    assert load_value([items[0]], OCLConstraint) == [OCLConstraint.model_validate(items[0])]
+    try:
+        load_value(items[:2], OCLConstraint)
+        assert False, "检查点中的无效数据应校验失败"
+    except ValidationError:
+        pass
+    
+    # 工作流中的OCL解析走批量校验
+    from workflow import MultiAgentWorkflow
+    workflow = MultiAgentWorkflow(ledger=None, checkpoints=None, memo=None)
+    invalid = []
+    constraints = workflow._parse_ocl_json(json.dumps(items, ensure_ascii=False), invalid)
+    assert len(constraints) == 2 and [data for data, _ in invalid] == [{"name": "b"}, "不是对象"]
+    assert invalid[1][1] == "OCL约束不是JSON对象"
+    print(f"   无效元素 {len(result.errors)} 个，错误: {result.errors[0].message[:40]}...")
+    print("✅ 批量校验正确")
+
+def main():
+    """主测试函数"""
+    print("🚀 MultiAgent Workflow 基本功能测试")
+    print("=" * 50)
+    
+    try:
+        # 测试DSL模型
+        test_dsl_models()
+        
+        # 测试工具函数
+        test_tools()
+        
+        # 测试JSON序列化
+        test_json_serialization()
+        
+        # 测试追踪
+        test_tracing()
+        
+        # 测试事件日志
+        test_event_log()
+        
+        # 测试token账本
+        test_token_ledger()
+        
+        # 测试Prompt紧凑序列化
+        test_prompt_serialization()
+        
+        # 测试紧凑输出语法
+        test_terse_dsl()
+        
+        # 测试Prompt布局
+        test_prompt_builder()
+        
+        # 测试顺序图批处理
+        test_sequence_batching()
+        
+        # 测试失败产物重试
+        test_artifact_retry()
+        
+        # 测试运行检查点
+        test_checkpoint_resume()
+        
+        # 测试阶段缓存
+        test_stage_memo()
+        
+        # 测试增量建模
+        test_incremental_modeling()
+        
+        # 测试长文档分片分析
+        test_chunked_analysis()
+        
+        # 测试子系统分片
+        test_sharding()
+        
+        # 测试实体消解
+        test_entity_resolution()
+        
+        # 测试模型索引
+        test_model_index()
+        
+        # 测试模型图分析
+        test_model_graph()
+        
+        # 测试PlantUML导出
+        test_plantuml_export()
+        
+        # 测试PlantUML分页导出
+        test_plantuml_pagination()
+        
+        # 测试增量导出
+        test_incremental_export()
+        
+        # 测试模型对比
+        test_model_diff()
+        
+        # 测试模型仓库
+        test_model_store()
+        
+        # 测试JSONL模型格式
+        test_model_jsonl()
+        
+        # 测试模型归档
+        test_archive()
+        
+        # 测试JSON序列化
+        test_serialization()
+        
+        # 测试批量校验
+        test_validation()
+        
+        print("\n🎉 所有基本功能测试通过！")
+        print("\n📋 测试总结:")
+        print("   ✅ DSL数据模型创建和验证")
+        print("   ✅ 工具函数功能测试")
+        print("   ✅ JSON序列化和反序列化")
+        print("   ✅ 用例图验证")
+        print("   ✅ 顺序图生成")
+        print("   ✅ 类提取")
+        print("   ✅ OCL约束生成")
+        print("   ✅ PlantUML导出")
+        print("   ✅ 复杂度分析")
+        print("   ✅ 追踪span导出")
+        print("   ✅ 事件日志")
+        print("   ✅ token账本")
+        print("   ✅ Prompt紧凑序列化")
+        print("   ✅ 紧凑输出语法")
+        print("   ✅ 前缀缓存友好的Prompt布局")
+        print("   ✅ 顺序图批处理")
+        print("   ✅ 失败产物定向重试")
+        print("   ✅ 运行检查点和续跑")
+        print("   ✅ 阶段缓存增量复用")
+        print("   ✅ 按需求diff增量建模")
+        print("   ✅ 长需求文档map-reduce分析")
+        print("   ✅ 大型系统分片生成与合并")
+        print("   ✅ 参与者和类名实体消解")
+        print("   ✅ 模型名称索引")
+        print("   ✅ 用例/类关系图结构分析")
+        print("   ✅ 类图/顺序图PlantUML导出")
+        print("   ✅ 大型图分页导出和索引图")
+        print("   ✅ 按内容哈希增量导出")
+        print("   ✅ 模型版本结构化对比")
+        print("   ✅ SQLite模型仓库和跨模型查询")
+        print("   ✅ 流式JSONL模型格式和按需读取")
+        print("   ✅ 内容寻址压缩归档和垃圾回收")
+        print("   ✅ pydantic-core流式JSON序列化")
+        print("   ✅ TypeAdapter批量校验和存储数据读回校验")
+        
+    except Exception as e:
+        print(f"\n❌ 测试过程中出现错误: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,308 +1,404 @@
-from typing import List, Dict, Any, Optional
-from dsl_models import (
-    DomainModel, UseCaseDiagram, SystemSequenceDiagram, 
-    ConceptualClassDiagram, OCLConstraint, UseCase, Actor,
-    Class, Relationship, Message
-)
-import json
-import os
-from datetime import datetime
-
-def save_domain_model(model: DomainModel, filename: str = None) -> str:
-    """
-    保存领域模型到JSON文件
-    
-    Args:
-        model: 领域模型对象
-        filename: 文件名，如果不提供则自动生成
-    
-    Returns:
-        保存的文件路径
-    """
-    if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"domain_model_{timestamp}.json"
-    
-    # 确保输出目录存在
-    os.makedirs("output", exist_ok=True)
-    filepath = os.path.join("output", filename)
-    
-    # 转换为JSON并保存
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(model.model_dump(), f, ensure_ascii=False, indent=2)
-    
-    return f"领域模型已保存到: {filepath}"
-
-def load_domain_model(filename: str) -> DomainModel:
-    """
-    从JSON文件加载领域模型
-    
-    Args:
-        filename: 文件名
-    
-    Returns:
-        领域模型对象
-    """
-    filepath = os.path.join("output", filename)
-    
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"文件不存在: {filepath}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    return DomainModel(**data)
-
-def validate_use_case_diagram(usecase_diagram: UseCaseDiagram) -> Dict[str, Any]:
-    """
-    验证用例图的完整性和一致性
-    
-    Args:
-        usecase_diagram: 用例图对象
-    
-    Returns:
-        验证结果
-    """
-    errors = []
-    warnings = []
-    
-    # 检查用例名称唯一性
-    usecase_names = [uc.name for uc in usecase_diagram.usecases]
-    if len(usecase_names) != len(set(usecase_names)):
-        errors.append("存在重复的用例名称")
-    
-    # 检查参与者名称唯一性
-    actor_names = [actor.name for actor in usecase_diagram.actors]
-    if len(actor_names) != len(set(actor_names)):
-        errors.append("存在重复的参与者名称")
-    
-    # 检查用例中的参与者是否存在
-    for usecase in usecase_diagram.usecases:
-        if usecase.actor not in actor_names:
-            errors.append(f"用例 '{usecase.name}' 的参与者 '{usecase.actor}' 不存在")
-    
-    # 检查包含和扩展的用例是否存在
-    for usecase in usecase_diagram.usecases:
-        for included in usecase.includes:
-            if included not in usecase_names:
-                errors.append(f"用例 '{usecase.name}' 包含的用例 '{included}' 不存在")
-        
-        for extended in usecase.extends:
-            if extended not in usecase_names:
-                errors.append(f"用例 '{usecase.name}' 扩展的用例 '{extended}' 不存在")
-    
-    # 检查是否有孤立用例（没有参与者）
-    for usecase in usecase_diagram.usecases:
-        if not usecase.actor:
-            warnings.append(f"用例 '{usecase.name}' 没有指定参与者")
-    
-    return {
-        "is_valid": len(errors) == 0,
-        "errors": errors,
-        "warnings": warnings,
-        "usecase_count": len(usecase_diagram.usecases),
-        "actor_count": len(usecase_diagram.actors)
-    }
-
-def generate_sequence_diagram_from_usecase(usecase: UseCase, system_name: str) -> SystemSequenceDiagram:
-    """
-    根据用例自动生成系统顺序图
-    
-    Args:
-        usecase: 用例对象
-        system_name: 系统名称
-    
-    Returns:
-        系统顺序图对象
-    """
-    # 创建基本的顺序图
-    sequence_diagram = SystemSequenceDiagram(
-        name=f"{usecase.name}_Sequence",
-        description=f"用例 '{usecase.name}' 的系统顺序图",
-        actors=[usecase.actor],
-        systems=[system_name],
-        messages=[]
-    )
-    
-    # 添加基本的交互消息
-    sequence_diagram.messages.append(Message(
-        name=f"执行{usecase.name}",
-        sender=usecase.actor,
-        receiver=system_name,
-        message_type="synchronous",
-        parameters=[],
-        return_value="结果"
-    ))
-    
-    return sequence_diagram
-
-def extract_classes_from_usecases(usecase_diagram: UseCaseDiagram) -> List[Class]:
-    """
-    从用例图中提取潜在的概念类
-    
-    Args:
-        usecase_diagram: 用例图对象
-    
-    Returns:
-        概念类列表
-    """
-    classes = []
-    
-    # 为每个参与者创建类
-    for actor in usecase_diagram.actors:
-        classes.append(Class(
-            name=actor.name,
-            description=f"参与者: {actor.description or actor.name}",
-            attributes=[],
-            methods=[],
-            stereotypes=["actor"]
-        ))
-    
-    # 为每个用例创建类
-    for usecase in usecase_diagram.usecases:
-        classes.append(Class(
-            name=usecase.name,
-            description=f"用例: {usecase.description or usecase.name}",
-            attributes=[],
-            methods=[],
-            stereotypes=["usecase"]
-        ))
-    
-    return classes
-
-def generate_ocl_constraints(usecase_diagram: UseCaseDiagram, class_diagram: ConceptualClassDiagram) -> List[OCLConstraint]:
-    """
-    根据用例图和类图生成OCL约束
-    
-    Args:
-        usecase_diagram: 用例图对象
-        class_diagram: 类图对象
-    
-    Returns:
-        OCL约束列表
-    """
-    constraints = []
-    
-    # 为每个用例生成前置条件约束
-    for usecase in usecase_diagram.usecases:
-        if usecase.preconditions:
-            for i, precondition in enumerate(usecase.preconditions):
-                constraints.append(OCLConstraint(
-                    name=f"{usecase.name}_Precondition_{i+1}",
-                    context=usecase.name,
-                    type="pre",
-                    expression=precondition,
-                    description=f"用例 '{usecase.name}' 的前置条件"
-                ))
-        
-        if usecase.postconditions:
-            for i, postcondition in enumerate(usecase.postconditions):
-                constraints.append(OCLConstraint(
-                    name=f"{usecase.name}_Postcondition_{i+1}",
-                    context=usecase.name,
-                    type="post",
-                    expression=postcondition,
-                    description=f"用例 '{usecase.name}' 的后置条件"
-                ))
-    
-    # 为类生成不变量约束
-    for cls in class_diagram.classes:
-        # 检查属性多重性约束
-        for attr in cls.attributes:
-            if attr.multiplicity != "1":
-                constraints.append(OCLConstraint(
-                    name=f"{cls.name}_{attr.name}_Multiplicity",
-                    context=cls.name,
-                    type="inv",
-                    expression=f"self.{attr.name}.size() >= 0",
-                    description=f"类 '{cls.name}' 属性 '{attr.name}' 的多重性约束"
-                ))
-    
-    return constraints
-
-def export_to_plantuml(domain_model: DomainModel) -> str:
-    """
-    将领域模型导出为PlantUML格式
-    
-    Args:
-        domain_model: 领域模型对象
-    
-    Returns:
-        PlantUML代码
-    """
-    plantuml_code = []
-    
-    # 用例图
-    plantuml_code.append("@startuml")
-    plantuml_code.append("title " + domain_model.usecase_diagram.name)
-    
-    # 添加参与者
-    for actor in domain_model.usecase_diagram.actors:
-        plantuml_code.append(f"actor \"{actor.name}\" as {actor.name.replace(' ', '_')}")
-    
-    # 添加用例
-    for usecase in domain_model.usecase_diagram.usecases:
-        plantuml_code.append(f"usecase \"{usecase.name}\" as {usecase.name.replace(' ', '_')}")
-    
-    # 添加关系
-    for usecase in domain_model.usecase_diagram.usecases:
-        plantuml_code.append(f"{usecase.actor.replace(' ', '_')} --> {usecase.name.replace(' ', '_')}")
-        
-        for included in usecase.includes:
-            plantuml_code.append(f"{usecase.name.replace(' ', '_')} ..> {included.replace(' ', '_')} : <<include>>")
-        
-        for extended in usecase.extends:
-            plantuml_code.append(f"{usecase.name.replace(' ', '_')} ..> {extended.replace(' ', '_')} : <<extend>>")
-    
-    plantuml_code.append("@enduml")
-    
-    return "\n".join(plantuml_code)
-
-def analyze_domain_complexity(domain_model: DomainModel) -> Dict[str, Any]:
-    """
-    分析领域模型的复杂度
-    
-    Args:
-        domain_model: 领域模型对象
-    
-    Returns:
-        复杂度分析结果
-    """
-    usecase_count = len(domain_model.usecase_diagram.usecases)
-    actor_count = len(domain_model.usecase_diagram.actors)
-    class_count = len(domain_model.class_diagram.classes)
-    relationship_count = len(domain_model.class_diagram.relationships)
-    constraint_count = len(domain_model.ocl_constraints)
-    
-    # 计算复杂度指标
-    complexity_score = (usecase_count * 0.3 + 
-                       actor_count * 0.2 + 
-                       class_count * 0.3 + 
-                       relationship_count * 0.1 + 
-                       constraint_count * 0.1)
-    
-    complexity_level = "简单"
-    if complexity_score > 10:
-        complexity_level = "复杂"
-    elif complexity_score > 5:
-        complexity_level = "中等"
-    
-    return {
-        "complexity_score": round(complexity_score, 2),
-        "complexity_level": complexity_level,
-        "metrics": {
-            "usecase_count": usecase_count,
-            "actor_count": actor_count,
-            "class_count": class_count,
-            "relationship_count": relationship_count,
-            "constraint_count": constraint_count
-        },
-        "recommendations": [
-            "建议将复杂用例拆分为更小的用例",
-            "考虑使用泛化关系简化类图",
-            "确保OCL约束的可读性和可维护性"
-        ] if complexity_score > 10 else [
-            "模型结构清晰，复杂度适中",
-            "可以适当增加细节描述"
-        ]
-    } 
\ No newline at end of file
+from typing import List, Dict, Any, Optional
+from dsl_models import (
+    DomainModel, UseCaseDiagram, SystemSequenceDiagram, 
+    ConceptualClassDiagram, OCLConstraint, UseCase, Actor,
+    Class, Relationship, Message
+)
+from model_index import UseCaseIndex
+from model_graph import analyze_model_graph
+from plantuml_export import export_plantuml, write_usecase_diagram
+from artifacts import ArtifactWriter, write_if_changed
+from archive import ModelArchive, archive_run
+from config import config
+from event_log import get_logger, raw_outputs
+from model_store import ModelStore
+from model_jsonl import ModelJsonlWriter, load_model_jsonl
+from serialization import write_json
+import io
+import json
+import os
+import uuid
+from datetime import datetime
+
+logger = get_logger(__name__)
+
+def save_domain_model(model: DomainModel, filename: str = None, artifacts: Optional[ArtifactWriter] = None,
+                      output_dir: Optional[str] = None) -> str:
+    """
+    保存领域模型到JSON文件
+    
+    由pydantic-core按元素流式序列化（不构建中间字典）；
+    内容与已有文件相同时不重写（文件修改时间保持不变），否则先写临时文件再原子替换；
+    文件名以 .jsonl 结尾时写成每行一个元素的流式JSONL格式（见 model_jsonl）
+    
+    Args:
+        model: 领域模型对象
+        filename: 文件名，如果不提供则自动生成（带微秒时间戳和随机后缀，并发运行不会互相覆盖）
+        artifacts: 增量写入会话，提供时写入其根目录并记录到清单中
+        output_dir: 输出目录，默认为增量写入会话的根目录或output目录
+    
+    Returns:
+        保存的文件路径
+    """
+    if filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filename = f"domain_model_{timestamp}_{uuid.uuid4().hex[:8]}.json"
+    
+    if output_dir is None:
+        output_dir = artifacts.root if artifacts else "output"
+    filepath = os.path.join(output_dir, filename)
+    
+    if filename.endswith(".jsonl"):
+        def write(f):
+            ModelJsonlWriter(f).write_model(model)
+    else:
+        def write(f):
+            write_json(model, f)
+    
+    # 转换为JSON并保存
+    if artifacts is not None:
+        changed = artifacts.write(filepath, write)
+    else:
+        _, changed = write_if_changed(filepath, write)
+    
+    if not changed:
+        return f"领域模型未变化，保留: {filepath}"
+    return f"领域模型已保存到: {filepath}"
+
+def load_domain_model(filename: str, output_dir: str = "output") -> DomainModel:
+    """
+    从JSON文件加载领域模型（.jsonl 文件按流式JSONL格式读取；只需要其中某个图时可直接使用 ModelJsonlReader）
+    
+    Args:
+        filename: 文件名
+        output_dir: 文件所在目录
+    
+    Returns:
+        领域模型对象
+    """
+    filepath = os.path.join(output_dir, filename)
+    
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"文件不存在: {filepath}")
+    
+    if filename.endswith(".jsonl"):
+        return load_model_jsonl(filepath)
+    
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    return DomainModel(**data)
+
+def validate_use_case_diagram(usecase_diagram: UseCaseDiagram) -> Dict[str, Any]:
+    """
+    验证用例图的完整性和一致性
+    
+    Args:
+        usecase_diagram: 用例图对象
+    
+    Returns:
+        验证结果
+    """
+    errors = []
+    warnings = []
+    index = UseCaseIndex(usecase_diagram)
+    usecase_names, actor_names = index.usecase_names, index.actor_names
+    
+    # 检查用例名称唯一性
+    if index.has_duplicate_usecases:
+        errors.append("存在重复的用例名称")
+    
+    # 检查参与者名称唯一性
+    if index.has_duplicate_actors:
+        errors.append("存在重复的参与者名称")
+    
+    # 检查用例中的参与者是否存在
+    for usecase in usecase_diagram.usecases:
+        if usecase.actor not in actor_names:
+            errors.append(f"用例 '{usecase.name}' 的参与者 '{usecase.actor}' 不存在")
+    
+    # 检查包含和扩展的用例是否存在
+    for usecase in usecase_diagram.usecases:
+        for included in usecase.includes:
+            if included not in usecase_names:
+                errors.append(f"用例 '{usecase.name}' 包含的用例 '{included}' 不存在")
+        
+        for extended in usecase.extends:
+            if extended not in usecase_names:
+                errors.append(f"用例 '{usecase.name}' 扩展的用例 '{extended}' 不存在")
+    
+    # 检查是否有孤立用例（没有参与者）
+    for usecase in usecase_diagram.usecases:
+        if not usecase.actor:
+            warnings.append(f"用例 '{usecase.name}' 没有指定参与者")
+    
+    return {
+        "is_valid": len(errors) == 0,
+        "errors": errors,
+        "warnings": warnings,
+        "usecase_count": index.usecase_count,
+        "actor_count": index.actor_count
+    }
+
+def generate_sequence_diagram_from_usecase(usecase: UseCase, system_name: str) -> SystemSequenceDiagram:
+    """
+    根据用例自动生成系统顺序图
+    
+    Args:
+        usecase: 用例对象
+        system_name: 系统名称
+    
+    Returns:
+        系统顺序图对象
+    """
+    # 创建基本的顺序图
+    sequence_diagram = SystemSequenceDiagram(
+        name=f"{usecase.name}_Sequence",
+        description=f"用例 '{usecase.name}' 的系统顺序图",
+        actors=[usecase.actor],
+        systems=[system_name],
+        messages=[]
+    )
+    
+    # 添加基本的交互消息
+    sequence_diagram.messages.append(Message(
+        name=f"执行{usecase.name}",
+        sender=usecase.actor,
+        receiver=system_name,
+        message_type="synchronous",
+        parameters=[],
+        return_value="结果"
+    ))
+    
+    return sequence_diagram
+
+def extract_classes_from_usecases(usecase_diagram: UseCaseDiagram) -> List[Class]:
+    """
+    从用例图中提取潜在的概念类
+    
+    Args:
+        usecase_diagram: 用例图对象
+    
+    Returns:
+        概念类列表
+    """
+    classes = []
+    
+    # 为每个参与者创建类
+    for actor in usecase_diagram.actors:
+        classes.append(Class(
+            name=actor.name,
+            description=f"参与者: {actor.description or actor.name}",
+            attributes=[],
+            methods=[],
+            stereotypes=["actor"]
+        ))
+    
+    # 为每个用例创建类
+    for usecase in usecase_diagram.usecases:
+        classes.append(Class(
+            name=usecase.name,
+            description=f"用例: {usecase.description or usecase.name}",
+            attributes=[],
+            methods=[],
+            stereotypes=["usecase"]
+        ))
+    
+    return classes
+
+def generate_ocl_constraints(usecase_diagram: UseCaseDiagram, class_diagram: ConceptualClassDiagram) -> List[OCLConstraint]:
+    """
+    根据用例图和类图生成OCL约束
+    
+    Args:
+        usecase_diagram: 用例图对象
+        class_diagram: 类图对象
+    
+    Returns:
+        OCL约束列表
+    """
+    constraints = []
+    
+    # 为每个用例生成前置条件约束
+    for usecase in usecase_diagram.usecases:
+        if usecase.preconditions:
+            for i, precondition in enumerate(usecase.preconditions):
+                constraints.append(OCLConstraint(
+                    name=f"{usecase.name}_Precondition_{i+1}",
+                    context=usecase.name,
+                    type="pre",
+                    expression=precondition,
+                    description=f"用例 '{usecase.name}' 的前置条件"
+                ))
+        
+        if usecase.postconditions:
+            for i, postcondition in enumerate(usecase.postconditions):
+                constraints.append(OCLConstraint(
+                    name=f"{usecase.name}_Postcondition_{i+1}",
+                    context=usecase.name,
+                    type="post",
+                    expression=postcondition,
+                    description=f"用例 '{usecase.name}' 的后置条件"
+                ))
+    
+    # 为类生成不变量约束
+    for cls in class_diagram.classes:
+        # 检查属性多重性约束
+        for attr in cls.attributes:
+            if attr.multiplicity != "1":
+                constraints.append(OCLConstraint(
+                    name=f"{cls.name}_{attr.name}_Multiplicity",
+                    context=cls.name,
+                    type="inv",
+                    expression=f"self.{attr.name}.size() >= 0",
+                    description=f"类 '{cls.name}' 属性 '{attr.name}' 的多重性约束"
+                ))
+    
+    return constraints
+
+def export_to_plantuml(domain_model: DomainModel) -> str:
+    """
+    将领域模型导出为PlantUML格式
+    
+    Args:
+        domain_model: 领域模型对象
+    
+    Returns:
+        PlantUML代码（只包含用例图；类图和顺序图见 plantuml_export.export_plantuml）
+    """
+    buffer = io.StringIO()
+    write_usecase_diagram(domain_model.usecase_diagram, buffer, UseCaseIndex(domain_model.usecase_diagram).aliases)
+    return buffer.getvalue()
+
+def analyze_domain_complexity(domain_model: DomainModel) -> Dict[str, Any]:
+    """
+    分析领域模型的复杂度
+    
+    除规模外，评分基于用例关系图和类关系图的结构：类图的圈复杂度、泛化链深度、
+    包含/扩展和组合/聚合关系中的环、关系过多的上帝类以及参与者不可达的用例
+    
+    Args:
+        domain_model: 领域模型对象
+    
+    Returns:
+        复杂度分析结果
+    """
+    usecase_count = len(domain_model.usecase_diagram.usecases)
+    actor_count = len(domain_model.usecase_diagram.actors)
+    class_count = len(domain_model.class_diagram.classes)
+    relationship_count = len(domain_model.class_diagram.relationships)
+    constraint_count = len(domain_model.ocl_constraints)
+    structure = analyze_model_graph(domain_model)
+    cycle_count = len(structure["include_cycles"]) + len(structure["containment_cycles"])
+    
+    # 计算复杂度指标：规模 + 结构
+    complexity_score = (usecase_count * 0.2 + 
+                       actor_count * 0.1 + 
+                       class_count * 0.2 + 
+                       constraint_count * 0.05 +
+                       structure["cyclomatic_complexity"] * 0.5 +
+                       structure["generalization_depth"] * 1.0 +
+                       cycle_count * 2.0 +
+                       len(structure["god_classes"]) * 1.5 +
+                       len(structure["unreachable_usecases"]) * 0.5)
+    
+    complexity_level = "简单"
+    if complexity_score > 10:
+        complexity_level = "复杂"
+    elif complexity_score > 5:
+        complexity_level = "中等"
+    
+    recommendations = []
+    if structure["include_cycles"]:
+        recommendations.append("消除用例包含/扩展关系中的环: " + "; ".join(" / ".join(c) for c in structure["include_cycles"]))
+    if structure["containment_cycles"]:
+        recommendations.append("组合/聚合关系不应成环: " + "; ".join(" / ".join(c) for c in structure["containment_cycles"]))
+    if structure["god_classes"]:
+        recommendations.append("拆分关系过多的类: " + ", ".join(name for name, _ in structure["god_classes"]))
+    if structure["generalization_depth"] > 3:
+        recommendations.append("泛化层次过深，考虑用组合代替继承: " + " -> ".join(structure["deepest_generalization_chain"]))
+    if structure["unreachable_usecases"]:
+        recommendations.append("为以下用例指定参与者或调用关系: " + ", ".join(structure["unreachable_usecases"]))
+    if not recommendations:
+        recommendations = [
+            "建议将复杂用例拆分为更小的用例",
+            "考虑使用泛化关系简化类图",
+            "确保OCL约束的可读性和可维护性"
+        ] if complexity_score > 10 else [
+            "模型结构清晰，复杂度适中",
+            "可以适当增加细节描述"
+        ]
+    
+    return {
+        "complexity_score": round(complexity_score, 2),
+        "complexity_level": complexity_level,
+        "metrics": {
+            "usecase_count": usecase_count,
+            "actor_count": actor_count,
+            "class_count": class_count,
+            "relationship_count": relationship_count,
+            "constraint_count": constraint_count,
+            "cyclomatic_complexity": structure["cyclomatic_complexity"],
+            "average_class_degree": structure["average_class_degree"],
+            "generalization_depth": structure["generalization_depth"],
+            "include_cycle_count": len(structure["include_cycles"]),
+            "containment_cycle_count": len(structure["containment_cycles"]),
+            "god_class_count": len(structure["god_classes"]),
+            "unreachable_usecase_count": len(structure["unreachable_usecases"])
+        },
+        "structure": structure,
+        "recommendations": recommendations
+    }
+
+def save_workflow_results(workflow, final_model: DomainModel, prefix: str, output_dir: str = "output") -> Dict[str, Any]:
+    """
+    保存一次工作流运行的结果：模型JSON、模型仓库、审计归档、复杂度分析、PlantUML图、产物清单和追踪数据
+
+    只重写内容有变化的产物，清单 <output_dir>/<prefix>_manifest.json 记录本次变化的文件
+
+    Args:
+        workflow: 完成运行的MultiAgentWorkflow（提供run_id和追踪数据）
+        final_model: 最终领域模型
+        prefix: 输出文件名前缀
+        output_dir: 输出目录
+
+    Returns:
+        产物变化汇总 {"changed", "unchanged", "removed"}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    artifacts = ArtifactWriter(output_dir, prefix)
+    save_result = save_domain_model(final_model, f"{prefix}_model.json", artifacts=artifacts)
+    logger.info("model.saved", save_result)
+    if config.model_store_enabled:
+        store = ModelStore()
+        try:
+            model_id = store.save(final_model, run_id=workflow.run_id)
+        finally:
+            store.close()
+        logger.info("model.stored", "领域模型已写入模型仓库", store=store.path, model_id=model_id)
+    if config.archive_enabled:
+        # 审计归档：模型和Agent原始输出按内容哈希去重压缩保存
+        with ModelArchive() as archive:
+            archived = archive_run(archive, workflow.run_id, final_model, raw_outputs.recent())
+        logger.info("model.archived", "模型和原始输出已归档", root=archive.root, **archived)
+    
+    # 分析复杂度
+    complexity = analyze_domain_complexity(final_model)
+    logger.info("model.complexity", "模型复杂度分析",
+                score=complexity['complexity_score'],
+                level=complexity['complexity_level'],
+                **complexity['metrics'])
+    
+    # 导出PlantUML（用例图、类图和全部顺序图）
+    diagrams = export_plantuml(final_model, output_dir, prefix, artifacts=artifacts)
+    logger.info("plantuml.exported", "PlantUML图已导出", usecase=diagrams["usecase"],
+                class_diagram=diagrams["class"], sequence_count=len(diagrams["sequence"]))
+    summary = artifacts.finish()
+    logger.info("artifacts.written", "输出产物已更新", manifest=artifacts.manifest_path,
+                changed=len(summary["changed"]), unchanged=len(summary["unchanged"]), removed=len(summary["removed"]))
+    
+    # 导出追踪数据
+    trace_files = workflow.export_trace()
+    if trace_files:
+        logger.info("trace.exported", "追踪数据已导出", **trace_files)
+    return summary
@@ -0,0 +1,283 @@
+"""
+轻量级追踪模块
+为工作流运行、阶段、Agent调用、JSON提取/修正和Pydantic校验记录嵌套的span，
+并支持导出为Chrome trace-event JSON和OTLP JSON文件格式
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# perf_counter单调递增，加上偏移量换算为Unix纳秒时间戳
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+def _now_ns() -> int:
+    return time.perf_counter_ns() + _EPOCH_OFFSET_NS
+
+
+@dataclass
+class Span:
+    """追踪span"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    thread_id: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else _now_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add(self, key: str, value: int) -> None:
+        """累加数值属性（如字节数、token数、缓存命中数）"""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+
+class _NoopSpan:
+    """追踪关闭时返回的空span，保持调用方代码一致"""
+    name = ""
+    trace_id = None
+    span_id = None
+    attributes: Dict[str, Any] = {}
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, key: str, value: int) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def usage_to_attributes(usage: Any) -> Dict[str, int]:
+    """
+    将completion的usage对象转换为span属性
+
+    Args:
+        usage: OpenAI返回的usage对象（可能为None）
+
+    Returns:
+        包含prompt/completion/cached token数的字典
+    """
+    if usage is None:
+        return {}
+    attributes = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+        "total_tokens": getattr(usage, "total_tokens", None) or 0,
+    }
+    details = getattr(usage, "prompt_tokens_details", None)
+    attributes["cached_tokens"] = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    return attributes
+
+
+class Tracer:
+    """span收集器，线程安全，span按contextvars自动嵌套"""
+
+    def __init__(self, enabled: bool = True, max_spans: int = 100_000):
+        self.enabled = enabled
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        打开一个span，自动挂到当前span之下
+
+        Args:
+            name: span名称，如 "agent.call"、"json.extract"
+            **attributes: 初始属性
+
+        Yields:
+            Span对象，可在块内继续设置属性
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_ns=_now_ns(),
+            thread_id=threading.get_ident(),
+        )
+        span.set_attributes(**attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = _now_ns()
+            _current_span.reset(token)
+            with self._lock:
+                self._spans.append(span)
+
+    def current_span(self) -> Optional[Span]:
+        """返回当前上下文中的活动span"""
+        return _current_span.get()
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        """返回已结束的span，按开始时间排序"""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return sorted(spans, key=lambda s: s.start_ns)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self, trace_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        按span名称汇总调用次数和耗时
+
+        Returns:
+            {span名称: {"count", "total_ms", "max_ms"}}
+        """
+        result: Dict[str, Dict[str, float]] = {}
+        for span in self.spans(trace_id):
+            entry = result.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += span.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], span.duration_ms)
+        return result
+
+    def export_chrome_trace(self, path: str, trace_id: Optional[str] = None) -> str:
+        """
+        导出为Chrome trace-event JSON，可在 chrome://tracing 或 Perfetto 中查看火焰时间线
+
+        Args:
+            path: 输出文件路径
+            trace_id: 只导出指定trace，默认导出全部
+
+        Returns:
+            输出文件路径
+        """
+        pid = os.getpid()
+        thread_numbers: Dict[int, int] = {}
+        events = []
+        for span in self.spans(trace_id):
+            tid = thread_numbers.setdefault(span.thread_id, len(thread_numbers) + 1)
+            args = dict(span.attributes)
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        _write_json(path, {"traceEvents": events, "displayTimeUnit": "ms"})
+        return path
+
+    def export_otlp_json(self, path: str, trace_id: Optional[str] = None,
+                         service_name: str = "multiagent-workflow") -> str:
+        """
+        导出为OTLP JSON文件格式（与OpenTelemetry Collector文件导出器兼容的单行ExportTraceServiceRequest）
+
+        Args:
+            path: 输出文件路径
+            trace_id: 只导出指定trace，默认导出全部
+            service_name: resource中的service.name
+
+        Returns:
+            输出文件路径
+        """
+        otlp_spans = []
+        for span in self.spans(trace_id):
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.status == "error" else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "multiagent_workflow.tracing"},
+                    "spans": otlp_spans,
+                }],
+            }]
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(request, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+        return path
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    return {"key": key, "value": _otlp_value(value)}
+
+
+def _write_json(path: str, data: Any) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+# 全局追踪器实例
+tracer = Tracer()
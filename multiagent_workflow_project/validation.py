@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量校验模块
+逐个调用 model_validate 时每个元素都要往返一次Python与pydantic-core。这里为列表类型（如 List[OCLConstraint]）
+缓存TypeAdapter，整批数据一次交给Rust校验器，一次收集所有元素的全部错误；只有出错时才对有效元素再校验一次
+"""
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from tracing import tracer
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """类型对应的TypeAdapter（构建校验器的开销只付一次）"""
+    return TypeAdapter(tp)
+
+
+def list_adapter(model_class: Type[M]) -> TypeAdapter:
+    return adapter(List[model_class])
+
+
+@dataclass
+class ItemError:
+    """批量校验中一个元素的错误"""
+    index: int
+    data: Any
+    message: str
+
+
+@dataclass
+class BatchResult(Generic[M]):
+    """批量校验结果：items与输入一一对应，无效元素以None占位"""
+    items: List[Optional[M]] = field(default_factory=list)
+    errors: List[ItemError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def valid(self) -> List[M]:
+        return [item for item in self.items if item is not None]
+
+    @property
+    def objects_per_second(self) -> float:
+        return len(self.items) / self.seconds if self.seconds > 0 else 0.0
+
+
+def format_error(error: Dict[str, Any]) -> str:
+    """pydantic错误记录（去掉元素下标后）的可读描述"""
+    location = ".".join(str(part) for part in error["loc"][1:])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def validate_batch(model_class: Type[M], items: List[Any]) -> BatchResult[M]:
+    """
+    批量校验一组原始数据
+
+    Args:
+        model_class: 元素的模型类
+        items: 原始数据列表（通常是 json.loads 的结果）
+
+    Returns:
+        BatchResult，errors按元素下标收集每个无效元素的全部错误
+    """
+    items = list(items)
+    start = time.perf_counter()
+    with tracer.span("pydantic.validate_batch", model=model_class.__name__, count=len(items)) as span:
+        result: BatchResult[M] = BatchResult()
+        try:
+            result.items = list_adapter(model_class).validate_python(items)
+        except ValidationError as e:
+            messages: Dict[int, List[str]] = {}
+            for error in e.errors(include_url=False):
+                messages.setdefault(error["loc"][0], []).append(format_error(error))
+            valid = [i for i in range(len(items)) if i not in messages]
+            validated = iter(list_adapter(model_class).validate_python([items[i] for i in valid]))
+            result.items = [None if i in messages else next(validated) for i in range(len(items))]
+            result.errors = [ItemError(i, items[i], "; ".join(messages[i])) for i in sorted(messages)]
+        result.seconds = time.perf_counter() - start
+        span.set_attributes(errors=len(result.errors), objects_per_second=round(result.objects_per_second))
+    return result
+
+
+def validate_list(model_class: Type[M], items: Any) -> List[M]:
+    """整体校验一个列表，任一元素无效时抛出包含全部错误的ValidationError"""
+    return list_adapter(model_class).validate_python(items)
+
+
+def validate_json_list(model_class: Type[M], text: Union[str, bytes]) -> List[M]:
+    """直接从JSON文本校验列表（不经过 json.loads 生成中间对象）"""
+    return list_adapter(model_class).validate_json(text)
@@ -1,334 +1,1213 @@
-import os
-from typing import List, Dict, Any
-from openai import OpenAI
-from dsl_models import DomainModel, UseCaseDiagram, SystemSequenceDiagram, ConceptualClassDiagram, OCLConstraint
-from my_agents import requirements_analyst, usecase_modeler, class_diagram_designer, sequence_diagram_designer, ocl_expert, validation_expert, coordinator
-from config import config
-import json
-import re
-
-# 设置代理
-os.environ["HTTP_PROXY"] = f"http://{config.proxy_host}:{config.proxy_port}"
-os.environ["HTTPS_PROXY"] = f"http://{config.proxy_host}:{config.proxy_port}"
-
-client = OpenAI(base_url=config.base_url, api_key=config.api_key)
-
-def run_agent(agent, user_input, max_tokens=2048):
-    messages = [
-        {"role": "system", "content": agent.instructions},
-        {"role": "user", "content": user_input}
-    ]
-    completion = client.chat.completions.create(
-        model=agent.model,
-        messages=messages,
-        max_tokens=max_tokens
-    )
-    return completion.choices[0].message.content
-
-class MultiAgentWorkflow:
-    """MultiAgent工作流管理器（同步串行，基于新版openai SDK）"""
-    def __init__(self):
-        self.current_model = None
-        self.iteration_count = 0
-        self.max_iterations = 3
-
-    def extract_json(self, text):
-        """从文本中提取第一个合法JSON块，增强健壮性"""
-        if not text or text.strip() == "":
-            raise ValueError("Agent返回了空字符串")
-        
-        print(f"🔍 正在提取JSON，原始文本长度: {len(text)}")
-        print(f"📝 原始文本前200字符: {text[:200]}...")
-        
-        # 尝试多种JSON提取模式
-        patterns = [
-            r'```json\s*(\{[\s\S]*?\})\s*```',  # ```json {content} ```
-            r'```\s*(\{[\s\S]*?\})\s*```',      # ``` {content} ```
-            r'\{[\s\S]*?\}',                    # 直接匹配JSON对象
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                json_str = match.group(1) if len(match.groups()) > 0 else match.group(0)
-                try:
-                    # 验证JSON格式
-                    json.loads(json_str)
-                    print(f"✅ JSON提取成功，长度: {len(json_str)}")
-                    return json_str
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ JSON格式验证失败: {e}")
-                    continue
-        
-        # 如果所有模式都失败，尝试直接解析整个文本
-        try:
-            json.loads(text.strip())
-            print("✅ 直接解析成功")
-            return text.strip()
-        except json.JSONDecodeError:
-            pass
-        
-        raise ValueError(f"无法从文本中提取有效JSON。文本内容: {text[:500]}...")
-
-    def fix_usecase_diagram_json(self, data: dict) -> dict:
-        """修正用例图JSON结构，确保符合DSL模型要求"""
-        print(f"🔧 开始修正用例图JSON，原始数据键: {list(data.keys())}")
-        
-        # 确保顶层字段存在
-        if 'name' not in data:
-            data['name'] = "系统用例图"
-        if 'description' not in data:
-            data['description'] = "系统的主要用例和参与者"
-        
-        # 处理参与者字段 - DSL模型使用actors
-        if 'participants' in data:
-            data['actors'] = data.pop('participants')
-        elif 'actors' not in data:
-            data['actors'] = []
-        
-        # 处理用例字段
-        usecases_key = None
-        for key in ['useCases', 'usecases', 'use_cases']:
-            if key in data:
-                usecases_key = key
-                break
-        
-        if usecases_key:
-            data['usecases'] = data.pop(usecases_key)
-        elif 'usecases' not in data:
-            data['usecases'] = []
-        
-        # 修正每个用例的结构
-        for i, uc in enumerate(data.get('usecases', [])):
-            if not isinstance(uc, dict):
-                print(f"⚠️ 用例 {i} 不是字典格式，跳过")
-                continue
-                
-            # 确保用例有name字段
-            if 'name' not in uc:
-                uc['name'] = f"用例{i+1}"
-            
-            # 处理参与者字段 - DSL模型使用actor（单数）
-            if 'participants' in uc:
-                if isinstance(uc['participants'], list):
-                    uc['actor'] = uc['participants'][0] if uc['participants'] else ""
-                else:
-                    uc['actor'] = uc['participants']
-                del uc['participants']
-            elif 'actors' in uc:
-                if isinstance(uc['actors'], list):
-                    uc['actor'] = uc['actors'][0] if uc['actors'] else ""
-                else:
-                    uc['actor'] = uc['actors']
-                del uc['actors']
-            elif 'actor' not in uc:
-                uc['actor'] = ""
-            
-            # 处理include字段
-            if 'include' in uc:
-                uc['includes'] = uc.pop('include')
-            elif 'includes' not in uc:
-                uc['includes'] = []
-            
-            # 处理extend字段
-            if 'extend' in uc:
-                uc['extends'] = uc.pop('extend')
-            elif 'extends' not in uc:
-                uc['extends'] = []
-        
-        print(f"✅ 用例图JSON修正完成，最终键: {list(data.keys())}")
-        return data
-
-    def safe_json_parse(self, json_str: str, model_class, fix_func=None):
-        """安全解析JSON并验证模型"""
-        try:
-            # 提取JSON
-            extracted_json = self.extract_json(json_str)
-            # 解析JSON
-            raw_data = json.loads(extracted_json)
-            # 应用修正函数
-            if fix_func:
-                raw_data = fix_func(raw_data)
-            # 验证模型
-            return model_class.model_validate(raw_data)
-        except Exception as e:
-            print(f"❌ JSON解析失败: {e}")
-            print(f"📝 原始JSON字符串: {json_str[:500]}...")
-            raise
-
-    def run_workflow(self, user_requirements: str) -> DomainModel:
-        print("🚀 开始MultiAgent领域建模工作流...")
-        
-        # 步骤1: 需求分析
-        print("\n📋 步骤1: 需求分析")
-        analysis_result = run_agent(requirements_analyst, f"请分析以下需求并提取关键信息：\n\n{user_requirements}")
-        
-        # 步骤2: 用例建模
-        print("\n🎯 步骤2: 用例建模")
-        usecase_diagram_json = run_agent(usecase_modeler, f"基于以下需求分析结果，创建详细的用例图：\n\n{analysis_result}")
-        print("用例建模Agent原始输出：", usecase_diagram_json)
-        
-        try:
-            usecase_diagram = self.safe_json_parse(usecase_diagram_json, UseCaseDiagram, self.fix_usecase_diagram_json)
-            print("✅ 用例图解析成功")
-        except Exception as e:
-            print(f"❌ 用例图解析失败: {e}")
-            raise
-        
-        # 步骤3: 类图设计
-        print("\n🏗️ 步骤3: 类图设计")
-        class_diagram_json = run_agent(class_diagram_designer, f"基于以下用例图，创建概念类图：\n\n{usecase_diagram.model_dump_json(indent=2)}")
-        print("类图设计Agent原始输出：", class_diagram_json)
-        
-        try:
-            class_diagram = self.safe_json_parse(class_diagram_json, ConceptualClassDiagram)
-            print("✅ 类图解析成功")
-        except Exception as e:
-            print(f"❌ 类图解析失败: {e}")
-            raise
-        
-        # 步骤4: 顺序图设计
-        print("\n📊 步骤4: 顺序图设计")
-        sequence_diagrams = []
-        for usecase in usecase_diagram.usecases:
-            print(f"🔍 正在为用例 '{usecase.name}' 生成顺序图...")
-            seq_json = run_agent(sequence_diagram_designer, f"为用例 '{usecase.name}' 创建系统顺序图：\n\n{usecase.model_dump_json(indent=2)}")
-            try:
-                seq_diagram = self.safe_json_parse(seq_json, SystemSequenceDiagram)
-                sequence_diagrams.append(seq_diagram)
-                print(f"✅ 用例 '{usecase.name}' 顺序图解析成功")
-            except Exception as e:
-                print(f"❌ 用例 '{usecase.name}' 顺序图解析失败: {e}")
-                continue
-        
-        print(f"📊 顺序图设计完成，共生成 {len(sequence_diagrams)} 个顺序图")
-        
-        # 步骤5: OCL约束生成
-        print("\n🔒 步骤5: OCL约束生成")
-        print("🔍 正在调用OCL专家Agent...")
-        ocl_json = run_agent(ocl_expert, f"基于以下用例图和类图，生成OCL约束：\n\n用例图：{usecase_diagram.model_dump_json(indent=2)}\n\n类图：{class_diagram.model_dump_json(indent=2)}")
-        print("🔍 OCL专家Agent返回结果，正在解析...")
-        try:
-            ocl_data = json.loads(self.extract_json(ocl_json))
-            print(f"🔍 OCL数据解析成功，数据类型: {type(ocl_data)}, 长度: {len(ocl_data)}")
-            print(f"🔍 OCL数据前200字符: {str(ocl_data)[:200]}...")
-            
-            ocl_constraints = []
-            for i, constraint_data in enumerate(ocl_data):
-                try:
-                    print(f"🔍 处理OCL约束 {i+1}: {type(constraint_data)} - {constraint_data}")
-                    if isinstance(constraint_data, dict):
-                        constraint = OCLConstraint.model_validate(constraint_data)
-                        ocl_constraints.append(constraint)
-                        print(f"✅ OCL约束 {i+1} 解析成功: {constraint.name}")
-                    else:
-                        print(f"⚠️ OCL约束 {i+1} 不是字典格式，跳过")
-                        continue
-                except Exception as e:
-                    print(f"⚠️ OCL约束 {i+1} 解析失败: {e}")
-                    continue
-            print(f"✅ OCL约束解析完成，成功解析 {len(ocl_constraints)} 个约束")
-        except Exception as e:
-            print(f"❌ OCL约束解析失败: {e}")
-            ocl_constraints = []
-        
-        print(f"🔒 OCL约束生成完成，共生成 {len(ocl_constraints)} 个约束")
-        
-        # 步骤6: 模型验证和迭代改进
-        print("\n✅ 步骤6: 模型验证和迭代改进")
-        print("🔍 正在进入验证和迭代阶段...")
-        final_model = self._run_validation_and_iteration(
-            usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints
-        )
-        print("\n🎉 工作流完成！")
-        return final_model
-
-    def _run_validation_and_iteration(self, usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints):
-        while self.iteration_count < self.max_iterations:
-            self.iteration_count += 1
-            print(f"\n🔄 迭代 {self.iteration_count}/{self.max_iterations}")
-            current_model = DomainModel(
-                name="领域模型",
-                description="通过MultiAgent工作流生成的领域模型",
-                usecase_diagram=usecase_diagram,
-                sequence_diagrams=sequence_diagrams,
-                class_diagram=class_diagram,
-                ocl_constraints=ocl_constraints
-            )
-            # 验证
-            try:
-                validation_json = run_agent(validation_expert, f"请验证以下领域模型：\n\n{current_model.model_dump_json(indent=2)}")
-                validation = json.loads(self.extract_json(validation_json))
-                score = validation.get("score", "pass")
-                feedback = validation.get("feedback", "")
-            except Exception as e:
-                print(f"⚠️ 验证步骤出现异常，使用默认评分: {e}")
-                score = "pass"
-                feedback = ""
-            
-            if score == "pass":
-                print("✅ 模型验证通过！")
-                return current_model
-            elif score == "needs_improvement":
-                print("⚠️ 模型需要改进，进行迭代...")
-                try:
-                    improved_json = run_agent(coordinator, f"请根据以下反馈改进模型：\n\n反馈：{feedback}\n\n当前模型：{current_model.model_dump_json(indent=2)}")
-                    improved = json.loads(self.extract_json(improved_json))
-                    usecase_diagram = UseCaseDiagram.model_validate(improved["usecase_diagram"])
-                    class_diagram = ConceptualClassDiagram.model_validate(improved["class_diagram"])
-                    sequence_diagrams = [SystemSequenceDiagram.model_validate(x) for x in improved["sequence_diagrams"]]
-                    ocl_constraints = [OCLConstraint.model_validate(x) for x in improved["ocl_constraints"]]
-                except Exception as e:
-                    print(f"⚠️ 迭代改进失败，使用当前模型: {e}")
-                    return current_model
-            else:
-                print("❌ 模型验证失败，返回当前模型...")
-                return current_model
-        
-        print("⚠️ 达到最大迭代次数，返回当前模型")
-        return current_model
-
-def main():
-    sample_requirements = """
-    请为在线书店系统进行领域建模。
-    
-    系统功能包括：
-    1. 用户注册和登录
-    2. 浏览和搜索图书
-    3. 添加图书到购物车
-    4. 下单和支付
-    5. 订单管理
-    6. 库存管理
-    7. 用户评价和评论
-    
-    主要参与者包括：顾客、管理员、支付系统
-    """
-    
-    try:
-        workflow = MultiAgentWorkflow()
-        final_model = workflow.run_workflow(sample_requirements)
-        
-        # 确保output目录存在
-        import os
-        os.makedirs("output", exist_ok=True)
-        
-        # 保存领域模型
-        from tools import save_domain_model, export_to_plantuml
-        save_result = save_domain_model(final_model, "final_domain_model.json")
-        print(f"\n💾 {save_result}")
-        
-        # 导出PlantUML用例图
-        plantuml_code = export_to_plantuml(final_model)
-        with open("output/usecase_diagram.puml", "w", encoding="utf-8") as f:
-            f.write(plantuml_code)
-        print("📊 PlantUML用例图已导出到 output/usecase_diagram.puml")
-        
-        print("\n🎉 多智能体自动化领域建模流程完成！")
-        
-    except Exception as e:
-        print(f"❌ 工作流执行失败: {e}")
-        import traceback
-        traceback.print_exc()
-
-if __name__ == "__main__":
+import os
+import threading
+import uuid
+from typing import List, Dict, Any, Optional
+from openai import OpenAI
+from dsl_models import (
+    DomainModel, UseCaseDiagram, SystemSequenceDiagram, ConceptualClassDiagram, OCLConstraint,
+    UseCaseDelta, ClassDiagramDelta
+)
+from my_agents import (
+    requirements_analyst, usecase_modeler, class_diagram_designer, sequence_diagram_designer, sequence_batch_designer,
+    ocl_expert, validation_expert, coordinator, usecase_delta_modeler, class_delta_designer
+)
+from config import config
+from tracing import tracer, usage_to_attributes
+from event_log import get_logger, raw_outputs, configure_logging
+from ledger import TokenLedger, TokenBudget, TokenBudgetExceeded, estimate_messages_tokens, estimate_tokens
+from prompt_serialization import to_prompt_json, compaction_report
+from prompt_builder import PromptLayout, build_agent_prompt
+from batching import AdaptiveBatcher, PRIOR_TOKENS_PER_ITEM, bisect, match_by_name
+from failure_queue import ArtifactFailure, FailureQueue
+from checkpoint import CheckpointStore, RunCheckpoint
+from memo import StageCache, prompt_version
+import incremental
+import chunking
+import sharding
+from entity_resolution import resolve_domain_model
+from model_diff import diff_models
+from validation import validate_batch, validate_list
+import terse_dsl
+import json
+import re
+
+# 设置代理
+os.environ["HTTP_PROXY"] = f"http://{config.proxy_host}:{config.proxy_port}"
+os.environ["HTTPS_PROXY"] = f"http://{config.proxy_host}:{config.proxy_port}"
+
+client = OpenAI(base_url=config.base_url, api_key=config.api_key)
+logger = get_logger(__name__)
+tracer.enabled = config.trace_enabled
+
+# 每个阶段固定的任务说明：属于Prompt的稳定前缀，也是阶段缓存键中Prompt版本的一部分
+STAGE_TASKS = {
+    "requirements_analysis": "请分析以下需求并提取关键信息：",
+    "requirements_chunk": "请分析以下需求文档片段并提取关键信息（只分析本段内容，衔接上文仅供理解）：",
+    "requirements_reduce": "请将以下多个文档片段的需求分析结果合并为一份完整的需求分析，去除重复并保留全部需求：",
+    "usecase_modeling": "基于以下需求分析结果，创建详细的用例图：",
+    "class_design": "基于以下用例图，创建概念类图：",
+    "sequence_design": "为以下用例创建系统顺序图：",
+    "sequence_batch": "为以下用例分别创建系统顺序图：",
+    "ocl_generation": "基于以下用例图和类图，生成OCL约束：",
+    "ocl_repair": "修正以下无效的OCL约束：",
+    "validation": "请验证以下领域模型：",
+    "improvement": "请根据以下反馈改进模型：",
+    "usecase_delta": "根据以下需求变更，增量更新用例图：",
+    "class_delta": "根据以下变更的用例，增量更新概念类图：",
+}
+
+def _as_prompt(agent, user_input) -> PromptLayout:
+    return user_input if isinstance(user_input, PromptLayout) else build_agent_prompt(agent, user_input)
+
+def build_messages(agent, user_input):
+    return _as_prompt(agent, user_input).messages
+
+def complete_agent(agent, user_input, max_tokens=2048):
+    """调用Agent并返回完整的completion对象（包含usage）；user_input可以是文本或PromptLayout"""
+    prompt = _as_prompt(agent, user_input)
+    with tracer.span("agent.call", agent=agent.name, model=agent.model, max_tokens=max_tokens,
+                     prefix_hash=prompt.prefix_hash, prefix_tokens=prompt.prefix_tokens) as span:
+        span.set_attribute("request_bytes", sum(len(m["content"].encode("utf-8")) for m in prompt.messages))
+        completion = client.chat.completions.create(
+            model=agent.model,
+            messages=prompt.messages,
+            max_tokens=max_tokens
+        )
+        content = completion.choices[0].message.content
+        raw_outputs.record(agent.name, content, model=agent.model, trace_id=span.trace_id)
+        span.set_attributes(**usage_to_attributes(completion.usage))
+        span.set_attribute("response_bytes", len(content.encode("utf-8")) if content else 0)
+        span.set_attribute("finish_reason", completion.choices[0].finish_reason)
+    return completion
+
+def run_agent(agent, user_input, max_tokens=2048):
+    return complete_agent(agent, user_input, max_tokens).choices[0].message.content
+
+# ledger、checkpoints、memo参数的默认值：按配置创建默认存储；显式传入None表示不使用该存储
+_DEFAULT: Any = object()
+
+class MultiAgentWorkflow:
+    """MultiAgent工作流管理器（同步串行，基于新版openai SDK）"""
+    def __init__(self, ledger: Optional[TokenLedger] = _DEFAULT, token_budget: Optional[int] = None,
+                 output_formats: Optional[Dict[str, str]] = None, sequence_batching: Optional[bool] = None,
+                 checkpoints: Optional[CheckpointStore] = _DEFAULT, memo: Optional[StageCache] = _DEFAULT):
+        self.current_model = None
+        self.iteration_count = 0
+        self.max_iterations = 3
+        self.last_trace_id = None
+        self.run_id = None
+        self.ledger = ledger if ledger is not _DEFAULT else (TokenLedger() if config.ledger_enabled else None)
+        self.token_budget = token_budget if token_budget is not None else config.token_budget
+        self.budget = TokenBudget(self.token_budget)
+        self.prompt_compaction: Dict[str, Dict[str, Any]] = {}
+        self.prompt_cache: Dict[str, Dict[str, Any]] = {}
+        self.last_usage = None
+        # 需求片段并行分析时保护预算、用量统计等共享状态
+        self._accounting_lock = threading.Lock()
+        self.failures = FailureQueue(config.artifact_max_retries)
+        self.checkpoints = checkpoints if checkpoints is not _DEFAULT else (CheckpointStore() if config.checkpoint_enabled else None)
+        self.checkpoint: Optional[RunCheckpoint] = None
+        self.resumed_stages: List[str] = []
+        self.memo = memo if memo is not _DEFAULT else (StageCache() if config.memo_enabled else None)
+        self.memo_stats: Dict[str, List[str]] = {"reused": [], "recomputed": []}
+        # 分片生成类图时各子系统的类名 {子系统键: [类名]}，供分片生成OCL时选取类图子集
+        self.shard_classes: Dict[str, List[str]] = {}
+        # 验证迭代每轮改进的模型变化 [{"iteration", "summary", "changes"}]
+        self.iteration_diffs: List[Dict[str, Any]] = []
+        self.sequence_batching = sequence_batching if sequence_batching is not None else config.sequence_batching
+        # 按配置为每个Agent选择输出格式（json或terse）；批量顺序图默认沿用单个顺序图的格式
+        output_formats = dict(output_formats if output_formats is not None else config.output_formats)
+        output_formats.setdefault("sequence_batch_designer", output_formats.get("sequence_diagram_designer", "json"))
+        self.agents = {
+            name: terse_dsl.with_output_format(agent, output_formats.get(name, "json"))
+            for name, agent in [
+                ("requirements_analyst", requirements_analyst), ("usecase_modeler", usecase_modeler),
+                ("class_diagram_designer", class_diagram_designer), ("sequence_diagram_designer", sequence_diagram_designer),
+                ("sequence_batch_designer", sequence_batch_designer),
+                ("ocl_expert", ocl_expert), ("validation_expert", validation_expert), ("coordinator", coordinator),
+                ("usecase_delta_modeler", usecase_delta_modeler), ("class_delta_designer", class_delta_designer),
+            ]
+        }
+
+    def _prompt_json(self, obj, stage: str) -> str:
+        """按阶段投影并紧凑序列化模型，同时累计相对缩进JSON的token缩减"""
+        compact = to_prompt_json(obj, stage)
+        if config.prompt_compaction_report:
+            report = compaction_report(obj, stage, compact)
+            # 分片、片段工作线程也会调用，累加与用量统计一样在锁内进行
+            with self._accounting_lock:
+                totals = self.prompt_compaction.setdefault(stage, {"baseline_tokens": 0, "compact_tokens": 0})
+                totals["baseline_tokens"] += report["baseline_tokens"]
+                totals["compact_tokens"] += report["compact_tokens"]
+                totals["reduction"] = round(1 - totals["compact_tokens"] / totals["baseline_tokens"], 4) if totals["baseline_tokens"] else 0.0
+            logger.debug("prompt.compacted", "Prompt模型紧凑序列化", **report)
+        return compact
+
+    def _run_agent(self, stage: str, agent, task: str, sections=(), max_tokens: int = 2048) -> str:
+        """
+        调用Agent并将usage记入账本；超出token预算时抛出TokenBudgetExceeded中止运行
+
+        Args:
+            stage: 阶段名称
+            agent: Agent对象
+            task: 阶段固定的任务说明（属于稳定前缀，不能包含本次调用的数据）
+            sections: 可变负载 [(标题, 内容)]，追加在消息末尾
+            max_tokens: 最大输出token数
+        """
+        prompt = build_agent_prompt(agent, task, sections)
+        estimated = estimate_messages_tokens(prompt.messages)
+        # 分片、片段并行调用时先预留预估消耗，避免多个调用同时通过预算检查
+        with self._accounting_lock:
+            self.budget.reserve(estimated)
+        try:
+            completion = complete_agent(agent, prompt, max_tokens)
+        except BaseException:
+            with self._accounting_lock:
+                self.budget.release(estimated)
+            raise
+        usage = completion.usage
+        with self._accounting_lock:
+            self.last_usage = usage
+            if self.ledger is not None:
+                self.ledger.record(self.run_id, stage, agent.name, agent.model, usage, estimated)
+            self._record_cache_usage(stage, usage)
+            self.budget.settle(estimated, getattr(usage, "total_tokens", None) or 0)
+        return completion.choices[0].message.content
+
+    def _record_cache_usage(self, stage: str, usage) -> None:
+        """按阶段累计prompt token数和上游前缀缓存命中的token数"""
+        attributes = usage_to_attributes(usage)
+        totals = self.prompt_cache.setdefault(stage, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += attributes.get("prompt_tokens", 0)
+        totals["cached_tokens"] += attributes.get("cached_tokens", 0)
+        totals["hit_rate"] = round(totals["cached_tokens"] / totals["prompt_tokens"], 4) if totals["prompt_tokens"] else 0.0
+        logger.debug("agent.usage", "Agent调用token用量", stage=stage, **attributes)
+
+    def extract_json(self, text):
+        """从文本中提取第一个合法JSON块，增强健壮性"""
+        with tracer.span("json.extract", input_bytes=len(text.encode("utf-8")) if text else 0) as span:
+            json_str = self._extract_json(text)
+            span.set_attribute("output_bytes", len(json_str.encode("utf-8")))
+            return json_str
+
+    def _extract_json(self, text):
+        if not text or text.strip() == "":
+            raise ValueError("Agent返回了空字符串")
+        
+        logger.debug("json.extract.start", "正在提取JSON", length=len(text))
+        
+        # 依次尝试：整段文本、```json```代码块内容
+        candidates = [text.strip()]
+        candidates += [m.group(1).strip() for m in re.finditer(r'```(?:json)?\s*([\s\S]*?)```', text, re.IGNORECASE)]
+        for candidate in candidates:
+            try:
+                json.loads(candidate)
+                logger.debug("json.extract.ok", "JSON提取成功", length=len(candidate))
+                return candidate
+            except json.JSONDecodeError:
+                continue
+        
+        # 从每个 { 或 [ 开始用raw_decode解析出第一个完整的JSON值（支持嵌套对象和顶层数组）
+        decoder = json.JSONDecoder()
+        for attempt, match in enumerate(re.finditer(r'[\[{]', text)):
+            if attempt >= 50:
+                break
+            try:
+                _, end = decoder.raw_decode(text, match.start())
+            except json.JSONDecodeError as e:
+                logger.debug("json.extract.rejected", "JSON格式验证失败", error=str(e))
+                continue
+            json_str = text[match.start():end]
+            logger.debug("json.extract.ok", "JSON提取成功", length=len(json_str))
+            return json_str
+        
+        raise ValueError(f"无法从文本中提取有效JSON。文本内容: {text[:500]}...")
+
+    def fix_usecase_diagram_json(self, data: dict) -> dict:
+        """修正用例图JSON结构，确保符合DSL模型要求"""
+        with tracer.span("json.repair", target="UseCaseDiagram"):
+            return self._fix_usecase_diagram_json(data)
+
+    def _fix_usecase_diagram_json(self, data: dict) -> dict:
+        logger.debug("json.repair.start", "开始修正用例图JSON", keys=list(data.keys()))
+        
+        # 确保顶层字段存在
+        if 'name' not in data:
+            data['name'] = "系统用例图"
+        if 'description' not in data:
+            data['description'] = "系统的主要用例和参与者"
+        
+        # 处理参与者字段 - DSL模型使用actors
+        if 'participants' in data:
+            data['actors'] = data.pop('participants')
+        elif 'actors' not in data:
+            data['actors'] = []
+        
+        # 处理用例字段
+        usecases_key = None
+        for key in ['useCases', 'usecases', 'use_cases']:
+            if key in data:
+                usecases_key = key
+                break
+        
+        if usecases_key:
+            data['usecases'] = data.pop(usecases_key)
+        elif 'usecases' not in data:
+            data['usecases'] = []
+        
+        # 修正每个用例的结构
+        for i, uc in enumerate(data.get('usecases', [])):
+            if not isinstance(uc, dict):
+                logger.warning("json.repair.skipped", "用例不是字典格式，跳过", index=i)
+                continue
+                
+            # 确保用例有name字段
+            if 'name' not in uc:
+                uc['name'] = f"用例{i+1}"
+            
+            # 处理参与者字段 - DSL模型使用actor（单数）
+            if 'participants' in uc:
+                if isinstance(uc['participants'], list):
+                    uc['actor'] = uc['participants'][0] if uc['participants'] else ""
+                else:
+                    uc['actor'] = uc['participants']
+                del uc['participants']
+            elif 'actors' in uc:
+                if isinstance(uc['actors'], list):
+                    uc['actor'] = uc['actors'][0] if uc['actors'] else ""
+                else:
+                    uc['actor'] = uc['actors']
+                del uc['actors']
+            elif 'actor' not in uc:
+                uc['actor'] = ""
+            
+            # 处理include字段
+            if 'include' in uc:
+                uc['includes'] = uc.pop('include')
+            elif 'includes' not in uc:
+                uc['includes'] = []
+            
+            # 处理extend字段
+            if 'extend' in uc:
+                uc['extends'] = uc.pop('extend')
+            elif 'extends' not in uc:
+                uc['extends'] = []
+        
+        logger.debug("json.repair.ok", "用例图JSON修正完成", keys=list(data.keys()))
+        return data
+
+    def safe_json_parse(self, json_str: str, model_class, fix_func=None):
+        """安全解析JSON并验证模型"""
+        try:
+            # 提取JSON
+            extracted_json = self.extract_json(json_str)
+            if fix_func is None:
+                # 没有修正函数时由pydantic-core直接从JSON文本校验，不再生成中间字典
+                with tracer.span("pydantic.validate", model=model_class.__name__):
+                    return model_class.model_validate_json(extracted_json)
+            # 解析JSON并应用修正函数
+            raw_data = fix_func(json.loads(extracted_json))
+            # 验证模型
+            with tracer.span("pydantic.validate", model=model_class.__name__):
+                return model_class.model_validate(raw_data)
+        except Exception as e:
+            logger.warning("json.parse_failed", "JSON解析失败", model=model_class.__name__, error=str(e))
+            raise
+
+    def parse_agent_output(self, agent, text: str, model_class, fix_func=None):
+        """按Agent的输出格式解析输出：terse格式走本地行式解析器，否则走JSON提取和校验"""
+        if agent.output_format != "terse":
+            return self.safe_json_parse(text, model_class, fix_func)
+        try:
+            with tracer.span("terse.parse", model=model_class.__name__, response_bytes=len(text.encode("utf-8"))):
+                return terse_dsl.parse_output(agent, text)
+        except Exception as e:
+            logger.warning("terse.parse_failed", "紧凑格式解析失败", model=model_class.__name__, error=str(e))
+            raise
+
+    def _parse_ocl_json(self, ocl_json: str, invalid: Optional[list] = None) -> List[OCLConstraint]:
+        """解析JSON格式的OCL约束列表，跳过无效的约束；invalid不为None时收集 (原始数据, 错误)"""
+        ocl_data = json.loads(self.extract_json(ocl_json))
+        if isinstance(ocl_data, dict):
+            ocl_data = ocl_data.get("ocl_constraints", [ocl_data])
+        
+        # 整批一次校验，一次收集所有无效约束的全部错误
+        result = validate_batch(OCLConstraint, ocl_data)
+        for error in result.errors:
+            if isinstance(error.data, dict):
+                logger.warning("ocl.invalid", "OCL约束解析失败", index=error.index + 1, error=error.message)
+                message = error.message
+            else:
+                logger.warning("ocl.skipped", "OCL约束不是字典格式，跳过", index=error.index + 1)
+                message = "OCL约束不是JSON对象"
+            if invalid is not None:
+                invalid.append((error.data, message))
+        return result.valid
+
+    def _retry_artifact(self, failure: ArtifactFailure, stage: str, agent, task: str, sections, parse):
+        """
+        对失败队列中的单个产物做有限次数的定向重试，Prompt末尾附上上次输出和解析错误
+
+        Args:
+            failure: 失败记录
+            stage: 阶段名称
+            agent: 重新生成该产物的Agent
+            task: 原任务说明
+            sections: 原可变负载
+            parse: 解析函数，解析失败时抛出异常
+
+        Returns:
+            解析结果；重试次数用尽仍失败时返回None
+        """
+        retry_task = f"{task}\n上次输出无法解析，请根据解析错误修正后重新输出。"
+        while self.failures.can_retry(failure):
+            with tracer.span("artifact.retry", kind=failure.kind, key=failure.key, attempt=failure.attempts + 1) as span:
+                text = self._run_agent(stage, agent, retry_task, list(sections) + self.failures.feedback(failure))
+                try:
+                    result = parse(text)
+                except Exception as e:
+                    self.failures.record_attempt(failure, str(e), text)
+                    span.set_attribute("recovered", False)
+                    logger.warning("artifact.retry_failed", "产物重试后仍然失败", kind=failure.kind, key=failure.key,
+                                   attempt=failure.attempts, error=str(e))
+                    continue
+                self.failures.record_attempt(failure)
+                span.set_attribute("recovered", True)
+                logger.debug("artifact.recovered", "产物重试成功", kind=failure.kind, key=failure.key, attempt=failure.attempts)
+                return result
+        return None
+
+    def _completeness_report(self, model: DomainModel) -> Dict[str, Any]:
+        """汇总最终模型的完整性：缺失的顺序图、失败与重试情况"""
+        summary = self.failures.summary()
+        return {
+            "complete": not summary["unresolved"],
+            "sequence_diagrams": {
+                "expected": len(model.usecase_diagram.usecases),
+                "produced": len(model.sequence_diagrams),
+                "missing": [f.key for f in self.failures.unresolved("sequence_diagram")],
+            },
+            "ocl_constraints": len(model.ocl_constraints),
+            **summary,
+        }
+
+    def _design_sequence_diagrams_batched(self, usecases) -> Dict[str, SystemSequenceDiagram]:
+        """按自适应批大小把多个用例合并为一次请求生成顺序图，返回 {用例名: 顺序图}"""
+        agent = self.agents["sequence_batch_designer"]
+        batcher = AdaptiveBatcher(config.sequence_batch_output_tokens, config.sequence_batch_max_size,
+                                  PRIOR_TOKENS_PER_ITEM.get(agent.output_format, PRIOR_TOKENS_PER_ITEM["json"]))
+        results: Dict[str, SystemSequenceDiagram] = {}
+        start = 0
+        while start < len(usecases):
+            batch = batcher.take(usecases, start)
+            batch_results = self._design_sequence_batch(agent, batch, batcher)
+            for name, diagram in batch_results.items():
+                self._save_artifact("sequence_design", name, diagram)
+            results.update(batch_results)
+            start += len(batch)
+        return results
+
+    def _design_sequence_batch(self, agent, usecases, batcher: AdaptiveBatcher, depth: int = 0) -> Dict[str, SystemSequenceDiagram]:
+        """
+        一次请求生成一批用例的顺序图；整批解析失败时二分重试，部分缺失时只重试缺失的用例
+
+        Returns:
+            {用例名: 顺序图}
+        """
+        names = [u.name for u in usecases]
+        with tracer.span("sequence.batch", size=len(usecases), depth=depth) as span:
+            text = self._run_agent("sequence_design", agent, STAGE_TASKS["sequence_batch"],
+                                   [("用例", self._prompt_json(list(usecases), 'sequence_design'))],
+                                   max_tokens=max(2048, int(batcher.output_budget * 1.5)))
+            error = "批量输出中缺少该用例的顺序图"
+            try:
+                diagrams = self._parse_sequence_batch(agent, text)
+            except Exception as e:
+                logger.warning("sequence.batch_failed", "批量顺序图解析失败", size=len(usecases), error=str(e))
+                diagrams, error = [], str(e)
+            matched = match_by_name(names, diagrams)
+            results = {name: diagram for name, diagram in zip(names, matched) if diagram is not None}
+            span.set_attribute("parsed", len(results))
+            if results:
+                batcher.observe(len(results), getattr(self.last_usage, "completion_tokens", None) or 0)
+        
+        missing = [u for u in usecases if u.name not in results]
+        if not missing:
+            return results
+        if len(usecases) == 1:
+            logger.warning("sequence.failed", "顺序图解析失败", usecase=usecases[0].name, error=error)
+            self.failures.add("sequence_diagram", usecases[0].name, error, text)
+            return results
+        # 整批失败时二分，部分缺失时只重试缺失项
+        parts = bisect(missing) if len(missing) == len(usecases) else [missing]
+        logger.debug("sequence.batch_retry", "重试未解析的用例", missing=len(missing), parts=len(parts))
+        for part in parts:
+            results.update(self._design_sequence_batch(agent, part, batcher, depth + 1))
+        return results
+
+    def _parse_sequence_batch(self, agent, text: str) -> List[Optional[SystemSequenceDiagram]]:
+        """解析批量顺序图输出；JSON格式下逐项校验，无效项以None占位保持位置"""
+        if agent.output_format == "terse":
+            return self.parse_agent_output(agent, text, SystemSequenceDiagram)
+        data = json.loads(self.extract_json(text))
+        if isinstance(data, dict):
+            data = data.get("sequence_diagrams", [data])
+        result = validate_batch(SystemSequenceDiagram, data)
+        for error in result.errors:
+            logger.warning("sequence.invalid", "批量顺序图中的元素校验失败", index=error.index + 1, error=error.message)
+        return result.items
+
+    def run_workflow(self, user_requirements: str, resume_run_id: Optional[str] = None) -> DomainModel:
+        """
+        运行完整的建模工作流
+
+        Args:
+            user_requirements: 需求描述
+            resume_run_id: 续跑的运行ID，已完成的阶段和产物从检查点读取
+        """
+        self._reset_run(resume_run_id or uuid.uuid4().hex)
+        self.checkpoint = self._open_checkpoint(user_requirements, resume_run_id)
+        final_model = self._execute_run(user_requirements, lambda: self._run_stages(user_requirements),
+                                        resumed=resume_run_id is not None)
+        if self.checkpoint is not None:
+            final_model.metadata["checkpoint"] = {"run_dir": self.checkpoint.directory,
+                                                  "resumed_stages": self.resumed_stages}
+        return final_model
+
+    def run_incremental(self, previous_model: DomainModel, new_requirements: str) -> DomainModel:
+        """
+        根据需求文本的章节级diff增量更新上一次运行的模型：只让Agent更新受影响的用例和类，再合并回原模型
+
+        变更比例超过 config.incremental_max_change_ratio 时退回完整运行；增量模式不做验证迭代
+
+        Args:
+            previous_model: 上一次运行得到的领域模型（metadata中需要有requirements）
+            new_requirements: 新的需求文本
+
+        Returns:
+            合并后的领域模型，metadata["incremental"]记录diff和受影响的产物
+        """
+        previous_requirements = previous_model.metadata.get("requirements")
+        if previous_requirements is None:
+            raise ValueError("上一次运行的模型中没有记录需求文本，无法增量建模")
+        diff = incremental.diff_requirements(previous_requirements, new_requirements)
+        summary = {"base_run_id": previous_model.metadata.get("run_id"), "sections": diff.summary()}
+        if diff.is_empty:
+            logger.info("incremental.unchanged", "需求文本没有实质变化，沿用上一次的模型")
+            model = previous_model.model_copy(deep=True)
+            model.metadata["incremental"] = summary
+            return model
+        if diff.change_ratio > config.incremental_max_change_ratio:
+            logger.info("incremental.fallback", "需求变更比例过大，执行完整运行", change_ratio=round(diff.change_ratio, 4))
+            return self.run_workflow(new_requirements)
+        
+        self._reset_run(uuid.uuid4().hex)
+        self.checkpoint = None
+        final_model = self._execute_run(new_requirements, lambda: self._run_incremental_stages(previous_model, diff, summary),
+                                        mode="incremental")
+        final_model.metadata["incremental"] = summary
+        return final_model
+
+    def _reset_run(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.iteration_count = 0
+        self.budget = TokenBudget(self.token_budget)
+        self.prompt_compaction = {}
+        self.prompt_cache = {}
+        self.failures = FailureQueue(config.artifact_max_retries)
+        self.resumed_stages = []
+        self.memo_stats = {"reused": [], "recomputed": []}
+        self.shard_classes = {}
+        self.iteration_diffs = []
+
+    def _execute_run(self, user_requirements: str, run, **span_attributes) -> DomainModel:
+        """运行的公共部分：账本记录、根span、预算超限处理和运行元数据"""
+        if self.ledger is not None:
+            self.ledger.start_run(self.run_id, self.token_budget)
+        try:
+            with tracer.span("workflow.run", run_id=self.run_id, **span_attributes,
+                             requirements_bytes=len(user_requirements.encode("utf-8"))) as span:
+                self.last_trace_id = span.trace_id
+                final_model = run()
+                if config.entity_resolution_enabled:
+                    final_model = self._resolve_entities(final_model)
+        except TokenBudgetExceeded as e:
+            logger.error("budget.exceeded", "token预算超限，中止运行", run_id=self.run_id, error=str(e))
+            self._finish_run("aborted")
+            raise
+        except BaseException:
+            self._finish_run("failed")
+            raise
+        self._finish_run("completed", len(final_model.usecase_diagram.usecases))
+        final_model.metadata["run_id"] = self.run_id
+        final_model.metadata["requirements"] = user_requirements
+        final_model.metadata["completeness"] = self._completeness_report(final_model)
+        if self.memo is not None:
+            final_model.metadata["memo"] = self._memo_report()
+        if self.prompt_compaction:
+            final_model.metadata["prompt_compaction"] = self.prompt_compaction
+        if self.prompt_cache:
+            final_model.metadata["prompt_cache"] = self.prompt_cache
+        if self.ledger is not None:
+            final_model.metadata["token_usage"] = self.ledger.run_totals(self.run_id)
+        if self.iteration_diffs:
+            final_model.metadata["iterations"] = self.iteration_diffs
+        return final_model
+
+    def _resolve_entities(self, model: DomainModel) -> DomainModel:
+        """把同一参与者/类的不同命名合并为规范名称，别名映射记入 metadata["entity_resolution"]"""
+        with tracer.span("entity_resolution") as span:
+            model, aliases = resolve_domain_model(model)
+            span.set_attributes(participant_aliases=len(aliases["participants"]), class_aliases=len(aliases["classes"]))
+        if aliases["participants"] or aliases["classes"]:
+            logger.info("entity.resolved", "合并同一概念的不同命名",
+                        participants=len(aliases["participants"]), classes=len(aliases["classes"]))
+            model.metadata["entity_resolution"] = aliases
+        return model
+
+    def resume_workflow(self, run_id: str) -> DomainModel:
+        """从检查点继续一次中断的运行，需求文本从检查点读取"""
+        if self.checkpoints is None:
+            raise ValueError("未启用检查点，无法续跑")
+        return self.run_workflow(self.checkpoints.open(run_id).requirements, resume_run_id=run_id)
+
+    def _open_checkpoint(self, user_requirements: str, resume_run_id: Optional[str]) -> Optional[RunCheckpoint]:
+        if self.checkpoints is None:
+            if resume_run_id is not None:
+                raise ValueError("未启用检查点，无法续跑")
+            return None
+        if resume_run_id is None:
+            return self.checkpoints.create(self.run_id, user_requirements, config.model)
+        checkpoint = self.checkpoints.open(resume_run_id)
+        checkpoint.verify(user_requirements, config.model)
+        checkpoint.mark("running")
+        logger.info("checkpoint.resumed", "从检查点继续运行", run_id=resume_run_id,
+                    completed_stages=",".join(checkpoint.completed_stages) or "-")
+        return checkpoint
+
+    def _finish_run(self, status: str, usecase_count: Optional[int] = None) -> None:
+        if self.ledger is not None:
+            self.ledger.finish_run(self.run_id, status, usecase_count)
+        if self.checkpoint is not None:
+            self.checkpoint.mark(status)
+
+    def _checkpointed(self, stage: str, model_class, compute, memo_key: Optional[str] = None):
+        """
+        阶段输出已在检查点中时直接读取，否则（经阶段缓存）执行compute并保存
+
+        Args:
+            stage: 阶段名称
+            model_class: 输出的模型类，字符串输出为None
+            compute: 生成阶段输出的函数
+            memo_key: 阶段缓存键，None表示不经过阶段缓存
+        """
+        if self.checkpoint is not None and self.checkpoint.has(stage):
+            logger.info("checkpoint.reused", "阶段输出从检查点读取", stage=stage)
+            self.resumed_stages.append(stage)
+            return self.checkpoint.load(stage, model_class)
+        result = self._memoized(stage, memo_key, model_class, compute) if memo_key is not None else compute()
+        if self.checkpoint is not None:
+            self.checkpoint.save(stage, result)
+        return result
+
+    def _memo_key(self, stage: str, prompts, inputs, **params) -> Optional[str]:
+        """
+        计算阶段缓存键；未启用阶段缓存时返回None
+
+        Args:
+            stage: 阶段名称
+            prompts: 该阶段用到的 [(Agent, 任务说明)]
+            inputs: 该阶段Prompt中的上游负载
+            params: 额外的模型参数（max_iterations等）
+        """
+        if self.memo is None:
+            return None
+        params["models"] = [agent.model for agent, _ in prompts]
+        return self.memo.key(stage, [prompt_version(agent, task) for agent, task in prompts], inputs, params)
+
+    def _memoized(self, name: str, key: str, model_class, compute):
+        """输入哈希命中阶段缓存时复用输出，否则执行compute；产生未恢复的失败时不写入缓存"""
+        if self.memo.has(key):
+            logger.debug("memo.reused", "阶段输出从缓存复用", stage=name)
+            self.memo_stats["reused"].append(name)
+            return self.memo.get(key, model_class)
+        unresolved = len(self.failures.unresolved())
+        result = compute()
+        self.memo_stats["recomputed"].append(name)
+        if len(self.failures.unresolved()) == unresolved:
+            self.memo.put(key, name, result)
+        return result
+
+    def _memo_report(self) -> Dict[str, Any]:
+        """本次运行复用与重新计算的阶段（顺序图按用例计）"""
+        report = {
+            "reused": len(self.memo_stats["reused"]),
+            "recomputed": len(self.memo_stats["recomputed"]),
+            "reused_stages": list(self.memo_stats["reused"]),
+            "recomputed_stages": list(self.memo_stats["recomputed"]),
+        }
+        logger.info("memo.summary", "阶段缓存统计", reused=report["reused"], recomputed=report["recomputed"])
+        return report
+
+    def _save_artifact(self, stage: str, key: str, value) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.save_artifact(stage, key, value)
+
+    def _run_stages(self, user_requirements: str) -> DomainModel:
+        logger.debug("workflow.start", "开始MultiAgent领域建模工作流")
+        
+        # 步骤1: 需求分析
+        logger.debug("stage.start", "步骤1: 需求分析", stage="requirements_analysis")
+        with tracer.span("stage.requirements_analysis"):
+            analysis_result = self._checkpointed(
+                "requirements_analysis", None, lambda: self._analyze_requirements(user_requirements),
+                self._memo_key("requirements_analysis",
+                               [(self.agents["requirements_analyst"], STAGE_TASKS[task])
+                                for task in ("requirements_analysis", "requirements_chunk", "requirements_reduce")],
+                               [user_requirements], chunk_tokens=self._requirements_chunk_tokens()))
+        
+        # 步骤2: 用例建模
+        logger.debug("stage.start", "步骤2: 用例建模", stage="usecase_modeling")
+        with tracer.span("stage.usecase_modeling"):
+            usecase_diagram = self._checkpointed(
+                "usecase_modeling", UseCaseDiagram, lambda: self._model_usecases(analysis_result),
+                self._memo_key("usecase_modeling", [(self.agents["usecase_modeler"], STAGE_TASKS["usecase_modeling"])],
+                               [analysis_result]))
+            logger.debug("stage.ok", "用例图解析成功", stage="usecase_modeling", usecases=len(usecase_diagram.usecases))
+        shards = self._shard_usecases(usecase_diagram)
+        
+        # 步骤3: 类图设计
+        logger.debug("stage.start", "步骤3: 类图设计", stage="class_design")
+        with tracer.span("stage.class_design"):
+            class_diagram = self._checkpointed(
+                "class_design", ConceptualClassDiagram,
+                lambda: self._design_classes_sharded(usecase_diagram, shards) if shards else self._design_classes(usecase_diagram),
+                self._memo_key("class_design", [(self.agents["class_diagram_designer"], STAGE_TASKS["class_design"])],
+                               [to_prompt_json(usecase_diagram, 'class_design')], shards=len(shards)))
+            logger.debug("stage.ok", "类图解析成功", stage="class_design", classes=len(class_diagram.classes))
+        
+        # 步骤4: 顺序图设计
+        logger.debug("stage.start", "步骤4: 顺序图设计", stage="sequence_design")
+        with tracer.span("stage.sequence_design", usecase_count=len(usecase_diagram.usecases)):
+            sequence_diagrams = self._checkpointed("sequence_design", SystemSequenceDiagram,
+                                                   lambda: self._design_sequences(usecase_diagram))
+        logger.debug("stage.ok", "顺序图设计完成", stage="sequence_design", sequence_diagrams=len(sequence_diagrams))
+        
+        # 步骤5: OCL约束生成
+        logger.debug("stage.start", "步骤5: OCL约束生成", stage="ocl_generation")
+        with tracer.span("stage.ocl_generation"):
+            ocl_agent = self.agents["ocl_expert"]
+            ocl_constraints = self._checkpointed(
+                "ocl_generation", OCLConstraint,
+                lambda: self._generate_ocl_sharded(usecase_diagram, class_diagram, shards) if shards
+                else self._generate_ocl(usecase_diagram, class_diagram),
+                self._memo_key("ocl_generation", [(ocl_agent, STAGE_TASKS["ocl_generation"]), (ocl_agent, STAGE_TASKS["ocl_repair"])],
+                               [to_prompt_json(usecase_diagram, 'ocl_usecases'), to_prompt_json(class_diagram, 'ocl_classes')],
+                               shards=len(shards)))
+        logger.debug("stage.ok", "OCL约束生成完成", stage="ocl_generation", ocl_constraints=len(ocl_constraints))
+        
+        # 步骤6: 模型验证和迭代改进
+        logger.debug("stage.start", "步骤6: 模型验证和迭代改进", stage="validation")
+        with tracer.span("stage.validation"):
+            final_model = self._checkpointed("validation", DomainModel, lambda: self._run_validation_and_iteration(
+                usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints
+            ), self._memo_key("validation", [(self.agents["validation_expert"], STAGE_TASKS["validation"]),
+                                             (self.agents["coordinator"], STAGE_TASKS["improvement"])],
+                              [usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints],
+                              max_iterations=self.max_iterations))
+        logger.info("workflow.completed", "工作流完成",
+                    usecases=len(final_model.usecase_diagram.usecases),
+                    classes=len(final_model.class_diagram.classes),
+                    sequence_diagrams=len(final_model.sequence_diagrams),
+                    ocl_constraints=len(final_model.ocl_constraints),
+                    iterations=self.iteration_count,
+                    retry_calls=self.failures.summary()["retry_calls"],
+                    unresolved=len(self.failures.unresolved()))
+        return final_model
+
+    def _requirements_chunk_tokens(self) -> int:
+        """需求片段的token上限：按模型上下文窗口扣除稳定前缀和输出预留"""
+        agent = self.agents["requirements_analyst"]
+        reserved = build_agent_prompt(agent, STAGE_TASKS["requirements_chunk"]).prefix_tokens + 2048
+        return chunking.chunk_token_budget(agent.model, reserved)
+
+    def _analyze_requirements(self, user_requirements: str) -> str:
+        max_tokens = self._requirements_chunk_tokens()
+        if estimate_tokens(user_requirements) > max_tokens:
+            return self._analyze_requirements_chunked(user_requirements, max_tokens)
+        return self._run_agent("requirements_analysis", self.agents["requirements_analyst"], STAGE_TASKS["requirements_analysis"],
+                               [("需求", user_requirements)])
+
+    def _analyze_requirements_chunked(self, user_requirements: str, max_tokens: int) -> str:
+        """
+        长需求文档的map-reduce分析：按章节切分为带重叠的片段并行分析，再逐层合并为一份需求分析
+
+        Args:
+            user_requirements: 需求文档
+            max_tokens: 每个片段（以及每次合并输入）的token上限
+        """
+        agent = self.agents["requirements_analyst"]
+        chunks = chunking.split_document(user_requirements, max_tokens, config.requirements_chunk_overlap_tokens)
+        logger.info("requirements.chunked", "需求文档超出单次分析长度，按片段并行分析",
+                    chunks=len(chunks), chunk_tokens=max_tokens, document_tokens=estimate_tokens(user_requirements))
+
+        def analyze_chunk(chunk: chunking.Chunk) -> str:
+            with tracer.span("requirements.chunk", chunk=chunk.index, tokens=chunk.tokens):
+                return self._run_agent("requirements_analysis", agent, STAGE_TASKS["requirements_chunk"],
+                                       [("需求片段", chunk.to_prompt(len(chunks)))])
+
+        partials = chunking.parallel_map(analyze_chunk, chunks)
+
+        # 合并：部分结果超出单次输入上限时先分组合并，直到只剩一份
+        level = 0
+        while len(partials) > 1:
+            groups = chunking.group_by_tokens(partials, max_tokens)
+            if len(groups) == len(partials):
+                # 每份结果都独占一组时两两合并，保证每层都在收敛
+                groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+
+            def reduce_group(group: List[str]) -> str:
+                if len(group) == 1:
+                    return group[0]
+                with tracer.span("requirements.reduce", level=level, inputs=len(group)):
+                    sections = [(f"片段分析{i + 1}", text) for i, text in enumerate(group)]
+                    return self._run_agent("requirements_analysis", agent, STAGE_TASKS["requirements_reduce"], sections)
+
+            partials = chunking.parallel_map(reduce_group, groups)
+            level += 1
+        return partials[0]
+
+    def _model_usecases(self, analysis_result: str) -> UseCaseDiagram:
+        usecase_agent = self.agents["usecase_modeler"]
+        usecase_task, usecase_sections = STAGE_TASKS["usecase_modeling"], [("需求分析结果", analysis_result)]
+        usecase_diagram_json = self._run_agent("usecase_modeling", usecase_agent, usecase_task, usecase_sections)
+        
+        def parse_usecase_diagram(text):
+            return self.parse_agent_output(usecase_agent, text, UseCaseDiagram, self.fix_usecase_diagram_json)
+        try:
+            return parse_usecase_diagram(usecase_diagram_json)
+        except Exception as e:
+            failure = self.failures.add("usecase_diagram", "usecase_diagram", str(e), usecase_diagram_json)
+            usecase_diagram = self._retry_artifact(failure, "usecase_modeling", usecase_agent, usecase_task,
+                                                   usecase_sections, parse_usecase_diagram)
+            if usecase_diagram is None:
+                logger.error("stage.failed", "用例图解析失败", stage="usecase_modeling", error=failure.error)
+                raise
+            return usecase_diagram
+
+    def _design_classes(self, usecase_diagram: UseCaseDiagram, key: str = "class_diagram") -> ConceptualClassDiagram:
+        class_agent = self.agents["class_diagram_designer"]
+        class_task, class_sections = STAGE_TASKS["class_design"], [("用例图", self._prompt_json(usecase_diagram, 'class_design'))]
+        class_diagram_json = self._run_agent("class_design", class_agent, class_task, class_sections)
+        
+        def parse_class_diagram(text):
+            return self.parse_agent_output(class_agent, text, ConceptualClassDiagram)
+        try:
+            return parse_class_diagram(class_diagram_json)
+        except Exception as e:
+            failure = self.failures.add("class_diagram", key, str(e), class_diagram_json)
+            class_diagram = self._retry_artifact(failure, "class_design", class_agent, class_task,
+                                                 class_sections, parse_class_diagram)
+            if class_diagram is None:
+                logger.error("stage.failed", "类图解析失败", stage="class_design", key=key, error=failure.error)
+                raise
+            return class_diagram
+
+    def _shard_usecases(self, usecase_diagram: UseCaseDiagram) -> List[UseCaseDiagram]:
+        """用例数达到分片阈值时按子系统划分用例图，否则返回空列表（整体生成）"""
+        if len(usecase_diagram.usecases) < config.sharding_min_usecases:
+            return []
+        clusters = sharding.cluster_usecases(usecase_diagram, config.shard_max_usecases)
+        logger.info("sharding.clustered", "用例按子系统分片", usecases=len(usecase_diagram.usecases),
+                    shards=len(clusters), largest=max(len(names) for names in clusters))
+        return [incremental.usecase_subset(usecase_diagram, names) for names in clusters]
+
+    @staticmethod
+    def _shard_key(shard: UseCaseDiagram) -> str:
+        return "|".join(usecase.name for usecase in shard.usecases)
+
+    def _design_classes_sharded(self, usecase_diagram: UseCaseDiagram, shards: List[UseCaseDiagram]) -> ConceptualClassDiagram:
+        """
+        各子系统并行生成类图，再按规范化类名合并；已完成的子系统类图逐个保存到检查点
+
+        Args:
+            usecase_diagram: 完整用例图
+            shards: 各子系统的用例图子集
+        """
+        done = self.checkpoint.load_artifacts("class_design", ConceptualClassDiagram) if self.checkpoint is not None else {}
+
+        def design_shard(shard: UseCaseDiagram) -> ConceptualClassDiagram:
+            key = self._shard_key(shard)
+            if key in done:
+                return done[key]
+            with tracer.span("class_design.shard", usecases=len(shard.usecases)):
+                diagram = self._design_classes(shard, key)
+            self._save_artifact("class_design", key, diagram)
+            return diagram
+
+        diagrams = chunking.parallel_map(design_shard, shards, config.shard_max_workers)
+        self.shard_classes = {self._shard_key(shard): [cls.name for cls in diagram.classes]
+                              for shard, diagram in zip(shards, diagrams)}
+        class_diagram, _ = sharding.merge_class_diagrams(diagrams)
+        logger.info("sharding.merged", "子系统类图合并完成", shards=len(shards),
+                    classes=sum(len(diagram.classes) for diagram in diagrams), merged_classes=len(class_diagram.classes))
+        return class_diagram.model_copy(update={"name": diagrams[0].name or usecase_diagram.name})
+
+    def _generate_ocl_sharded(self, usecase_diagram: UseCaseDiagram, class_diagram: ConceptualClassDiagram,
+                              shards: List[UseCaseDiagram]) -> List[OCLConstraint]:
+        """
+        各子系统并行生成OCL约束，每个子系统只看到自己的用例和类图子集；合并时去除重复约束
+
+        类图阶段从阶段缓存复用、且检查点中没有子系统类图时，不知道各子系统的类，退回整体生成
+        """
+        if not all(self._shard_key(shard) in self.shard_classes for shard in shards) and self.checkpoint is not None:
+            self.shard_classes = {key: [cls.name for cls in diagram.classes] for key, diagram
+                                  in self.checkpoint.load_artifacts("class_design", ConceptualClassDiagram).items()}
+        if not all(self._shard_key(shard) in self.shard_classes for shard in shards):
+            logger.warning("sharding.fallback", "缺少子系统类图，OCL约束整体生成", shards=len(shards))
+            return self._generate_ocl(usecase_diagram, class_diagram)
+        canonical = {sharding.normalize_name(cls.name): cls.name for cls in class_diagram.classes}
+
+        def generate_shard(shard: UseCaseDiagram) -> List[OCLConstraint]:
+            key = self._shard_key(shard)
+            names = {canonical.get(sharding.normalize_name(name)) for name in self.shard_classes[key]}
+            with tracer.span("ocl_generation.shard", usecases=len(shard.usecases), classes=len(names)):
+                return self._generate_ocl(shard, incremental.class_subset(class_diagram, names), key)
+
+        constraint_lists = chunking.parallel_map(generate_shard, shards, config.shard_max_workers)
+        return sharding.merge_ocl_constraints(constraint_lists, canonical)
+
+    def _design_sequences(self, usecase_diagram: UseCaseDiagram) -> List[SystemSequenceDiagram]:
+        """按用例顺序返回顺序图，生成失败的用例不在其中"""
+        sequence_results = self._design_sequence_map(usecase_diagram)
+        return [sequence_results[u.name] for u in usecase_diagram.usecases if u.name in sequence_results]
+
+    def _design_sequence_map(self, usecase_diagram: UseCaseDiagram) -> Dict[str, SystemSequenceDiagram]:
+        """
+        为每个用例生成顺序图，返回 {用例名: 顺序图}；检查点或阶段缓存中已有的用例不再生成，新生成的顺序图逐个保存
+
+        每个顺序图只依赖对应用例的投影，修改一个用例只会使该用例的顺序图失效
+        """
+        sequence_agent = self.agents["sequence_diagram_designer"]
+        sequence_task = STAGE_TASKS["sequence_design"]
+        sequence_results: Dict[str, SystemSequenceDiagram] = {}
+        if self.checkpoint is not None:
+            sequence_results = self.checkpoint.load_artifacts("sequence_design", SystemSequenceDiagram)
+            if sequence_results:
+                logger.info("checkpoint.reused", "顺序图从检查点读取", stage="sequence_design", artifacts=len(sequence_results))
+        memo_keys = {
+            u.name: self._memo_key("sequence_design", [(sequence_agent, sequence_task)], [to_prompt_json(u, 'sequence_design')])
+            for u in usecase_diagram.usecases if u.name not in sequence_results
+        }
+        pending_usecases = []
+        for usecase in usecase_diagram.usecases:
+            key = memo_keys.get(usecase.name)
+            if key is not None and self.memo.has(key):
+                sequence_results[usecase.name] = self.memo.get(key, SystemSequenceDiagram)
+                self.memo_stats["reused"].append(f"sequence_design[{usecase.name}]")
+                self._save_artifact("sequence_design", usecase.name, sequence_results[usecase.name])
+            elif usecase.name not in sequence_results:
+                pending_usecases.append(usecase)
+        
+        def parse_sequence_diagram(text):
+            return self.parse_agent_output(sequence_agent, text, SystemSequenceDiagram)
+        if self.sequence_batching:
+            sequence_results.update(self._design_sequence_diagrams_batched(pending_usecases))
+        else:
+            for usecase in pending_usecases:
+                seq_json = self._run_agent("sequence_design", sequence_agent, sequence_task,
+                                          [("用例", self._prompt_json(usecase, 'sequence_design'))])
+                try:
+                    sequence_results[usecase.name] = parse_sequence_diagram(seq_json)
+                    self._save_artifact("sequence_design", usecase.name, sequence_results[usecase.name])
+                    logger.debug("sequence.ok", "顺序图解析成功", usecase=usecase.name)
+                except Exception as e:
+                    logger.warning("sequence.failed", "顺序图解析失败", usecase=usecase.name, error=str(e))
+                    self.failures.add("sequence_diagram", usecase.name, str(e), seq_json)
+        
+        # 只对失败的用例做定向重试
+        usecases_by_name = {u.name: u for u in usecase_diagram.usecases}
+        for failure in self.failures.pending("sequence_diagram"):
+            diagram = self._retry_artifact(failure, "sequence_design", sequence_agent, sequence_task,
+                                           [("用例", self._prompt_json(usecases_by_name[failure.key], 'sequence_design'))],
+                                           parse_sequence_diagram)
+            if diagram is not None:
+                sequence_results[failure.key] = diagram
+                self._save_artifact("sequence_design", failure.key, diagram)
+        
+        for usecase in pending_usecases:
+            if memo_keys.get(usecase.name) is not None:
+                self.memo_stats["recomputed"].append(f"sequence_design[{usecase.name}]")
+                if usecase.name in sequence_results:
+                    self.memo.put(memo_keys[usecase.name], "sequence_design", sequence_results[usecase.name])
+        return sequence_results
+
+    def _generate_ocl(self, usecase_diagram: UseCaseDiagram, class_diagram: ConceptualClassDiagram,
+                      key: str = "ocl_constraints") -> List[OCLConstraint]:
+        ocl_agent = self.agents["ocl_expert"]
+        ocl_task = STAGE_TASKS["ocl_generation"]
+        ocl_sections = [("用例图", self._prompt_json(usecase_diagram, 'ocl_usecases')),
+                        ("类图", self._prompt_json(class_diagram, 'ocl_classes'))]
+        ocl_json = self._run_agent("ocl_generation", ocl_agent, ocl_task, ocl_sections)
+        invalid_ocl = []
+        
+        def parse_ocl_constraints(text):
+            invalid_ocl.clear()
+            if ocl_agent.output_format == "terse":
+                return self.parse_agent_output(ocl_agent, text, OCLConstraint)
+            return self._parse_ocl_json(text, invalid_ocl)
+        try:
+            ocl_constraints = parse_ocl_constraints(ocl_json)
+        except Exception as e:
+            logger.warning("stage.failed", "OCL约束解析失败", stage="ocl_generation", key=key, error=str(e))
+            failure = self.failures.add("ocl_constraints", key, str(e), ocl_json)
+            ocl_constraints = self._retry_artifact(failure, "ocl_generation", ocl_agent, ocl_task,
+                                                   ocl_sections, parse_ocl_constraints) or []
+        
+        # 只把校验失败的约束连同错误发回修正，而不是整体重新生成
+        if invalid_ocl:
+            failure = self.failures.add(
+                "ocl_constraint", f"{len(invalid_ocl)}个无效约束",
+                "；".join(f"第{i + 1}条: {error}" for i, (_, error) in enumerate(invalid_ocl)),
+                json.dumps([data for data, _ in invalid_ocl], ensure_ascii=False, default=str),
+            )
+            
+            def parse_fixed_ocl(text):
+                fixed = self._parse_ocl_json(text)
+                if not fixed:
+                    raise ValueError("修正后仍没有有效的OCL约束")
+                return fixed
+            ocl_constraints += self._retry_artifact(failure, "ocl_generation", ocl_agent, STAGE_TASKS["ocl_repair"],
+                                                    [], parse_fixed_ocl) or []
+        return ocl_constraints
+
+    def _generate_delta(self, stage: str, agent, sections, model_class):
+        """生成增量更新；解析失败时带解析错误重试，仍失败则中止"""
+        task = STAGE_TASKS[stage]
+        text = self._run_agent(stage, agent, task, sections)
+        
+        def parse_delta(output):
+            return self.parse_agent_output(agent, output, model_class)
+        try:
+            return parse_delta(text)
+        except Exception as e:
+            failure = self.failures.add(stage, stage, str(e), text)
+            delta = self._retry_artifact(failure, stage, agent, task, sections, parse_delta)
+            if delta is None:
+                logger.error("stage.failed", "增量结果解析失败", stage=stage, error=failure.error)
+                raise
+            return delta
+
+    def _run_incremental_stages(self, previous_model: DomainModel, diff: incremental.RequirementsDiff,
+                                summary: Dict[str, Any]) -> DomainModel:
+        logger.debug("workflow.start", "开始增量建模", change_ratio=round(diff.change_ratio, 4))
+        
+        # 步骤1: 按需求变更更新用例
+        with tracer.span("stage.usecase_delta"):
+            usecase_delta = self._generate_delta("usecase_delta", self.agents["usecase_delta_modeler"], [
+                ("需求变更", diff.to_prompt()),
+                ("当前用例图", self._prompt_json(previous_model.usecase_diagram, 'delta')),
+            ], UseCaseDelta)
+            usecase_diagram = incremental.merge_usecase_delta(previous_model.usecase_diagram, usecase_delta)
+        changed_usecases = [u.name for u in usecase_delta.usecases]
+        removed_usecases = list(usecase_delta.removed_usecases)
+        summary.update(updated_usecases=changed_usecases, removed_usecases=removed_usecases)
+        
+        # 步骤2: 按变更的用例更新类图
+        class_delta = ClassDiagramDelta()
+        if changed_usecases or removed_usecases:
+            with tracer.span("stage.class_delta"):
+                sections = [("变更的用例", self._prompt_json(incremental.usecase_subset(usecase_diagram, changed_usecases), 'class_design'))]
+                if removed_usecases:
+                    sections.append(("删除的用例", "\n".join(removed_usecases)))
+                sections.append(("当前类图", self._prompt_json(previous_model.class_diagram, 'delta')))
+                class_delta = self._generate_delta("class_delta", self.agents["class_delta_designer"], sections, ClassDiagramDelta)
+        class_diagram = incremental.merge_class_delta(previous_model.class_diagram, class_delta)
+        updated_classes = [c.name for c in class_delta.classes]
+        summary.update(updated_classes=updated_classes, removed_classes=list(class_delta.removed_classes))
+        
+        # 步骤3: 只为变更的用例重新生成顺序图
+        with tracer.span("stage.sequence_design", usecase_count=len(changed_usecases)):
+            updated_sequences = self._design_sequence_map(incremental.usecase_subset(usecase_diagram, changed_usecases))
+            sequence_diagrams = incremental.merge_sequence_diagrams(
+                [u.name for u in usecase_diagram.usecases], previous_model.sequence_diagrams, updated_sequences)
+        
+        # 步骤4: 只为变更的类重新生成OCL约束
+        updated_ocl = []
+        if updated_classes:
+            with tracer.span("stage.ocl_generation"):
+                updated_ocl = self._generate_ocl(incremental.usecase_subset(usecase_diagram, changed_usecases),
+                                                 incremental.class_subset(class_diagram, updated_classes))
+        ocl_constraints = incremental.merge_ocl_constraints(previous_model.ocl_constraints, updated_ocl,
+                                                            updated_classes, class_delta.removed_classes,
+                                                            self._unresolved_ocl_classes(updated_classes))
+        
+        final_model = DomainModel(
+            name=previous_model.name,
+            description=previous_model.description,
+            usecase_diagram=usecase_diagram,
+            sequence_diagrams=sequence_diagrams,
+            class_diagram=class_diagram,
+            ocl_constraints=ocl_constraints,
+        )
+        logger.info("workflow.completed", "增量建模完成",
+                    updated_usecases=len(changed_usecases), removed_usecases=len(removed_usecases),
+                    updated_classes=len(updated_classes), removed_classes=len(class_delta.removed_classes),
+                    sequence_diagrams=len(updated_sequences), ocl_constraints=len(updated_ocl))
+        return final_model
+
+    def _unresolved_ocl_classes(self, classes: List[str]) -> List[str]:
+        """
+        OCL生成仍有未解决失败的类
+
+        整体解析失败时涉及全部类；个别约束修正失败时取这些约束的context，无法确定时同样视为全部类
+        """
+        if self.failures.unresolved("ocl_constraints"):
+            return list(classes)
+        failed = set()
+        for failure in self.failures.unresolved("ocl_constraint"):
+            try:
+                contexts = {item.get("context") for item in json.loads(failure.raw_output)}
+            except (ValueError, TypeError, AttributeError):
+                contexts = {None}
+            failed.update(classes if None in contexts else contexts & set(classes))
+        return [name for name in classes if name in failed]
+
+    def _run_validation_and_iteration(self, usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints):
+        while self.iteration_count < self.max_iterations:
+            self.iteration_count += 1
+            logger.debug("iteration.start", "验证迭代", iteration=self.iteration_count, max_iterations=self.max_iterations)
+            with tracer.span("workflow.iteration", attempt=self.iteration_count):
+                current_model = DomainModel(
+                    name="领域模型",
+                    description="通过MultiAgent工作流生成的领域模型",
+                    usecase_diagram=usecase_diagram,
+                    sequence_diagrams=sequence_diagrams,
+                    class_diagram=class_diagram,
+                    ocl_constraints=ocl_constraints
+                )
+                # 验证
+                try:
+                    validation_json = self._run_agent("validation", self.agents["validation_expert"], STAGE_TASKS["validation"],
+                                                      [("领域模型", self._prompt_json(current_model, 'validation'))])
+                    validation = json.loads(self.extract_json(validation_json))
+                    score = validation.get("score", "pass")
+                    feedback = validation.get("feedback", "")
+                except TokenBudgetExceeded:
+                    raise
+                except Exception as e:
+                    logger.warning("validation.failed", "验证步骤出现异常，使用默认评分", error=str(e))
+                    score = "pass"
+                    feedback = ""
+                
+                if score == "pass":
+                    logger.debug("validation.passed", "模型验证通过")
+                    return current_model
+                elif score == "needs_improvement":
+                    logger.debug("validation.needs_improvement", "模型需要改进，进行迭代")
+                    try:
+                        improved_json = self._run_agent("validation", self.agents["coordinator"], STAGE_TASKS["improvement"],
+                                                        [("反馈", feedback),
+                                                         ("当前模型", self._prompt_json(current_model, 'improvement'))])
+                        improved = json.loads(self.extract_json(improved_json))
+                        with tracer.span("pydantic.validate", model="DomainModel"):
+                            usecase_diagram = UseCaseDiagram.model_validate(improved["usecase_diagram"])
+                            class_diagram = ConceptualClassDiagram.model_validate(improved["class_diagram"])
+                            sequence_diagrams = validate_list(SystemSequenceDiagram, improved["sequence_diagrams"])
+                            ocl_constraints = validate_list(OCLConstraint, improved["ocl_constraints"])
+                    except TokenBudgetExceeded:
+                        raise
+                    except Exception as e:
+                        logger.warning("iteration.failed", "迭代改进失败，使用当前模型", error=str(e))
+                        return current_model
+                    self._record_iteration_diff(current_model, usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints)
+                else:
+                    logger.warning("validation.rejected", "模型验证失败，返回当前模型")
+                    return current_model
+        
+        logger.warning("iteration.exhausted", "达到最大迭代次数，返回当前模型", max_iterations=self.max_iterations)
+        return current_model
+
+    def _record_iteration_diff(self, current_model, usecase_diagram, class_diagram, sequence_diagrams, ocl_constraints) -> None:
+        """记录本轮改进相对当前模型的结构变化，汇总写入 metadata["iterations"]"""
+        improved_model = current_model.model_copy(update={
+            "usecase_diagram": usecase_diagram,
+            "class_diagram": class_diagram,
+            "sequence_diagrams": sequence_diagrams,
+            "ocl_constraints": ocl_constraints,
+        })
+        with tracer.span("iteration.diff") as span:
+            diff = diff_models(current_model, improved_model)
+            span.set_attribute("changes", len(diff.changes))
+        logger.info("iteration.diff", "迭代改进的模型变化", iteration=self.iteration_count,
+                    changes=len(diff.changes), summary=diff.summary())
+        self.iteration_diffs.append({"iteration": self.iteration_count, "summary": diff.summary(),
+                                     "changes": [change.format() for change in diff.changes[:config.diff_report_limit]]})
+
+    def export_trace(self, output_dir: str = None) -> Dict[str, str]:
+        """
+        导出最近一次运行的追踪数据
+
+        Args:
+            output_dir: 输出目录，默认使用配置中的trace_dir
+
+        Returns:
+            {"chrome": Chrome trace文件路径, "otlp": OTLP JSON文件路径}
+        """
+        if self.last_trace_id is None:
+            return {}
+        output_dir = output_dir or config.trace_dir
+        base = os.path.join(output_dir, f"trace_{self.last_trace_id}")
+        return {
+            "chrome": tracer.export_chrome_trace(f"{base}.chrome.json", trace_id=self.last_trace_id),
+            "otlp": tracer.export_otlp_json(f"{base}.otlp.json", trace_id=self.last_trace_id),
+        }
+
+def main():
+    sample_requirements = """
+    请为在线书店系统进行领域建模。
+    
+    系统功能包括：
+    1. 用户注册和登录
+    2. 浏览和搜索图书
+    3. 添加图书到购物车
+    4. 下单和支付
+    5. 订单管理
+    6. 库存管理
+    7. 用户评价和评论
+    
+    主要参与者包括：顾客、管理员、支付系统
+    """
+    
+    configure_logging()
+    try:
+        workflow = MultiAgentWorkflow()
+        final_model = workflow.run_workflow(sample_requirements)
+        
+        # 确保output目录存在
+        import os
+        os.makedirs("output", exist_ok=True)
+        
+        # 保存领域模型
+        from tools import save_domain_model, export_to_plantuml
+        save_result = save_domain_model(final_model, "final_domain_model.json")
+        logger.info("model.saved", save_result)
+        
+        # 导出PlantUML用例图
+        plantuml_code = export_to_plantuml(final_model)
+        with open("output/usecase_diagram.puml", "w", encoding="utf-8") as f:
+            f.write(plantuml_code)
+        logger.info("plantuml.exported", "PlantUML用例图已导出", path="output/usecase_diagram.puml")
+        
+        # 导出追踪数据
+        trace_files = workflow.export_trace()
+        if trace_files:
+            logger.info("trace.exported", "追踪数据已导出", **trace_files)
+        
+    except Exception as e:
+        logger.error("workflow.failed", "工作流执行失败", exc_info=True, error=str(e))
+        raw_outputs.dump("output/raw_outputs.jsonl")
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file